@@ -34,9 +34,13 @@ class ActivityHandler(Declarative.Handler):
         self.ui_view = u.create_row(
             u.create_label(text="@binding(activity.displayed_title)", word_wrap=True, width=296),
             u.create_stretch(),
+            u.create_push_button(text=_("Cancel"), visible="@binding(activity.is_cancellable)", on_clicked="cancel"),
             spacing=8
         )
 
+    def cancel(self, widget: Declarative.UIWidget) -> None:
+        self.activity.cancel()
+
 
 class ActivityComponentFactory(typing.Protocol):
     def make_activity_component(self, activity: Activity.Activity) -> typing.Optional[Declarative.HandlerLike]: ...
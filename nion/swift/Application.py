@@ -2,6 +2,7 @@ from __future__ import annotations
 
 # standard libraries
 import asyncio
+import concurrent.futures
 import dataclasses
 import datetime
 import functools
@@ -43,8 +44,10 @@ from nion.swift.model import ColorMaps
 from nion.swift.model import DocumentModel
 from nion.swift.model import Feature
 from nion.swift.model import FileStorageSystem
+from nion.swift.model import Persistence
 from nion.swift.model import PlugInManager
 from nion.swift.model import Profile
+from nion.swift.model import StartupTrace
 from nion.swift.model import Symbolic
 from nion.swift.model import Utility
 from nion.ui import Application as UIApplication
@@ -254,6 +257,9 @@ class Application(UIApplication.BaseApplication):
         self.__profile: typing.Optional[Profile.Profile] = None
         self.__document_model: typing.Optional[DocumentModel.DocumentModel] = None
 
+        # the profile storage read during initialize, concurrently with the plug-in import.
+        self.__profile_path_and_future: typing.Optional[typing.Tuple[pathlib.Path, concurrent.futures.Future[typing.Tuple[Persistence.PersistentStorageInterface, pathlib.Path, bool]]]] = None
+
         self.__menu_handlers: typing.List[typing.Callable[[DocumentController.DocumentController], None]] = []
 
         Registry.register_component(Inspector.DeclarativeImageChooserConstructor(self), {"declarative_constructor"})
@@ -316,6 +322,7 @@ class Application(UIApplication.BaseApplication):
         NotificationDialog._app = self
         # configure app data
         if load_plug_ins:
+            StartupTrace.start_tracing()
             now_slug = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             log_dir_path = pathlib.Path(self.ui.get_data_location()) / "Logs"
             log_dir_path.mkdir(parents=True, exist_ok=True)
@@ -350,7 +357,13 @@ class Application(UIApplication.BaseApplication):
             ApplicationData.set_file_path(app_data_file_path)
             logging.info("Application data: " + str(app_data_file_path))
             self.__initialize_features()
-            PlugInManager.load_plug_ins(self.ui.get_document_location(), self.ui.get_data_location(), get_root_dir() if use_root_dir else None)
+            # the profile storage read and the storage handler scan of the last project do not depend on the plug-ins.
+            # run them on a thread concurrently with the plug-in import. start reads the profile from the storage.
+            profile_path = self.__get_profile_path(None)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="startup") as executor:
+                self.__profile_path_and_future = profile_path, executor.submit(self.__open_profile_storage_and_prefetch_project, profile_path)
+                with StartupTrace.trace_span("plug-in import"):
+                    PlugInManager.load_plug_ins(self.ui.get_document_location(), self.ui.get_data_location(), get_root_dir() if use_root_dir else None)
             color_maps_dir = self.ui.get_configuration_location() / pathlib.Path("Color Maps")
             if color_maps_dir.exists():
                 logging.info("Loading color maps from " + str(color_maps_dir))
@@ -364,10 +377,15 @@ class Application(UIApplication.BaseApplication):
         NotificationDialog.close_notification_dialog()
         NotificationDialog._app = None
         Registry.unregister_component(self, {"application"})
+        if self.__profile_path_and_future:
+            self.__profile_path_and_future[1].result()[0].close()
+            self.__profile_path_and_future = None
         if self.__profile:
             self.__profile.close()
             self.__profile = None
         self.__document_model = None
+        FileStorageSystem.clear_prefetched_storage_handler_scans()
+        StartupTrace.stop_tracing()
         PlugInManager.unload_plug_ins()
         commands_logger = logging.getLogger("_commands")
         commands_logger.info("# application shutdown")
@@ -420,16 +438,20 @@ class Application(UIApplication.BaseApplication):
 
         # create or load the profile object. allow test to override profile.
         is_created = False
+        profile_path_and_future = self.__profile_path_and_future
+        self.__profile_path_and_future = None
         if not profile:
             # determine the profile_path
-            if profile_dir:
-                profile_path = profile_dir / pathlib.Path("Profile").with_suffix(".nsproj")
+            profile_path = self.__get_profile_path(profile_dir)
+            # create the profile, or read it from the storage opened during initialize.
+            if profile_path_and_future and profile_path_and_future[0] == profile_path:
+                storage_system, cache_dir_path, is_created = profile_path_and_future[1].result()
+                profile = self.__read_profile(storage_system, cache_dir_path)
+                profile_path_and_future = None
             else:
-                data_dir = pathlib.Path(self.ui.get_data_location())
-                profile_name = pathlib.Path(self.ui.get_persistent_string("profile_name", "Profile"))
-                profile_path = data_dir / profile_name.with_suffix(".nsproj")
-            # create the profile
-            profile, is_created = self.__establish_profile(profile_path)
+                profile, is_created = self.__establish_profile(profile_path)
+        if profile_path_and_future:
+            profile_path_and_future[1].result()[0].close()
         self.__profile = profile
         assert self.__profile
 
@@ -517,10 +539,13 @@ class Application(UIApplication.BaseApplication):
 
             # launch the find existing projects task asynchronously.
             window_handler.window.event_loop.create_task(find_existing_projects())
+            FileStorageSystem.clear_prefetched_storage_handler_scans()
             return True
         else:
             # continue with opening the default project
-            return self.__open_default_project(profile_dir, is_created)
+            result = self.__open_default_project(profile_dir, is_created)
+            FileStorageSystem.clear_prefetched_storage_handler_scans()
+            return result
 
     def __show_project_error_dialog(self, title: str, message: str, *, completion_fn: typing.Optional[typing.Callable[[], None]] = None) -> None:
         # during project management dialogs, we want to prevent the application from closing.
@@ -592,7 +617,8 @@ class Application(UIApplication.BaseApplication):
     def open_project_window(self, project_reference: Profile.ProjectReference, update_last_project_reference: bool = True) -> DocumentController.DocumentController:
         assert self.__profile
 
-        self.__profile.read_project(project_reference)
+        with StartupTrace.trace_span("project open"):
+            self.__profile.read_project(project_reference)
 
         document_model = project_reference.document_model
         assert document_model
@@ -754,33 +780,102 @@ class Application(UIApplication.BaseApplication):
                                    display_item: typing.Optional[DisplayItem.DisplayItem] = None,
                                    project_reference: typing.Optional[Profile.ProjectReference] = None) -> DocumentController.DocumentController:
         self._set_document_model(document_model)  # required to allow API to find document model
-        document_controller = DocumentController.DocumentController(self.ui, document_model, workspace_id=workspace_id,
-                                                                    app=self, project_reference=project_reference)
-        self.document_model_available_event.fire(document_model)
-        # attempt to set data item / group
-        if display_item:
-            display_panel = document_controller.selected_display_panel
-            if display_panel:
-                display_panel.set_display_panel_display_item(display_item)
-        setattr(document_controller, "_dynamic_recent_project_actions", list())
-        # restore the ui state and geometry before show so that it pops up in the right location
-        document_controller.restore_ui_state_and_geometry()
+        with StartupTrace.trace_span("workspace restore"):
+            document_controller = DocumentController.DocumentController(self.ui, document_model, workspace_id=workspace_id,
+                                                                        app=self, project_reference=project_reference)
+            self.document_model_available_event.fire(document_model)
+            # attempt to set data item / group
+            if display_item:
+                display_panel = document_controller.selected_display_panel
+                if display_panel:
+                    display_panel.set_display_panel_display_item(display_item)
+            setattr(document_controller, "_dynamic_recent_project_actions", list())
+            # restore the ui state and geometry before show so that it pops up in the right location
+            document_controller.restore_ui_state_and_geometry()
         document_controller.show()
+        self.__trace_first_paint(document_controller)
         return document_controller
 
+    def __trace_first_paint(self, document_controller: DocumentController.DocumentController) -> None:
+        # the first paint is approximated by the first pass through the event loop after the window is shown. startup
+        # is complete at that point, so stop tracing, which writes the trace file.
+        tracer = StartupTrace.get_tracer()
+        if tracer:
+            start_ns = tracer.now()
+
+            def handle_first_paint() -> None:
+                tracer.add_span("first paint", start_ns, tracer.now())
+                StartupTrace.stop_tracing()
+
+            document_controller.event_loop.call_soon(handle_first_paint)
+
     def _set_profile_for_test(self, profile: typing.Optional[Profile.Profile]) -> None:
         self.__profile = profile
 
+    def __get_profile_path(self, profile_dir: typing.Optional[pathlib.Path]) -> pathlib.Path:
+        if profile_dir:
+            return profile_dir / pathlib.Path("Profile").with_suffix(".nsproj")
+        data_dir = pathlib.Path(self.ui.get_data_location())
+        profile_name = pathlib.Path(self.ui.get_persistent_string("profile_name", "Profile"))
+        # a profile with a long project history can be stored in SQLite, which writes only the changed items.
+        if self.ui.get_persistent_string("profile_storage", "json") == "sqlite":
+            return data_dir / profile_name.with_suffix(".nsprofdb")
+        return data_dir / profile_name.with_suffix(".nsproj")
+
+    def __open_profile_storage_and_prefetch_project(self, profile_path: pathlib.Path) -> typing.Tuple[Persistence.PersistentStorageInterface, pathlib.Path, bool]:
+        # runs on a thread while the plug-ins are imported. the profile itself is read on the main thread after the
+        # plug-ins are loaded, since plug-ins may provide project reference types. prefetch the storage handler scan
+        # of the project that will most likely be opened if its project reference is a built-in type.
+        storage_system, cache_dir_path, is_created = self.__open_profile_storage(profile_path)
+        properties = storage_system.get_storage_properties()
+        last_project_reference_uuid_str = properties.get("last_project_reference") if properties else None
+        if properties and last_project_reference_uuid_str:
+            try:
+                project_reference = Profile.read_built_in_project_reference(properties, uuid.UUID(last_project_reference_uuid_str))
+                if project_reference:
+                    try:
+                        if project_reference.is_valid:
+                            with StartupTrace.trace_span("storage handler scan", args={"prefetch": True}):
+                                project_reference.prefetch_project(None)
+                    finally:
+                        project_reference.close()
+            except Exception as e:
+                # the scan is repeated when the project is read.
+                logging.getLogger("loader").debug(f"Unable to prefetch project {last_project_reference_uuid_str}: {e}")
+        return storage_system, cache_dir_path, is_created
+
     def __establish_profile(self, profile_path: pathlib.Path) -> typing.Tuple[typing.Optional[Profile.Profile], bool]:
+        storage_system, cache_dir_path, is_created = self.__open_profile_storage(profile_path)
+        return self.__read_profile(storage_system, cache_dir_path), is_created
+
+    def __open_profile_storage(self, profile_path: pathlib.Path) -> typing.Tuple[Persistence.PersistentStorageInterface, pathlib.Path, bool]:
+        with StartupTrace.trace_span("profile storage read"):
+            return self.__open_profile_storage_inner(profile_path)
+
+    def __open_profile_storage_inner(self, profile_path: pathlib.Path) -> typing.Tuple[Persistence.PersistentStorageInterface, pathlib.Path, bool]:
         assert profile_path.is_absolute()  # prevents tests from creating temporary files in test directory
         create_new_profile = not profile_path.exists()
         if create_new_profile:
             logging.getLogger("loader").info(f"Creating new profile {profile_path}")
-            profile_json = json.dumps({"version": FileStorageSystem.PROFILE_VERSION, "uuid": str(uuid.uuid4())})
-            profile_path.write_text(profile_json, "utf-8")
         else:
             logging.getLogger("loader").info(f"Using existing profile {profile_path}")
-        storage_system = FileStorageSystem.make_file_persistent_storage_system(profile_path)
+        profile_properties: Persistence.PersistentDictType = {"version": FileStorageSystem.PROFILE_VERSION, "uuid": str(uuid.uuid4())}
+        storage_system: Persistence.PersistentStorageInterface
+        if profile_path.suffix == ".nsprofdb":
+            sqlite_storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            if create_new_profile:
+                # import the json profile, if any, so that the project references are kept.
+                json_profile_path = profile_path.with_suffix(".nsproj")
+                if json_profile_path.exists():
+                    logging.getLogger("loader").info(f"Importing profile {json_profile_path}")
+                    profile_properties = json.loads(json_profile_path.read_text("utf-8"))
+                sqlite_storage_system.set_properties(profile_properties)
+            storage_system = sqlite_storage_system
+        else:
+            if create_new_profile:
+                profile_path.write_text(json.dumps(profile_properties), "utf-8")
+            # write the profile on a thread once changes settle so that switching projects does not wait on the file.
+            storage_system = FileStorageSystem.make_file_persistent_storage_system(profile_path, write_delay=1.0)
         storage_system.load_properties()
         old_cache_path = profile_path.parent / pathlib.Path(profile_path.stem + " Cache").with_suffix(".nscache")
         if old_cache_path.exists():
@@ -788,9 +883,14 @@ class Application(UIApplication.BaseApplication):
             old_cache_path.unlink()
         cache_dir_path = profile_path.parent / "Cache"
         cache_dir_path.mkdir(parents=True, exist_ok=True)
-        profile = Profile.Profile(self.event_loop, storage_system=storage_system, cache_dir_path=cache_dir_path)
-        profile.read_profile()
-        return profile, create_new_profile
+        return storage_system, cache_dir_path, create_new_profile
+
+    def __read_profile(self, storage_system: Persistence.PersistentStorageInterface, cache_dir_path: pathlib.Path) -> typing.Optional[Profile.Profile]:
+        # reading the project references may use the project reference factory hook. call after the plug-ins are loaded.
+        with StartupTrace.trace_span("profile read"):
+            profile = Profile.Profile(self.event_loop, storage_system=storage_system, cache_dir_path=cache_dir_path)
+            profile.read_profile()
+            return profile
 
     @property
     def document_controllers(self) -> typing.List[DocumentController.DocumentController]:
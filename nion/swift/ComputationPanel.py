@@ -24,7 +24,6 @@ from nion.swift import Inspector
 from nion.swift import MimeTypes
 from nion.swift import NotificationDialog
 from nion.swift import Undo
-from nion.swift.model import Changes
 from nion.swift.model import DataItem
 from nion.swift.model import DisplayItem
 from nion.swift.model import DocumentModel
@@ -1103,22 +1102,18 @@ class RemoveComputationCommand(Undo.UndoableCommand):
         self.__old_workspace_layout: typing.Optional[Persistence.PersistentDictType] = workspace_controller.deconstruct()
         self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
         self.__computation_index = document_controller.document_model.computations.index(computation)
-        self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
         self.initialize()
 
     def close(self) -> None:
         self.__document_controller = typing.cast(typing.Any, None)
         self.__old_workspace_layout = None
         self.__new_workspace_layout = None
-        for undelete_log in self.__undelete_logs:
-            undelete_log.close()
-        self.__undelete_logs = typing.cast(typing.Any, None)
         super().close()
 
     def _perform(self) -> None:
         document_model = self.__document_controller.document_model
         computation = document_model.computations[self.__computation_index]
-        self.__undelete_logs.append(document_model.remove_computation_with_log(computation))
+        self._add_undelete_log(document_model, document_model.remove_computation_with_log(computation))
 
     def _get_modified_state(self) -> typing.Any:
         return self.__document_controller.document_model.modified_state
@@ -1130,10 +1125,7 @@ class RemoveComputationCommand(Undo.UndoableCommand):
         workspace_controller = self.__document_controller.workspace_controller
         if workspace_controller:
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             if self.__old_workspace_layout is not None:
                 workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -392,6 +392,15 @@ class DataPanel(Panel.Panel):
         self.__display_items_begin_changes_listener = display_items_model.begin_changes_event.listen(begin_changes)
         self.__display_items_end_changes_listener = display_items_model.end_changes_event.listen(end_changes)
 
+        # report the display items visible in the list or grid so that their thumbnails are rendered first. the
+        # visible items change when scrolling, resizing, switching between list and grid, or changing the items.
+        def update_visible_display_items(*args: typing.Any) -> None:
+            self.__update_visible_display_items()
+
+        self.__list_content_updated_listener = list_scroll_area_canvas_item.content_updated_event.listen(update_visible_display_items)
+        self.__grid_content_updated_listener = grid_scroll_area_canvas_item.content_updated_event.listen(update_visible_display_items)
+        self.__display_items_end_changes_visible_listener = display_items_model.end_changes_event.listen(update_visible_display_items)
+
         # for testing
         self._scroll_area_canvas_item = list_scroll_area_canvas_item
         self._scroll_bar_canvas_item = list_scroll_bar_canvas_item
@@ -439,7 +448,12 @@ class DataPanel(Panel.Panel):
 
         self.__view_button_group = CanvasItem.RadioButtonGroup([list_icon_button, grid_icon_button])
         self.__view_button_group.current_index = 0
-        self.__view_button_group.on_current_index_changed = lambda index: setattr(stack_canvas_item, "current_index", index)
+
+        def view_index_changed(index: int) -> None:
+            stack_canvas_item.current_index = index
+            self.__update_visible_display_items()
+
+        self.__view_button_group.on_current_index_changed = view_index_changed
 
         self.__filter_description_combo_box = ui.create_combo_box_widget(item_getter=operator.attrgetter("title"))
 
@@ -468,6 +482,9 @@ class DataPanel(Panel.Panel):
 
         self.__list_canvas_item = list_canvas_item
         self.__grid_canvas_item = grid_canvas_item
+        self.__list_scroll_area_canvas_item = list_scroll_area_canvas_item
+        self.__grid_scroll_area_canvas_item = grid_scroll_area_canvas_item
+        self.__stack_canvas_item = stack_canvas_item
 
         # listen to the focus changed event for the list and grid canvas items.
         # if we are receiving focus, tell the window (document_controller) to update the selected display item.
@@ -507,6 +524,10 @@ class DataPanel(Panel.Panel):
         self.__filter_description_action = typing.cast(typing.Any, None)
         self.__view_button_group.close()
         self.__view_button_group = typing.cast(CanvasItem.RadioButtonGroup, None)
+        self.__list_content_updated_listener = typing.cast(typing.Any, None)
+        self.__grid_content_updated_listener = typing.cast(typing.Any, None)
+        self.__display_items_end_changes_visible_listener = typing.cast(typing.Any, None)
+        Thumbnails.ThumbnailManager().set_visible_display_items(self, list())
         # close the widget to stop repainting the widgets before closing the controllers.
         super().close()
 
@@ -522,6 +543,31 @@ class DataPanel(Panel.Panel):
     def _grid_canvas_item(self) -> GridCanvasItem.GridCanvasItem2:
         return self.__grid_canvas_item
 
+    @property
+    def _visible_display_items(self) -> typing.Sequence[DisplayItem.DisplayItem]:
+        # the display items visible in the current view (list or grid). calculated from the scroll position and the
+        # item layout rather than by testing each item.
+        if self.__stack_canvas_item.current_index == 0:
+            scroll_area_canvas_item = self.__list_scroll_area_canvas_item
+            canvas_item: GridFlowCanvasItem.GridFlowCanvasItem = self.__list_canvas_item
+        else:
+            scroll_area_canvas_item = self.__grid_scroll_area_canvas_item
+            canvas_item = self.__grid_canvas_item
+        items = canvas_item._list_model.items
+        canvas_size = canvas_item.canvas_size
+        scroll_area_size = scroll_area_canvas_item.canvas_size
+        if not items or not canvas_size or not scroll_area_size or scroll_area_size.height <= 0 or scroll_area_size.width <= 0:
+            return list()
+        visible_rect = Geometry.IntRect(origin=-scroll_area_canvas_item.content_origin, size=scroll_area_size)
+        first_index = canvas_item._get_index_for_point(visible_rect.top_left, canvas_size)
+        last_index = canvas_item._get_index_for_point(visible_rect.bottom_right - Geometry.IntSize(1, 1), canvas_size)
+        first_index = max(0, min(first_index, len(items) - 1))
+        last_index = max(0, min(last_index, len(items) - 1))
+        return [typing.cast(DisplayItem.DisplayItem, item) for item in items[first_index:last_index + 1]]
+
+    def __update_visible_display_items(self) -> None:
+        Thumbnails.ThumbnailManager().set_visible_display_items(self, self._visible_display_items)
+
     def __notify_focus_changed(self) -> None:
         # this is called when the keyboard focus for the data panel is changed.
         # if we are receiving focus, tell the window (document_controller) that
@@ -1155,16 +1155,12 @@ class InsertGraphicsCommand(Undo.UndoableCommand):
         self.__graphics = graphics  # only used for perform
         self.__graphics_properties = None
         self.__graphic_proxies = [graphic.create_proxy() for graphic in existing_graphics or list()]
-        self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
         self.__allow_secondary_copy = allow_secondary_copy
         self.initialize(display_item_modified_state)
 
     def close(self) -> None:
         self.__graphics_properties = None
         self.__document_controller = typing.cast(typing.Any, None)
-        for undelete_log in self.__undelete_logs:
-            undelete_log.close()
-        self.__undelete_logs = typing.cast(typing.Any, None)
         for graphic_proxy in self.__graphic_proxies:
             graphic_proxy.close()
         self.__graphic_proxies = typing.cast(typing.Any, None)
@@ -1197,10 +1193,7 @@ class InsertGraphicsCommand(Undo.UndoableCommand):
             display_item.modified_state = modified_state
 
     def _redo(self) -> None:
-        for undelete_log in reversed(self.__undelete_logs):
-            self.__document_controller.document_model.undelete_all(undelete_log)
-            undelete_log.close()
-        self.__undelete_logs.clear()
+        self._undelete_all()
 
     def _undo(self) -> None:
         display_item = self.__display_item_proxy.item
@@ -1208,7 +1201,7 @@ class InsertGraphicsCommand(Undo.UndoableCommand):
             graphics = [graphic_proxy.item for graphic_proxy in self.__graphic_proxies]
             for graphic in graphics:
                 if graphic:
-                    self.__undelete_logs.append(display_item.remove_graphic(graphic, safe=True))
+                    self._add_undelete_log(self.__document_controller.document_model, display_item.remove_graphic(graphic, safe=True))
 
 
 class AppendDisplayDataChannelCommand(Undo.UndoableCommand):
@@ -1386,7 +1379,6 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
         self.__new_legend_position = new_display_item.get_display_property("legend_position")
         self.__new_display_item_proxy = new_display_item.create_proxy()
         self.__new_display_layer_index = new_display_layer_index
-        self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
         self.initialize()
 
     def close(self) -> None:
@@ -1395,9 +1387,6 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
         self.__old_display_item_proxy = typing.cast(typing.Any, None)
         self.__new_display_item_proxy.close()
         self.__new_display_item_proxy = typing.cast(typing.Any, None)
-        for undelete_log in self.__undelete_logs:
-            undelete_log.close()
-        self.__undelete_logs = typing.cast(typing.Any, None)
         super().close()
 
     def _perform(self) -> None:
@@ -1422,7 +1411,7 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
         undelete_log = Changes.UndeleteLog()
         undelete_log.append(SetDisplayPropertyUndo(new_display_item, "legend_position"))
         undelete_log.append(SetDisplayPropertyUndo(old_display_item, "legend_position"))
-        self.__undelete_logs.append(undelete_log)
+        self._add_undelete_log(self.__document_model, undelete_log)
         # create a copy of the old display data channel and add it
         old_display_data_channel = old_display_item.display_data_channels[old_display_data_channel_index]
         if old_display_item != new_display_item:
@@ -1430,7 +1419,7 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
             new_display_item.append_display_data_channel(new_display_data_channel)
             undelete_log = Changes.UndeleteLog()
             undelete_log.append(AppendDisplayDataChannelUndo(new_display_item, new_display_data_channel))
-            self.__undelete_logs.append(undelete_log)
+            self._add_undelete_log(self.__document_model, undelete_log)
         else:
             new_display_data_channel = old_display_data_channel
         # adjust indexes if inserting into the same display item
@@ -1440,15 +1429,15 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
         new_display_item.insert_display_layer_for_display_data_channel(new_display_layer_index, new_display_data_channel, **old_display_layer_properties)
         undelete_log = Changes.UndeleteLog()
         undelete_log.append(AppendDisplayLayerUndo(new_display_item, new_display_item.display_layers[new_display_layer_index]))
-        self.__undelete_logs.append(undelete_log)
+        self._add_undelete_log(self.__document_model, undelete_log)
         # adjust indexes if inserting into the same display item
         if old_display_item == new_display_item and new_display_layer_index <= old_display_layer_index:
             old_display_layer_index += 1
         # remove the old display layer
-        self.__undelete_logs.append(old_display_item.remove_display_layer(old_display_layer_index))
+        self._add_undelete_log(self.__document_model, old_display_item.remove_display_layer(old_display_layer_index))
         # old display data channels will be removed when the last referencing display layer is removed by cascade.
         # if new_display_data_channel != old_display_data_channel and old_display_item.get_display_data_channel_layer_use_count(old_display_data_channel) == 0:
-        #     self.__undelete_logs.append(old_display_item.remove_display_data_channel(old_display_data_channel))
+        #     self._add_undelete_log(self.__document_model, old_display_item.remove_display_data_channel(old_display_data_channel))
         # update the legend
         new_display_item.auto_display_legend()
         old_display_item.auto_display_legend()
@@ -1474,10 +1463,7 @@ class MoveDisplayLayerCommand(Undo.UndoableCommand):
         return bool(state1[0] == state2[0]) and bool(state1[1] == state2[1])
 
     def _undo(self) -> None:
-        for undelete_log in reversed(self.__undelete_logs):
-            self.__document_model.undelete_all(undelete_log)
-            undelete_log.close()
-        self.__undelete_logs.clear()
+        self._undelete_all()
 
     def _redo(self) -> None:
         self.perform()
@@ -1539,7 +1525,6 @@ class RemoveDisplayLayerCommand(Undo.UndoableCommand):
         self.__old_properties = display_item.save_properties()
         self.__display_item_proxy = display_item.create_proxy()
         self.__index = index
-        self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
         self.initialize()
 
     def close(self) -> None:
@@ -1547,16 +1532,13 @@ class RemoveDisplayLayerCommand(Undo.UndoableCommand):
         self.__old_properties = typing.cast(typing.Any, None)
         self.__display_item_proxy.close()
         self.__display_item_proxy = typing.cast(typing.Any, None)
-        for undelete_log in self.__undelete_logs:
-            undelete_log.close()
-        self.__undelete_logs = typing.cast(typing.Any, None)
         super().close()
 
     def _perform(self) -> None:
         # add display data channel and display layer to new display item
         display_item = self.__display_item_proxy.item
         if display_item:
-            self.__undelete_logs.append(display_item.remove_display_layer(self.__index))
+            self._add_undelete_log(self.__document_model, display_item.remove_display_layer(self.__index))
             display_item.auto_display_legend()
 
     def _get_modified_state(self) -> typing.Any:
@@ -1574,10 +1556,7 @@ class RemoveDisplayLayerCommand(Undo.UndoableCommand):
         # remove the new display layer and restore properties
         display_item = self.__display_item_proxy.item
         if display_item:
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             display_item.restore_properties(self.__old_properties)
 
     def _redo(self) -> None:
@@ -41,7 +41,7 @@ from nion.swift import ScriptsDialog
 from nion.swift import Task
 from nion.swift import Undo
 from nion.swift import Workspace
-from nion.swift.model import Changes
+from nion.swift.model import Activity
 from nion.swift.model import DataGroup
 from nion.swift.model import DataItem
 from nion.swift.model import DisplayItem
@@ -1014,7 +1014,7 @@ class DocumentController(Window.Window):
                 if extension[1:] in reader.extensions:
                     readable_file_paths.append(file_path)
                     break  # skip other readers
-        self.receive_files(readable_file_paths)
+        self.event_loop.create_task(self.receive_files_async(readable_file_paths))
 
     def import_file(self) -> None:
         # present a loadfile dialog to the user
@@ -1032,7 +1032,7 @@ class DocumentController(Window.Window):
         paths, selected_filter, selected_directory = self.get_file_paths_dialog(_("Import File(s)"), import_dir, filter)
         if len(paths) > 0:
             self.ui.set_persistent_string("import_directory", selected_directory)
-            self.receive_files(paths)
+            self.event_loop.create_task(self.receive_files_async(paths))
 
     def export_file(self, display_item: DisplayItem.DisplayItem) -> None:
         # present a loadfile dialog to the user
@@ -1239,7 +1239,6 @@ class DocumentController(Window.Window):
             self.__display_item_proxy: typing.Optional[Persistence.PersistentObjectProxy[DisplayItem.DisplayItem]] = None
             self.__display_item = display_item
             self.__display_panel = display_panel
-            self.__undelete_log: typing.Optional[Changes.UndeleteLog] = None
             self.initialize()
 
         def close(self) -> None:
@@ -1249,9 +1248,6 @@ class DocumentController(Window.Window):
                 self.__display_item_proxy = None
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
-            if self.__undelete_log:
-                self.__undelete_log.close()
-                self.__undelete_log = None
             self.__display_panel = typing.cast(typing.Any, None)
             super().close()
 
@@ -1267,10 +1263,7 @@ class DocumentController(Window.Window):
             self.__document_controller.document_model.modified_state = modified_state
 
         def _redo(self) -> None:
-            assert self.__undelete_log
-            self.__document_controller.document_model.undelete_all(self.__undelete_log)
-            self.__undelete_log.close()
-            self.__undelete_log = None
+            self._undelete_all()
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             assert self.__new_workspace_layout is not None
@@ -1282,7 +1275,8 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            self.__undelete_log = self.__document_controller.document_model.remove_display_item_with_log(display_item)
+            document_model = self.__document_controller.document_model
+            self._add_undelete_log(document_model, document_model.remove_display_item_with_log(display_item))
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -1377,7 +1371,6 @@ class DocumentController(Window.Window):
             self.__data_items = data_items  # only in perform
             self.__display_item_index = index
             self.__display_item_indexes: typing.List[int] = list()
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
@@ -1386,9 +1379,6 @@ class DocumentController(Window.Window):
             for display_item_proxy in self.__data_group_display_item_proxies:
                 display_item_proxy.close()
             self.__data_group_display_item_proxies = typing.cast(typing.Any, None)
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             self.__data_group_proxy.close()
             self.__data_group_proxy = typing.cast(typing.Any, None)
             super().close()
@@ -1434,15 +1424,12 @@ class DocumentController(Window.Window):
             display_items = [document_model.display_items[index] for index in self.__display_item_indexes]
             for display_item in display_items:
                 if display_item in document_model.display_items:
-                    self.__undelete_logs.append(document_model.remove_display_item_with_log(display_item))
+                    self._add_undelete_log(document_model, document_model.remove_display_item_with_log(display_item))
 
         def _redo(self) -> None:
             data_group = self.__data_group_proxy.item
             assert data_group
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             index = self.__display_item_index
             display_items = [display_item_proxy.item for display_item_proxy in reversed(self.__data_group_display_item_proxies)]
             for display_item in display_items:
@@ -1859,7 +1846,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout: typing.Optional[Persistence.PersistentDictType] = workspace_controller.deconstruct() if workspace_controller else None
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__graphic_indexes = [display_item.graphics.index(graphic) for graphic in graphics]
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
@@ -1869,9 +1855,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
             self.__graphic_indexes = typing.cast(typing.Any, None)
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             super().close()
 
         def _perform(self) -> None:
@@ -1879,7 +1862,7 @@ class DocumentController(Window.Window):
             if display_item:
                 graphics = [display_item.graphics[index] for index in self.__graphic_indexes]
                 for graphic in graphics:
-                    self.__undelete_logs.append(display_item.remove_graphic(graphic, safe=True))
+                    self._add_undelete_log(self.__document_controller.document_model, display_item.remove_graphic(graphic, safe=True))
 
         def _get_modified_state(self) -> typing.Any:
             display_item = self.__display_item_proxy.item
@@ -1895,10 +1878,7 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -1926,7 +1906,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout: typing.Optional[Persistence.PersistentDictType] = workspace_controller.deconstruct() if workspace_controller else None
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__display_item_indexes = [document_controller.document_model.display_items.index(display_item) for display_item in display_items]
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
@@ -1934,9 +1913,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
             self.__display_item_indexes = typing.cast(typing.Any, None)
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             super().close()
 
         def _perform(self) -> None:
@@ -1947,7 +1923,7 @@ class DocumentController(Window.Window):
                     selected_display_items = list(self.__document_controller.selected_display_items)
                     if display_item in selected_display_items:
                         selected_display_items.remove(display_item)
-                    self.__undelete_logs.append(document_model.remove_display_item_with_log(display_item))
+                    self._add_undelete_log(document_model, document_model.remove_display_item_with_log(display_item))
                     self.__document_controller.select_display_items_in_data_panel(selected_display_items)
 
         def _get_modified_state(self) -> typing.Any:
@@ -1960,10 +1936,7 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -1986,7 +1959,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout: typing.Optional[Persistence.PersistentDictType] = workspace_controller.deconstruct() if workspace_controller else None
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__data_item_indexes = [document_controller.document_model.data_items.index(data_item) for data_item in data_items]
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
@@ -1994,9 +1966,6 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
             self.__data_item_indexes = typing.cast(typing.Any, None)
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             super().close()
 
         def _perform(self) -> None:
@@ -2004,7 +1973,7 @@ class DocumentController(Window.Window):
             data_items = [document_model.data_items[index] for index in self.__data_item_indexes]
             for data_item in data_items:
                 if data_item in document_model.data_items:
-                    self.__undelete_logs.append(document_model.remove_data_item_with_log(data_item, safe=True))
+                    self._add_undelete_log(document_model, document_model.remove_data_item_with_log(data_item, safe=True))
 
         def _get_modified_state(self) -> typing.Any:
             return self.__document_controller.document_model.modified_state
@@ -2016,10 +1985,7 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -2262,7 +2228,6 @@ class DocumentController(Window.Window):
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__data_item_proxy: typing.Optional[Persistence.PersistentObjectProxy[DataItem.DataItem]] = None
             self.__data_item_fn = data_item_fn
-            self.__undelete_log: typing.Optional[Changes.UndeleteLog] = None
             self.initialize()
 
         def close(self) -> None:
@@ -2270,9 +2235,6 @@ class DocumentController(Window.Window):
             self.__data_item_fn = typing.cast(typing.Any, None)
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
-            if self.__undelete_log:
-                self.__undelete_log.close()
-                self.__undelete_log = None
             if self.__data_item_proxy:
                 self.__data_item_proxy.close()
                 self.__data_item_proxy = None
@@ -2298,10 +2260,7 @@ class DocumentController(Window.Window):
             return True
 
         def _redo(self) -> None:
-            assert self.__undelete_log
-            self.__document_controller.document_model.undelete_all(self.__undelete_log)
-            self.__undelete_log.close()
-            self.__undelete_log = None
+            self._undelete_all()
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             assert self.__new_workspace_layout is not None
@@ -2313,7 +2272,8 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            self.__undelete_log = self.__document_controller.document_model.remove_data_item_with_log(data_item, safe=True)
+            document_model = self.__document_controller.document_model
+            self._add_undelete_log(document_model, document_model.remove_data_item_with_log(data_item, safe=True))
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -2347,7 +2307,6 @@ class DocumentController(Window.Window):
             self.__display_item_proxy: typing.Optional[Persistence.PersistentObjectProxy[DisplayItem.DisplayItem]] = None
             self.__display_item = display_item
             self.__display_item_fn = display_item_fn
-            self.__undelete_log: typing.Optional[Changes.UndeleteLog] = None
             self.initialize()
 
         def close(self) -> None:
@@ -2357,9 +2316,6 @@ class DocumentController(Window.Window):
                 self.__display_item_proxy = None
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
-            if self.__undelete_log:
-                self.__undelete_log.close()
-                self.__undelete_log = None
             super().close()
 
         def _perform(self) -> None:
@@ -2378,10 +2334,7 @@ class DocumentController(Window.Window):
             self.__document_controller.document_model.modified_state = modified_state
 
         def _redo(self) -> None:
-            assert self.__undelete_log
-            self.__document_controller.document_model.undelete_all(self.__undelete_log)
-            self.__undelete_log.close()
-            self.__undelete_log = None
+            self._undelete_all()
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             assert self.__new_workspace_layout is not None
@@ -2393,7 +2346,8 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            self.__undelete_log = self.__document_controller.document_model.remove_display_item_with_log(display_item)
+            document_model = self.__document_controller.document_model
+            self._add_undelete_log(document_model, document_model.remove_display_item_with_log(display_item))
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -2426,22 +2380,18 @@ class DocumentController(Window.Window):
             self.__old_workspace_layout: typing.Optional[Persistence.PersistentDictType] = workspace_controller.deconstruct() if workspace_controller else None
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__display_item_index = document_controller.document_model.display_items.index(display_item)
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
             self.__document_controller = typing.cast(typing.Any, None)
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             super().close()
 
         def _perform(self) -> None:
             document_model = self.__document_controller.document_model
             display_item = document_model.display_items[self.__display_item_index]
-            self.__undelete_logs.append(document_model.remove_display_item_with_log(display_item))
+            self._add_undelete_log(document_model, document_model.remove_display_item_with_log(display_item))
 
         def _get_modified_state(self) -> typing.Any:
             return self.__document_controller.document_model.modified_state
@@ -2453,10 +2403,7 @@ class DocumentController(Window.Window):
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -2652,7 +2599,6 @@ class DocumentController(Window.Window):
             self.__data_item_indexes: typing.List[int] = list()
             self.__display_panel = display_panel  # only used in perform
             self.__project = project
-            self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
             self.initialize()
 
         def close(self) -> None:
@@ -2661,9 +2607,6 @@ class DocumentController(Window.Window):
             self.__new_workspace_layout = None
             self.__data_items = typing.cast(typing.Any, None)
             self.__data_item_index = typing.cast(typing.Any, None)
-            for undelete_log in self.__undelete_logs:
-                undelete_log.close()
-            self.__undelete_logs = typing.cast(typing.Any, None)
             super().close()
 
         def _perform(self) -> None:
@@ -2687,10 +2630,7 @@ class DocumentController(Window.Window):
             self.__document_controller.document_model.modified_state = modified_state
 
         def _redo(self) -> None:
-            for undelete_log in reversed(self.__undelete_logs):
-                self.__document_controller.document_model.undelete_all(undelete_log)
-                undelete_log.close()
-            self.__undelete_logs.clear()
+            self._undelete_all()
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             assert self.__new_workspace_layout is not None
@@ -2704,7 +2644,7 @@ class DocumentController(Window.Window):
             data_items = [document_model.data_items[index] for index in self.__data_item_indexes]
             for data_item in data_items:
                 if data_item in document_model.data_items:
-                    self.__undelete_logs.append(document_model.remove_data_item_with_log(data_item, safe=True))
+                    self._add_undelete_log(document_model, document_model.remove_data_item_with_log(data_item, safe=True))
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -2714,69 +2654,96 @@ class DocumentController(Window.Window):
     # specified by the index. if the data group is not specified, the item is added
     # at the index within the document model.
     def receive_files(self, files: typing.Sequence[str], data_group: typing.Optional[DataGroup.DataGroup] = None, index: int = -1) -> typing.Sequence[DisplayItem.DisplayItem]:
-        display_items = list[DisplayItem.DisplayItem]()
         file_paths = [pathlib.Path(file_path) for file_path in files]
-        for file_index, file_path in enumerate(file_paths):
-            try:
-                document_model = self.document_model
-                project = document_model._project
-                # first ask the import system to return the import data, which contains the data items in the form of
-                # storage handlers, the display items in the form of dictionaries, and a map of old uuid's to new
-                # ones. the storage handlers are created from the project storage system of the document model for
-                # this document controller. all imported objects are guaranteed to be fully independent of existing
-                # objects with new uuid's. all source properties are cleared.
-                import_data = ImportExportManager.ImportExportManager().read_import_data(file_path, project.project_storage_system)
-                # keep a list of data items for bookkeeping.
-                data_items = list[DataItem.DataItem]()
-                # make a copy of the uuid_map so it can be modified as needed.
-                uuid_map = dict(import_data.uuid_map)
-                # iterate over the storage handlers and read the properties from each one. then register the storage
-                # handler with the project storage system and load the data item from the properties. if the data item
-                # is successfully loaded, add it to the list of data items.
-                for storage_handler in import_data.storage_handlers:
-                    data_item_properties = storage_handler.read_properties()
-                    project.project_storage_system.register_storage_handler(storage_handler, data_item_properties)
-                    loaded_data_item = project._load_data_item(data_item_properties)
-                    if loaded_data_item:
-                        data_items.append(loaded_data_item)
-                # keep a list of display items for bookkeeping.
-                display_items = list[DisplayItem.DisplayItem]()
-                for item_d in import_data.items:
-                    if item_d.get("type") == "display_item":
-                        # create a new display item and read it from the dictionary.
-                        display_item_ = DisplayItem.DisplayItem()
-                        display_item_.begin_reading()
-                        display_item_.read_from_dict(item_d)
-                        display_item_.finish_reading()
-                        # update the uuids for the display item.
-                        display_item_.update_uuids(uuid_map)
-                        # add the display item to the document model.
-                        document_model.append_display_item(display_item_)
-                        display_items.append(display_item_)
-                # after loading, ensure the title gets updated properly.
-                for data_item in data_items:
-                    data_item.source_data_items_changed(document_model.get_source_data_items(data_item))
-                # after loading, ensure the display data stream gets updated properly.
-                for display_item_ in display_items:
-                    display_item_.finish_project_read()
-                # after loading, any data items without a display get one. also add to the group, if desired.
-                for data_item in data_items:
-                    display_item = document_model.get_display_item_for_data_item(data_item)
-                    if not display_item:
-                        display_item = DisplayItem.DisplayItem(data_item=data_item)
-                        document_model.append_display_item(display_item)
-                    if data_group:
-                        data_group.insert_display_item(index, display_item)
-                        index += 1
-                    else:
-                        display_items.append(display_item)
-            except Exception as e:
-                logging.debug(f"Could not read image {file_path} / {e}")
-                traceback.print_exc()
-                traceback.print_stack()
+        activity = ImportExportManager.ImportActivity(len(file_paths))
+        Activity.append_activity(activity)
+        try:
+            # ask the import system to return the import data for each file, decoding the files in parallel. the import
+            # data contains the data items in the form of storage handlers, the display items in the form of
+            # dictionaries, and a map of old uuid's to new ones. the storage handlers are created from the project
+            # storage system of the document model for this document controller. all imported objects are
+            # guaranteed to be fully independent of existing objects with new uuid's. all source properties are cleared.
+            import_data_list = ImportExportManager.ImportExportManager().read_import_data_batch(file_paths, self.document_model._project.project_storage_system, activity=activity)
+            display_items = self.__insert_import_data(import_data_list, data_group, index)
+        finally:
+            Activity.activity_finished(activity)
         self.select_display_items_in_data_panel(display_items)
         return display_items
 
+    async def receive_files_async(self, files: typing.Sequence[str], data_group: typing.Optional[DataGroup.DataGroup] = None, index: int = -1) -> typing.Sequence[DisplayItem.DisplayItem]:
+        # like receive_files, but the files are decoded without blocking the user interface so that the import
+        # activity can show progress and be cancelled. the imported items are inserted on the main thread.
+        file_paths = [pathlib.Path(file_path) for file_path in files]
+        activity = ImportExportManager.ImportActivity(len(file_paths))
+        Activity.append_activity(activity)
+        try:
+            read_import_data_batch = functools.partial(ImportExportManager.ImportExportManager().read_import_data_batch, file_paths, self.document_model._project.project_storage_system, activity=activity)
+            import_data_list = await self.event_loop.run_in_executor(None, read_import_data_batch)
+            display_items = self.__insert_import_data(import_data_list, data_group, index)
+        finally:
+            Activity.activity_finished(activity)
+        self.select_display_items_in_data_panel(display_items)
+        return display_items
+
+    def __insert_import_data(self, import_data_list: typing.Sequence[typing.Tuple[pathlib.Path, ImportExportManager.ImportData]], data_group: typing.Optional[DataGroup.DataGroup], index: int) -> typing.List[DisplayItem.DisplayItem]:
+        # insert all of the imported items within one transaction so that the project index is written once.
+        document_model = self.document_model
+        project = document_model._project
+        all_display_items = list[DisplayItem.DisplayItem]()
+        with document_model.transaction_context():
+            for file_path, import_data in import_data_list:
+                try:
+                    # keep a list of data items for bookkeeping.
+                    data_items = list[DataItem.DataItem]()
+                    # make a copy of the uuid_map so it can be modified as needed.
+                    uuid_map = dict(import_data.uuid_map)
+                    # iterate over the storage handlers and read the properties from each one. then register the storage
+                    # handler with the project storage system and load the data item from the properties. if the data item
+                    # is successfully loaded, add it to the list of data items.
+                    for storage_handler in import_data.storage_handlers:
+                        data_item_properties = storage_handler.read_properties()
+                        project.project_storage_system.register_storage_handler(storage_handler, data_item_properties)
+                        loaded_data_item = project._load_data_item(data_item_properties)
+                        if loaded_data_item:
+                            data_items.append(loaded_data_item)
+                    # keep a list of display items for bookkeeping.
+                    display_items = list[DisplayItem.DisplayItem]()
+                    for item_d in import_data.items:
+                        if item_d.get("type") == "display_item":
+                            # create a new display item and read it from the dictionary.
+                            display_item_ = DisplayItem.DisplayItem()
+                            display_item_.begin_reading()
+                            display_item_.read_from_dict(item_d)
+                            display_item_.finish_reading()
+                            # update the uuids for the display item.
+                            display_item_.update_uuids(uuid_map)
+                            # add the display item to the document model.
+                            document_model.append_display_item(display_item_)
+                            display_items.append(display_item_)
+                    # after loading, ensure the title gets updated properly.
+                    for data_item in data_items:
+                        data_item.source_data_items_changed(document_model.get_source_data_items(data_item))
+                    # after loading, ensure the display data stream gets updated properly.
+                    for display_item_ in display_items:
+                        display_item_.finish_project_read()
+                    # after loading, any data items without a display get one. also add to the group, if desired.
+                    for data_item in data_items:
+                        display_item = document_model.get_display_item_for_data_item(data_item)
+                        if not display_item:
+                            display_item = DisplayItem.DisplayItem(data_item=data_item)
+                            document_model.append_display_item(display_item)
+                        if data_group:
+                            data_group.insert_display_item(index, display_item)
+                            index += 1
+                        else:
+                            display_items.append(display_item)
+                    all_display_items.extend(display_items)
+                except Exception as e:
+                    logging.debug(f"Could not read image {file_path} / {e}")
+                    traceback.print_exc()
+                    traceback.print_stack()
+        return all_display_items
+
     def create_context_menu_for_display(self, display_items: typing.List[DisplayItem.DisplayItem]) -> UserInterface.Menu:
         # only used in tests
         menu = self.create_context_menu()
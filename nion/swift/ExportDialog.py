@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 # standard libraries
+import concurrent.futures
 import dataclasses
 import enum
 import gettext
@@ -18,6 +19,7 @@ import unicodedata
 # None
 
 # local libraries
+from nion.swift.model import Activity
 from nion.swift.model import ImportExportManager
 from nion.swift.model import Utility
 from nion.swift import DocumentController
@@ -158,8 +160,9 @@ class ExportDialog(Declarative.Handler):
         self.ui_view = column
 
     @staticmethod
-    def build_filepath(components: typing.List[str], extension: str, directory_path: pathlib.Path) -> pathlib.Path:
+    def build_filepath(components: typing.List[str], extension: str, directory_path: pathlib.Path, reserved_paths: typing.Optional[typing.AbstractSet[pathlib.Path]] = None) -> pathlib.Path:
         assert directory_path.is_dir()
+        reserved_paths = reserved_paths or set()
 
         # if extension doesn't start with a '.', add one, so we always know it is there
         if not extension.startswith('.'):
@@ -173,7 +176,7 @@ class ExportDialog(Declarative.Handler):
 
         # check to see if filename is available, if so return that
         test_filepath = directory_path / pathlib.Path(filename)
-        if not test_filepath.exists():
+        if not test_filepath.exists() and test_filepath not in reserved_paths:
             return test_filepath
 
         # file must already exist
@@ -183,7 +186,7 @@ class ExportDialog(Declarative.Handler):
         while next_index <= max_index:
             filename_stem = pathlib.Path(filename).stem
             test_filepath = directory_path / pathlib.Path(f"{filename_stem} {next_index}").with_suffix(extension)
-            if not test_filepath.exists():
+            if not test_filepath.exists() and test_filepath not in reserved_paths:
                 return test_filepath
             if test_filepath == last_test_filepath:
                 break
@@ -201,42 +204,71 @@ class ExportDialog(Declarative.Handler):
         writer_model = viewmodel.writer
         writer = writer_model.value
         if directory_path.is_dir() and writer:
-            export_results = list()
-            for index, display_item in enumerate(display_items):
-                data_item = display_item.data_item
-                file_name: str = ''
-                try:
-                    components = list()
-                    if viewmodel.prefix.value is not None and viewmodel.prefix.value != '':
-                        components.append(str(viewmodel.prefix.value))
-                    if viewmodel.include_title.value:
-                        title = unicodedata.normalize('NFKC', display_item.displayed_title)
-                        title = re.sub(r'[^\w\s-]', '', title, flags=re.U).strip()
-                        title = re.sub(r'[-\s]+', '-', title, flags=re.U)
-                        components.append(title)
-                    if viewmodel.include_date.value:
-                        # prefer the data item created date, but fall back to the display item created date.
-                        created_local = data_item.created_local if data_item else display_item.created_local
-                        components.append(created_local.isoformat().replace(':', '').replace('.', '_'))
-                    if viewmodel.include_dimensions.value and data_item:
-                        components.append("x".join([str(shape_n) for shape_n in data_item.dimensional_shape]))
-                    if viewmodel.include_sequence.value:
-                        components.append(str(index))
-                    filepath = ExportDialog.build_filepath(components, writer.extensions[0], directory_path=directory_path)
-                    file_extension = filepath.suffix[1:].lower()
-                    if writer.can_write_display_item(display_item, file_extension):
-                        ImportExportManager.ImportExportManager().write_display_item_with_writer(writer, display_item, filepath)
-                        export_results.append(ExportResult(display_item.displayed_title))
-                    else:
-                        error_message = _("Cannot export this data to file format")
-                        export_results.append(ExportResult(display_item.displayed_title, f"{error_message} {writer.name}"))
-                except Exception as e:
-                    logging.debug("Could not export image %s / %s", str(data_item), str(e))
-                    traceback.print_exc()
-                    traceback.print_stack()
-                    export_results.append(ExportResult(file_name, str(e)))
-
-            ExportResultDialog(ui, document_controller, export_results, directory_path)
+            document_controller.event_loop.create_task(ExportDialog.export_async(display_items, viewmodel, writer, directory_path, ui, document_controller))
+
+    @staticmethod
+    async def export_async(display_items: typing.Sequence[DisplayItem.DisplayItem], viewmodel: ExportDialogViewModel,
+                           writer: ImportExportManager.ImportExportHandler, directory_path: pathlib.Path,
+                           ui: UserInterface.UserInterface, document_controller: DocumentController.DocumentController) -> None:
+        # file paths are chosen here, but the files are written on worker threads so that exporting many items does
+        # not block the user interface. the export activity shows progress and can be cancelled.
+        export_results: typing.List[typing.Optional[ExportResult]] = list()
+        display_item_paths: typing.List[typing.Tuple[DisplayItem.DisplayItem, pathlib.Path]] = list()
+        display_item_path_indexes = list[int]()
+        reserved_paths = set[pathlib.Path]()
+        for index, display_item in enumerate(display_items):
+            data_item = display_item.data_item
+            file_name: str = ''
+            try:
+                components = list()
+                if viewmodel.prefix.value is not None and viewmodel.prefix.value != '':
+                    components.append(str(viewmodel.prefix.value))
+                if viewmodel.include_title.value:
+                    title = unicodedata.normalize('NFKC', display_item.displayed_title)
+                    title = re.sub(r'[^\w\s-]', '', title, flags=re.U).strip()
+                    title = re.sub(r'[-\s]+', '-', title, flags=re.U)
+                    components.append(title)
+                if viewmodel.include_date.value:
+                    # prefer the data item created date, but fall back to the display item created date.
+                    created_local = data_item.created_local if data_item else display_item.created_local
+                    components.append(created_local.isoformat().replace(':', '').replace('.', '_'))
+                if viewmodel.include_dimensions.value and data_item:
+                    components.append("x".join([str(shape_n) for shape_n in data_item.dimensional_shape]))
+                if viewmodel.include_sequence.value:
+                    components.append(str(index))
+                # paths already chosen for this export are reserved since those files have not been written yet.
+                filepath = ExportDialog.build_filepath(components, writer.extensions[0], directory_path=directory_path, reserved_paths=reserved_paths)
+                reserved_paths.add(filepath)
+                file_extension = filepath.suffix[1:].lower()
+                if writer.can_write_display_item(display_item, file_extension):
+                    display_item_paths.append((display_item, filepath))
+                    display_item_path_indexes.append(index)
+                    export_results.append(None)
+                else:
+                    error_message = _("Cannot export this data to file format")
+                    export_results.append(ExportResult(display_item.displayed_title, f"{error_message} {writer.name}"))
+            except Exception as e:
+                logging.debug("Could not export image %s / %s", str(data_item), str(e))
+                traceback.print_exc()
+                traceback.print_stack()
+                export_results.append(ExportResult(file_name, str(e)))
+
+        activity = ImportExportManager.ExportActivity(len(display_item_paths))
+        Activity.append_activity(activity)
+        try:
+            errors = await ImportExportManager.ImportExportManager().write_display_items_async(writer, display_item_paths, activity=activity)
+        finally:
+            Activity.activity_finished(activity)
+
+        for index, (display_item, filepath), error in zip(display_item_path_indexes, display_item_paths, errors):
+            if isinstance(error, concurrent.futures.CancelledError):
+                export_results[index] = ExportResult(display_item.displayed_title, _("Cancelled"))
+            elif error:
+                export_results[index] = ExportResult(display_item.displayed_title, str(error) or type(error).__name__)
+            else:
+                export_results[index] = ExportResult(display_item.displayed_title)
+
+        ExportResultDialog(ui, document_controller, [export_result for export_result in export_results if export_result], directory_path)
 
     def cancel(self) -> bool:
         return True
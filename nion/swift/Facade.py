@@ -2337,6 +2337,8 @@ class Computation(metaclass=SharedInstance):
             metadata["computation"] = computation_d
         if source_metadata_d := self.__computation.get_source_metadata():
             metadata["source_metadata"] = source_metadata_d
+        # the xdata may be a snapshot shared by a data item; set the metadata on a copy sharing the data.
+        xdata = xdata.clone_with_data(xdata.data)
         xdata._set_metadata(metadata)
         data_item.xdata = xdata
 
@@ -6,6 +6,7 @@ from __future__ import annotations
 # standard libraries
 import bisect
 import datetime
+import functools
 import gettext
 import threading
 import typing
@@ -19,6 +20,7 @@ from nion.swift import Panel
 from nion.swift.model import DisplayItem
 from nion.swift.model import UISettings
 from nion.ui import UserInterface
+from nion.utils import Event
 from nion.utils import ListModel
 
 if typing.TYPE_CHECKING:
@@ -49,6 +51,155 @@ class FilterPanelUISettings(UISettings.UISettings):
         return self.__ui.get_tolerance(UserInterface.ToleranceType.CURSOR)
 
 
+class DisplayItemTextIndex:
+    """
+        An incremental inverted index of the filter text of display items.
+
+        The index maps each word of the lower case text_for_filter of a display item to the display items containing
+        it. A query matches the display items whose text contains the query text, just like a text filter. Each word of
+        the query must be within a word of a matching text, so the candidates are found by scanning the words in the
+        index rather than the display items. The candidates are then checked against the cached text.
+
+        Display items are marked dirty when their filter text changes and are reindexed when next queried. The hits of
+        the last query are kept and updated as display items change, so that a query that extends the last query only
+        checks the last hits.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.RLock()
+        self.__texts: typing.Dict[_ValueType, str] = dict()
+        self.__words: typing.Dict[_ValueType, typing.Set[str]] = dict()
+        self.__postings: typing.Dict[str, typing.Set[_ValueType]] = dict()
+        self.__dirty: typing.Set[_ValueType] = set()
+        self.__listeners: typing.Dict[_ValueType, Event.EventListener] = dict()
+        self.__query_text: typing.Optional[str] = None
+        self.__query_hits: typing.Set[_ValueType] = set()
+
+    def close(self) -> None:
+        with self.__lock:
+            for listener in self.__listeners.values():
+                listener.close()
+            self.__listeners.clear()
+            self.__texts.clear()
+            self.__words.clear()
+            self.__postings.clear()
+            self.__dirty.clear()
+            self.__query_text = None
+            self.__query_hits = set()
+
+    def add_display_item(self, display_item: _ValueType) -> None:
+        with self.__lock:
+            if display_item not in self.__listeners:
+                self.__listeners[display_item] = display_item.property_changed_event.listen(functools.partial(self.__property_changed, display_item))
+                self.__dirty.add(display_item)
+
+    def remove_display_item(self, display_item: _ValueType) -> None:
+        with self.__lock:
+            listener = self.__listeners.pop(display_item, None)
+            if listener:
+                listener.close()
+            self.__unindex(display_item)
+            self.__dirty.discard(display_item)
+            self.__query_hits.discard(display_item)
+
+    def __property_changed(self, display_item: _ValueType, property_name: str) -> None:
+        if property_name in ("text_for_filter", "displayed_title", "title", "caption", "description", "session_id"):
+            with self.__lock:
+                self.__dirty.add(display_item)
+
+    def __unindex(self, display_item: _ValueType) -> None:
+        self.__texts.pop(display_item, None)
+        for word in self.__words.pop(display_item, set()):
+            display_items = self.__postings[word]
+            display_items.discard(display_item)
+            if not display_items:
+                self.__postings.pop(word)
+
+    def __index(self, display_item: _ValueType) -> None:
+        self.__unindex(display_item)
+        text = display_item.text_for_filter.lower()
+        words = set(text.split())
+        self.__texts[display_item] = text
+        self.__words[display_item] = words
+        for word in words:
+            self.__postings.setdefault(word, set()).add(display_item)
+        # keep the hits of the last query up to date.
+        if self.__query_text is not None:
+            if self.__query_text in text:
+                self.__query_hits.add(display_item)
+            else:
+                self.__query_hits.discard(display_item)
+
+    def __update_dirty(self) -> None:
+        dirty = self.__dirty
+        self.__dirty = set()
+        for display_item in dirty:
+            self.__index(display_item)
+
+    def query(self, text: str) -> typing.Set[_ValueType]:
+        """Return the display items whose filter text contains text, ignoring case."""
+        with self.__lock:
+            self.__update_dirty()
+            query_text = text.lower()
+            if query_text == self.__query_text:
+                return set(self.__query_hits)
+            if self.__query_text is not None and self.__query_text in query_text:
+                # the query extends the last query; only the last hits can match.
+                candidates: typing.Iterable[_ValueType] = self.__query_hits
+            elif query_words := query_text.split():
+                candidate_set: typing.Optional[typing.Set[_ValueType]] = None
+                for query_word in sorted(set(query_words), key=len, reverse=True):
+                    word_candidates: typing.Set[_ValueType] = set()
+                    for word, display_items in self.__postings.items():
+                        if query_word in word:
+                            word_candidates.update(display_items)
+                    candidate_set = candidate_set & word_candidates if candidate_set is not None else word_candidates
+                    if not candidate_set:
+                        break
+                candidates = candidate_set or set()
+            else:
+                candidates = self.__texts.keys()
+            texts = self.__texts
+            self.__query_hits = {display_item for display_item in candidates if query_text in texts[display_item]}
+            self.__query_text = query_text
+            return set(self.__query_hits)
+
+    def matches(self, display_item: _ValueType, text: str) -> bool:
+        """Return whether the filter text of the display item contains text, ignoring case."""
+        with self.__lock:
+            if display_item not in self.__listeners:
+                # the display item may be filtered before its insertion has been passed to the index.
+                self.add_display_item(display_item)
+            if display_item in self.__dirty:
+                self.__dirty.discard(display_item)
+                self.__index(display_item)
+            if text.lower() != self.__query_text:
+                self.query(text)
+            return display_item in self.__query_hits
+
+
+class IndexedTextFilter(ListModel.Filter):
+    """
+        A text filter matching display items through a text index.
+
+        Matches the same display items as a text filter on text_for_filter.
+    """
+
+    def __init__(self, text_index: DisplayItemTextIndex, text: str) -> None:
+        super().__init__()
+        self.__text_index = text_index
+        self.__text = text
+
+    def __deepcopy__(self, memo: typing.Dict[typing.Any, typing.Any]) -> IndexedTextFilter:
+        result = typing.cast(IndexedTextFilter, super().__deepcopy__(memo))
+        result.__text_index = self.__text_index  # the index is shared
+        result.__text = self.__text
+        return result
+
+    def matches(self, d: typing.Any) -> bool:
+        return self.__text_index.matches(d, self.__text)
+
+
 # TODO: Add button to convert between (filter <-> smart group) -> regular group
 # TODO: Add tree browser for sessions, organized by date
 # TODO: Add tree browser for date
@@ -84,6 +235,15 @@ class FilterController:
         self.__display_item_tree.child_removed = self.__remove_child
         self.__display_item_tree.tree_node_updated = self.__update_tree_node
 
+        # insertions and removals are collected and applied to the tree once per periodic, with insertions bucketed
+        # by date so that the tree is walked once per date rather than once per display item.
+        self.__pending_insertions: typing.Dict[_ValueType, typing.Tuple[int, int, int]] = dict()
+        self.__pending_removals: typing.Dict[_ValueType, None] = dict()
+        self.__dirty_tree_nodes: typing.Dict[int, TreeNode] = dict()
+
+        # the text index is maintained incrementally so that text filtering does not rebuild the text of every item.
+        self.__text_index = DisplayItemTextIndex()
+
         # thread safe.
         def display_item_inserted(key: str, display_item: _ValueType, before_index: int) -> None:
             """
@@ -96,7 +256,8 @@ class FilterController:
             with self.__display_item_tree_mutex:
                 created_local = display_item.created_local
                 indexes = created_local.year, created_local.month, created_local.day
-                self.__display_item_tree.insert_value(indexes, display_item)
+                self.__pending_insertions[display_item] = indexes
+            self.__text_index.add_display_item(display_item)
 
         # thread safe.
         def display_item_removed(key: str, display_item: _ValueType, index: int) -> None:
@@ -108,9 +269,9 @@ class FilterController:
             """
             assert threading.current_thread() == threading.main_thread()
             with self.__display_item_tree_mutex:
-                created = display_item.created_local
-                indexes = created.year, created.month, created.day
-                self.__display_item_tree.remove_value(indexes, display_item)
+                if self.__pending_insertions.pop(display_item, None) is None:
+                    self.__pending_removals[display_item] = None
+            self.__text_index.remove_display_item(display_item)
 
         # connect the display_items_model from the document controller to self.
         # when data items are inserted or removed from the document controller, the inserter and remover methods
@@ -122,13 +283,13 @@ class FilterController:
 
         self.__mapping = dict()
         self.__mapping[id(self.__display_item_tree)] = self.item_model_controller.root
-        self.__node_counts_dirty = False
 
         self.__date_filter: typing.Optional[ListModel.Filter] = None
         self.__text_filter: typing.Optional[ListModel.Filter] = None
 
         for index, display_item in enumerate(self.__display_items_model.items):
             display_item_inserted("display_items", display_item, index)
+        self.__apply_pending_changes()
 
     def close(self) -> None:
         # Close the data model controller. Un-listen to the data item list model and close the item model controller.
@@ -140,6 +301,7 @@ class FilterController:
         self.__periodic_listener = typing.cast(typing.Any, None)
         self.item_model_controller.close()
         self.item_model_controller = typing.cast(typing.Any, None)
+        self.__text_index.close()
 
     @property
     def document_controller(self) -> DocumentController.DocumentController:
@@ -195,19 +357,35 @@ class FilterController:
 
     def __update_tree_node(self, tree_node: TreeNode) -> None:
         """ Mark the fact that tree node counts need updating when convenient. """
-        self.__node_counts_dirty = True
+        self.__dirty_tree_nodes[id(tree_node)] = tree_node
+
+    def __apply_pending_changes(self) -> None:
+        """ Apply the pending removals and the pending insertions, bucketed by date, to the tree. """
+        with self.__display_item_tree_mutex:
+            pending_removals = self.__pending_removals
+            pending_insertions = self.__pending_insertions
+            self.__pending_removals = dict()
+            self.__pending_insertions = dict()
+            for display_item in pending_removals:
+                self.__display_item_tree.remove_value(tuple(), display_item)
+            buckets: typing.Dict[typing.Tuple[int, int, int], typing.List[_ValueType]] = dict()
+            for display_item, indexes in pending_insertions.items():
+                buckets.setdefault(indexes, list()).append(display_item)
+            for indexes, display_items in buckets.items():
+                self.__display_item_tree.insert_values(indexes, display_items)
 
     def update_all_nodes(self) -> None:
-        """ Update all tree item displays if needed. Usually for count updates. """
+        """ Apply pending changes and update the tree item displays that need it. Usually for count updates. """
         item_model_controller = self.item_model_controller
         if item_model_controller:
-            if self.__node_counts_dirty:
-                for item in self.__mapping.values():
-                    if "tree_node" in item.data:  # don't update the root node
-                        tree_node = item.data["tree_node"]
-                        item.data["display"] = self.__display_for_tree_node(tree_node)
-                        item_model_controller.data_changed(item.row, item.parent.row, item.parent.id)
-                self.__node_counts_dirty = False
+            self.__apply_pending_changes()
+            dirty_tree_nodes = self.__dirty_tree_nodes
+            self.__dirty_tree_nodes = dict()
+            for tree_node in dirty_tree_nodes.values():
+                item = self.__mapping.get(id(tree_node))
+                if item and item.data.get("tree_node") is tree_node:  # skip removed nodes and the root node
+                    item.data["display"] = self.__display_for_tree_node(tree_node)
+                    item_model_controller.data_changed(item.row, item.parent.row, item.parent.id)
 
     def date_browser_selection_changed(self, selected_indexes: typing.Sequence[typing.Tuple[int, int, int]]) -> None:
         """
@@ -243,7 +421,7 @@ class FilterController:
         text = text.strip() if text else None
 
         if text is not None:
-            self.__text_filter = ListModel.TextFilter("text_for_filter", text)
+            self.__text_filter = IndexedTextFilter(self.__text_index, text)
         else:
             self.__text_filter = None
 
@@ -333,7 +511,8 @@ class TreeNode:
         self.reversed = reversed
         self.__weak_parent: typing.Optional[_TreeNodeWeakRefType] = None
         self.children: typing.List[TreeNode] = list()
-        self.values: typing.List[_ValueType] = list()
+        self.__children_by_key: typing.Dict[_KeyType, TreeNode] = dict()
+        self.__values: typing.Dict[_ValueType, None] = dict()  # insertion ordered set
         self.__value_reverse_mapping: typing.Dict[_ValueType, _KeyListType] = dict()
         self.child_inserted: typing.Optional[typing.Callable[[TreeNode, int, TreeNode], None]] = None
         self.child_removed: typing.Optional[typing.Callable[[TreeNode, int], None]] = None
@@ -392,6 +571,11 @@ class TreeNode:
         """ Set the parent tree node. Private. """
         self.__weak_parent = typing.cast(_TreeNodeWeakRefType, weakref.ref(parent)) if parent else None
 
+    @property
+    def values(self) -> typing.List[_ValueType]:
+        """ Return the values stored directly in this node. """
+        return list(self.__values)
+
     @property
     def keys(self) -> _KeyListType:
         """ Return the keys associated with this node by adding its key and then adding parent keys recursively. """
@@ -409,25 +593,36 @@ class TreeNode:
             inserted into the document. Also updates the tree node's cumulative
             child count.
         """
-        self.count += 1
+        self.insert_values(keys, [value])
+
+    def insert_values(self, keys: _KeySequenceType, values: typing.Sequence[_ValueType]) -> None:
+        """
+            Insert values (data items) sharing the same keys into this tree node and then its children, walking the
+            tree once for all of them. Also updates the tree node's cumulative child count.
+        """
+        if not values:
+            return
+        self.count += len(values)
         if not self.key:
-            self.__value_reverse_mapping[value] = list(keys)
+            for value in values:
+                self.__value_reverse_mapping[value] = list(keys)
         if len(keys) == 0:
-            self.values.append(value)
+            self.__values.update(dict.fromkeys(values))
         else:
             key = keys[0]
-            index = bisect.bisect_left(self.children, TreeNode(key, reversed=self.reversed))
-            if index == len(self.children) or self.children[index].key != key:
-                new_tree_node = TreeNode(key, reversed=self.reversed)
-                new_tree_node.child_inserted = self.child_inserted
-                new_tree_node.child_removed = self.child_removed
-                new_tree_node.tree_node_updated = self.tree_node_updated
-                new_tree_node.__set_parent(self)
-                self.children.insert(index, new_tree_node)
+            child = self.__children_by_key.get(key)
+            if child is None:
+                index = bisect.bisect_left(self.children, TreeNode(key, reversed=self.reversed))
+                child = TreeNode(key, reversed=self.reversed)
+                child.child_inserted = self.child_inserted
+                child.child_removed = self.child_removed
+                child.tree_node_updated = self.tree_node_updated
+                child.__set_parent(self)
+                self.children.insert(index, child)
+                self.__children_by_key[key] = child
                 if self.child_inserted:
-                    self.child_inserted(self, index, new_tree_node)
-            child = self.children[index]
-            child.insert_value(keys[1:], value)
+                    self.child_inserted(self, index, child)
+            child.insert_values(keys[1:], values)
             if self.tree_node_updated:
                 self.tree_node_updated(child)
 
@@ -441,15 +636,17 @@ class TreeNode:
             keys = self.__value_reverse_mapping[value]
             del self.__value_reverse_mapping[value]
         if len(keys) == 0:
-            self.values.remove(value)
+            del self.__values[value]
         else:
             key = keys[0]
-            index = bisect.bisect_left(self.children, TreeNode(key, reversed=self.reversed))
-            assert index != len(self.children) and self.children[index].key == key
-            self.children[index].remove_value(keys[1:], value)
+            child = self.__children_by_key[key]
+            child.remove_value(keys[1:], value)
             if self.tree_node_updated:
-                self.tree_node_updated(self.children[index])
-            if self.children[index].count == 0:
+                self.tree_node_updated(child)
+            if child.count == 0:
+                index = bisect.bisect_left(self.children, child)
+                assert index != len(self.children) and self.children[index] is child
                 del self.children[index]
+                del self.__children_by_key[key]
                 if self.child_removed:
                     self.child_removed(self, index)
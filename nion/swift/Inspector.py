@@ -25,7 +25,6 @@ from nion.swift import EntityBrowser
 from nion.swift import MimeTypes
 from nion.swift import Panel
 from nion.swift import Undo
-from nion.swift.model import Changes
 from nion.swift.model import ColorMaps
 from nion.swift.model import DataItem
 from nion.swift.model import DataStructure
@@ -4414,7 +4413,6 @@ class RemoveDisplayDataChannelCommand(Undo.UndoableCommand):
         self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
         self.__display_data_channel_index = display_item.display_data_channels.index(display_data_channel)
         self.__old_display_properties = display_item.save_properties()
-        self.__undelete_logs: typing.List[Changes.UndeleteLog] = list()
         self.initialize()
 
     def close(self) -> None:
@@ -4424,16 +4422,13 @@ class RemoveDisplayDataChannelCommand(Undo.UndoableCommand):
         self.__old_workspace_layout = None
         self.__new_workspace_layout = None
         self.__old_display_properties = typing.cast(typing.Any, None)
-        for undelete_log in self.__undelete_logs:
-            undelete_log.close()
-        self.__undelete_logs = typing.cast(typing.Any, None)
         super().close()
 
     def _perform(self) -> None:
         display_item = self.__display_item_proxy.item
         if display_item:
             display_data_channel = display_item.display_data_channels[self.__display_data_channel_index]
-            self.__undelete_logs.append(display_item.remove_display_data_channel(display_data_channel, safe=True))
+            self._add_undelete_log(self.__document_controller.document_model, display_item.remove_display_data_channel(display_data_channel, safe=True))
 
     def _get_modified_state(self) -> typing.Any:
         display_item = self.__display_item_proxy.item
@@ -4449,10 +4444,7 @@ class RemoveDisplayDataChannelCommand(Undo.UndoableCommand):
         workspace_controller = self.__document_controller.workspace_controller
         assert workspace_controller
         self.__new_workspace_layout = workspace_controller.deconstruct()
-        for undelete_log in reversed(self.__undelete_logs):
-            self.__document_controller.document_model.undelete_all(undelete_log)
-            undelete_log.close()
-        self.__undelete_logs.clear()
+        self._undelete_all()
         if self.__old_workspace_layout is not None:
             workspace_controller.reconstruct(self.__old_workspace_layout)
         display_item = self.__display_item_proxy.item
@@ -24,7 +24,6 @@ from nion.utils import Registry
 
 if typing.TYPE_CHECKING:
     from nion.swift import DocumentController
-    from nion.swift.model import Changes
     from nion.swift.model import DocumentModel
     from nion.swift.model import Persistence
     from nion.ui import DrawingContext
@@ -52,6 +51,8 @@ class Recorder:
         self.__recording_error = False
         self.__recording_interval = 1.0
         self.__recording_count = 0
+        self.__recording_frame_count = 0
+        self.__recording_data_metadata: typing.Optional[DataAndMetadata.DataMetadata] = None
 
         self.__last_complete_xdata: typing.Optional[DataAndMetadata.DataAndMetadata] = None
 
@@ -66,7 +67,7 @@ class Recorder:
         # called when an item is removed from the document
         def item_removed(key: str, value: DataItem.DataItem, index: int) -> None:
             if value == self.__recording_data_item:
-                self.__stop_recording()
+                self.__stop_recording(trim=False)
             if value == self.__data_item:
                 self.__stop_recording()
                 if callable(self.on_data_item_removed):
@@ -117,7 +118,6 @@ class Recorder:
             self.__new_workspace_layout: typing.Optional[Persistence.PersistentDictType] = None
             self.__data_item_proxy: typing.Optional[Persistence.PersistentObjectProxy[DataItem.DataItem]] = None
             self.__data_item_fn = data_item_fn
-            self.__undelete_log: typing.Optional[Changes.UndeleteLog] = None
             self.initialize()
 
         def close(self) -> None:
@@ -128,9 +128,6 @@ class Recorder:
             self.__data_item_fn = typing.cast(typing.Any, None)
             self.__old_workspace_layout = None
             self.__new_workspace_layout = None
-            if self.__undelete_log:
-                self.__undelete_log.close()
-                self.__undelete_log = None
             super().close()
 
         def _perform(self) -> None:
@@ -148,10 +145,7 @@ class Recorder:
             self.__document_controller.document_model.modified_state = modified_state
 
         def _redo(self) -> None:
-            assert self.__undelete_log
-            self.__document_controller.document_model.undelete_all(self.__undelete_log)
-            self.__undelete_log.close()
-            self.__undelete_log = None
+            self._undelete_all()
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             assert self.__new_workspace_layout is not None
@@ -164,7 +158,8 @@ class Recorder:
             workspace_controller = self.__document_controller.workspace_controller
             assert workspace_controller
             self.__new_workspace_layout = workspace_controller.deconstruct()
-            self.__undelete_log = self.__document_controller.document_model.remove_data_item_with_log(data_item, safe=True)
+            document_model = self.__document_controller.document_model
+            self._add_undelete_log(document_model, document_model.remove_data_item_with_log(data_item, safe=True))
             assert self.__old_workspace_layout is not None
             workspace_controller.reconstruct(self.__old_workspace_layout)
 
@@ -199,23 +194,15 @@ class Recorder:
                 if not current_xdata:
                     # no first image yet
                     return
-                # now record the new data. it may or may not be a new frame at this point.
-                last_xdata = self.__recording_data_item.xdata
+                # now record the new data. it may or may not be a new frame at this point. the recording is
+                # reserved for the full count on the first frame and each frame is written into its slot, so that
+                # recording does not copy or rewrite the frames already recorded.
                 self.__recording_index += 1
-                recording_data_shape = self.__recording_data_item.data_shape
-                if current_xdata and last_xdata and recording_data_shape is not None and current_xdata.data_shape == recording_data_shape[1:]:
-                    # continue, append the new data to existing data and update existing data item
-                    intensity_calibration = last_xdata.intensity_calibration
-                    dimensional_calibrations = last_xdata.dimensional_calibrations
-                    data_descriptor = last_xdata.data_descriptor
-                    stacked_data = numpy.vstack([last_xdata.data, [current_xdata.data]])
-                    sequence_xdata = DataAndMetadata.new_data_and_metadata(
-                        stacked_data,
-                        intensity_calibration=intensity_calibration, dimensional_calibrations=dimensional_calibrations,
-                        data_descriptor=data_descriptor)
-                    self.__recording_data_item.set_xdata(sequence_xdata)
-                elif current_xdata and not last_xdata:
-                    # first acquisition, create the sequence
+                recording_data_metadata = self.__recording_data_metadata
+                if current_xdata and recording_data_metadata and current_xdata.data_shape == recording_data_metadata.data_shape[1:]:
+                    self.__write_recording_frame(current_xdata)
+                elif current_xdata and not recording_data_metadata and current_xdata.data_dtype is not None:
+                    # first acquisition, reserve the sequence
                     intensity_calibration = current_xdata.intensity_calibration
                     dimensional_calibrations = [Calibration.Calibration(scale=self.__recording_interval,
                                                                         units="s")] + list(
@@ -223,12 +210,14 @@ class Recorder:
                     data_descriptor = DataAndMetadata.DataDescriptor(True,
                                                                      current_xdata.data_descriptor.collection_dimension_count,
                                                                      current_xdata.data_descriptor.datum_dimension_count)
-                    new_axis_data = current_xdata.data[numpy.newaxis, ...]
-                    sequence_xdata = DataAndMetadata.new_data_and_metadata(new_axis_data,
-                                                                           intensity_calibration=intensity_calibration,
-                                                                           dimensional_calibrations=dimensional_calibrations,
-                                                                           data_descriptor=data_descriptor)
-                    self.__recording_data_item.set_xdata(sequence_xdata)
+                    data_shape = (max(self.__recording_count, 1),) + tuple(current_xdata.data_shape)
+                    data_dtype = current_xdata.data_dtype
+                    self.__recording_data_item.reserve_data(data_shape=data_shape, data_dtype=data_dtype, data_descriptor=data_descriptor)
+                    self.__recording_data_metadata = DataAndMetadata.DataMetadata(data_shape_and_dtype=(data_shape, data_dtype),
+                                                                                  intensity_calibration=intensity_calibration,
+                                                                                  dimensional_calibrations=dimensional_calibrations,
+                                                                                  data_descriptor=data_descriptor)
+                    self.__write_recording_frame(current_xdata)
                     self.__recording_transaction = self.__document_model.item_transaction(self.__recording_data_item)
                 else:
                     # something is amiss. stop.
@@ -238,10 +227,73 @@ class Recorder:
             if self.__recording_index >= self.__recording_count:
                 self.__stop_recording()
 
+    def __write_recording_frame(self, xdata: DataAndMetadata.DataAndMetadata) -> None:
+        # write the frame into the next slot of the reserved sequence using a partial update.
+        recording_data_item = self.__recording_data_item
+        recording_data_metadata = self.__recording_data_metadata
+        assert recording_data_item
+        assert recording_data_metadata
+        frame_index = self.__recording_frame_count
+        if frame_index < recording_data_metadata.data_shape[0]:
+            # a frame with a different dtype promotes the recording to a dtype holding both, so that no frame is
+            # truncated. the frame is then converted, without loss, to the recording dtype.
+            recording_data_dtype = recording_data_metadata.data_dtype
+            frame_data_dtype = xdata.data_dtype
+            assert recording_data_dtype is not None
+            assert frame_data_dtype is not None
+            data_dtype = numpy.result_type(recording_data_dtype, frame_data_dtype)
+            if data_dtype != recording_data_dtype:
+                recording_data_metadata = self.__promote_recording(data_dtype)
+            frame_data = xdata.data.astype(data_dtype, copy=False)
+            frame_xdata = DataAndMetadata.new_data_and_metadata(frame_data[numpy.newaxis, ...])
+            src_slice = (slice(0, 1),) + tuple(slice(None) for _ in xdata.data_shape)
+            dst_slice = (slice(frame_index, frame_index + 1),) + tuple(slice(None) for _ in xdata.data_shape)
+            recording_data_item.set_data_and_metadata_partial(recording_data_metadata, frame_xdata, src_slice, dst_slice, update_metadata=frame_index == 0)
+            self.__recording_frame_count += 1
+
+    def __promote_recording(self, data_dtype: numpy.dtype[typing.Any]) -> DataAndMetadata.DataMetadata:
+        # replace the reserved sequence with one of the new dtype, keeping the frames already recorded.
+        recording_data_item = self.__recording_data_item
+        recording_data_metadata = self.__recording_data_metadata
+        assert recording_data_item
+        assert recording_data_metadata
+        data = numpy.zeros(recording_data_metadata.data_shape, data_dtype)
+        frame_count = self.__recording_frame_count
+        xdata = recording_data_item.xdata
+        if frame_count > 0 and xdata and xdata.data is not None:
+            data[:frame_count] = xdata.data[:frame_count]
+        recording_data_item.set_xdata(DataAndMetadata.new_data_and_metadata(
+            data,
+            intensity_calibration=recording_data_metadata.intensity_calibration,
+            dimensional_calibrations=recording_data_metadata.dimensional_calibrations,
+            data_descriptor=recording_data_metadata.data_descriptor))
+        recording_data_metadata = DataAndMetadata.DataMetadata(data_shape_and_dtype=(recording_data_metadata.data_shape, data_dtype),
+                                                               intensity_calibration=recording_data_metadata.intensity_calibration,
+                                                               dimensional_calibrations=recording_data_metadata.dimensional_calibrations,
+                                                               data_descriptor=recording_data_metadata.data_descriptor)
+        self.__recording_data_metadata = recording_data_metadata
+        return recording_data_metadata
+
+    def __trim_recording(self) -> None:
+        # if the recording stopped before reaching the count, remove the unused frames from the sequence.
+        recording_data_item = self.__recording_data_item
+        recording_data_metadata = self.__recording_data_metadata
+        frame_count = self.__recording_frame_count
+        if recording_data_item and recording_data_metadata and 0 < frame_count < recording_data_metadata.data_shape[0]:
+            xdata = recording_data_item.xdata
+            if xdata and xdata.data is not None:
+                recording_data_item.set_xdata(DataAndMetadata.new_data_and_metadata(
+                    numpy.array(xdata.data[:frame_count]),
+                    intensity_calibration=recording_data_metadata.intensity_calibration,
+                    dimensional_calibrations=recording_data_metadata.dimensional_calibrations,
+                    data_descriptor=recording_data_metadata.data_descriptor))
+
     def start_recording(self, recording_start: float, recording_interval: float, recording_count: int) -> None:
         self.__recording_state = "recording"
         self.__recording_start = recording_start
         self.__recording_index = 0
+        self.__recording_frame_count = 0
+        self.__recording_data_metadata = None
         self.__recording_error = False
         self.__recording_interval = recording_interval
         self.__recording_count = recording_count
@@ -251,12 +303,16 @@ class Recorder:
     def stop_recording(self) -> None:
         self.__stop_recording()
 
-    def __stop_recording(self) -> None:
+    def __stop_recording(self, trim: bool = True) -> None:
         if self.__recording_state == "recording":
             self.__recording_state = "stopped"
             self.__recording_start = 0.0
             self.__recording_index = 0
             self.__recording_error = False
+            if trim:
+                self.__trim_recording()
+            self.__recording_frame_count = 0
+            self.__recording_data_metadata = None
             if self.__recording_data_item and self.__recording_transaction:
                 self.__recording_transaction.close()
                 self.__recording_transaction = None
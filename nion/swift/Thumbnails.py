@@ -6,7 +6,11 @@ from __future__ import annotations
 
 # standard libraries
 import concurrent.futures
+import dataclasses
 import functools
+import heapq
+import itertools
+import os
 import threading
 import typing
 import uuid
@@ -17,11 +21,13 @@ import numpy
 import numpy.typing
 
 # local libraries
+from nion.data import DataAndMetadata
 from nion.swift import DisplayPanel
 from nion.swift.model import Utility
 from nion.swift.model import DisplayItem
 from nion.ui import DrawingContext
 from nion.ui import UserInterface
+from nion.utils import Color
 from nion.utils import Event
 from nion.utils import Geometry
 from nion.utils import ReferenceCounting
@@ -29,9 +35,180 @@ from nion.utils import ReferenceCounting
 _NDArray = numpy.typing.NDArray[typing.Any]
 
 
+def _fit_shape(shape: typing.Tuple[int, int], size: Geometry.IntSize) -> Geometry.IntSize:
+    """Return the size of the shape scaled to fit within size, preserving the aspect ratio."""
+    scale = min(size.height / shape[0], size.width / shape[1])
+    return Geometry.IntSize(height=max(1, min(size.height, round(shape[0] * scale))), width=max(1, min(size.width, round(shape[1] * scale))))
+
+
+def _block_reduce(data: _NDArray, size: Geometry.IntSize) -> _NDArray:
+    """Return the 2d data reduced to size by averaging integer blocks, then sampling to the exact size.
+
+    Averaging blocks first reads each element once and avoids the aliasing of plain subsampling.
+    """
+    block_height = max(1, data.shape[0] // size.height)
+    block_width = max(1, data.shape[1] // size.width)
+    if block_height > 1 or block_width > 1:
+        height = data.shape[0] // block_height
+        width = data.shape[1] // block_width
+        blocks = data[:height * block_height, :width * block_width].reshape(height, block_height, width, block_width)
+        data = blocks.mean(axis=(1, 3))
+    rows = (numpy.arange(size.height) * data.shape[0]) // size.height
+    columns = (numpy.arange(size.width) * data.shape[1]) // size.width
+    result: _NDArray = data[rows[:, numpy.newaxis], columns]
+    return result
+
+
+def _line_envelope(data: _NDArray, width: int) -> typing.Tuple[_NDArray, _NDArray]:
+    """Return the minimum and maximum of the 1d data within each of width columns.
+
+    Each column also includes the first value of the next column so that adjacent columns connect.
+    """
+    n = data.shape[0]
+    if n >= width:
+        starts = (numpy.arange(width) * n) // width
+        column_min = numpy.minimum.reduceat(data, starts)
+        column_max = numpy.maximum.reduceat(data, starts)
+        column_min[:-1] = numpy.minimum(column_min[:-1], data[starts[1:]])
+        column_max[:-1] = numpy.maximum(column_max[:-1], data[starts[1:]])
+    else:
+        # fewer points than columns; interpolate the value at the edges of each column.
+        x = numpy.arange(n)
+        edges = numpy.interp(numpy.linspace(0, n - 1, width + 1), x, data)
+        column_min = numpy.minimum(edges[:-1], edges[1:])
+        column_max = numpy.maximum(edges[:-1], edges[1:])
+    return column_min, column_max
+
+
+def _color_to_rgba32(color_str: typing.Optional[str], background: int = 0xFFFFFFFF) -> typing.Optional[int]:
+    """Return the color as a uint32 ARGB value blended over the opaque background, or None if no color."""
+    if not color_str:
+        return None
+    r, g, b, a = Color.Color(color_str).to_rgba_255()
+    alpha = a / 255
+    background_rgb = ((background >> 16) & 0xFF, (background >> 8) & 0xFF, background & 0xFF)
+    r, g, b = (round(c * alpha + bc * (1 - alpha)) for c, bc in zip((r, g, b), background_rgb))
+    return int(0xFF000000 | (r << 16) | (g << 8) | b)
+
+
+@dataclasses.dataclass(frozen=True)
+class ThumbnailSchedulerMetrics:
+    """A snapshot of the thumbnail scheduler queue, for diagnostics."""
+    queued_count: int
+    queued_visible_count: int
+    running_count: int
+    completed_count: int
+    cancelled_count: int
+    visible_count: int
+    max_workers: int
+
+
+class ThumbnailScheduler:
+    """Run thumbnail computations from a shared priority queue with bounded concurrency.
+
+    Work is keyed by display item uuid. Work for display items reported as visible (see set_visible) runs before other
+    work; when an item stops being visible, its queued work is moved back behind the visible work. Submitting work for
+    a key that is already queued returns the queued future instead of adding more work.
+    """
+
+    VISIBLE_PRIORITY = 0
+    DEFAULT_PRIORITY = 1
+
+    def __init__(self, max_workers: typing.Optional[int] = None) -> None:
+        self.__max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.__max_workers)
+        self.__lock = threading.RLock()
+        self.__counter = itertools.count()
+        # the heap holds (priority, sequence, key) entries. an entry is stale if the queued work for the key has
+        # a different sequence, which happens when the work is reprioritized or has already been started.
+        self.__heap: typing.List[typing.Tuple[int, int, uuid.UUID]] = list()
+        self.__queued: typing.Dict[uuid.UUID, typing.Tuple[int, typing.Callable[[], None], concurrent.futures.Future[None]]] = dict()
+        self.__visible_keys_by_reporter: typing.Dict[int, typing.Set[uuid.UUID]] = dict()
+        self.__visible_keys: typing.Set[uuid.UUID] = set()
+        self.__running_count = 0
+        self.__completed_count = 0
+        self.__cancelled_count = 0
+
+    def submit(self, key: uuid.UUID, fn: typing.Callable[[], None]) -> concurrent.futures.Future[None]:
+        """Queue fn to run for key and return its future."""
+        with self.__lock:
+            queued = self.__queued.get(key)
+            if queued and not queued[2].cancelled():
+                return queued[2]
+            future: concurrent.futures.Future[None] = concurrent.futures.Future()
+            self.__push(key, fn, future)
+            self.__pump()
+            return future
+
+    def set_visible(self, reporter: typing.Any, keys: typing.Iterable[uuid.UUID]) -> None:
+        """Set the keys visible to the reporter. Pass an empty list when the reporter closes.
+
+        Several reporters (for instance, data panels in different windows) may report visible keys; a key is
+        visible if any reporter reports it.
+        """
+        with self.__lock:
+            keys = set(keys)
+            if keys:
+                self.__visible_keys_by_reporter[id(reporter)] = keys
+            else:
+                self.__visible_keys_by_reporter.pop(id(reporter), None)
+            old_visible_keys = self.__visible_keys
+            self.__visible_keys = set().union(*self.__visible_keys_by_reporter.values())
+            for key in old_visible_keys.symmetric_difference(self.__visible_keys):
+                queued = self.__queued.get(key)
+                if queued:
+                    self.__push(key, queued[1], queued[2])
+
+    @property
+    def metrics(self) -> ThumbnailSchedulerMetrics:
+        with self.__lock:
+            return ThumbnailSchedulerMetrics(
+                queued_count=len(self.__queued),
+                queued_visible_count=len(self.__visible_keys.intersection(self.__queued)),
+                running_count=self.__running_count,
+                completed_count=self.__completed_count,
+                cancelled_count=self.__cancelled_count,
+                visible_count=len(self.__visible_keys),
+                max_workers=self.__max_workers,
+            )
+
+    def __push(self, key: uuid.UUID, fn: typing.Callable[[], None], future: concurrent.futures.Future[None]) -> None:
+        sequence = next(self.__counter)
+        priority = ThumbnailScheduler.VISIBLE_PRIORITY if key in self.__visible_keys else ThumbnailScheduler.DEFAULT_PRIORITY
+        self.__queued[key] = (sequence, fn, future)
+        heapq.heappush(self.__heap, (priority, sequence, key))
+
+    def __pump(self) -> None:
+        # start queued work, highest priority first, until the maximum number of workers are running.
+        while self.__running_count < self.__max_workers and self.__heap:
+            priority, sequence, key = heapq.heappop(self.__heap)
+            queued = self.__queued.get(key)
+            if not queued or queued[0] != sequence:
+                continue  # stale entry
+            self.__queued.pop(key)
+            fn, future = queued[1], queued[2]
+            if not future.set_running_or_notify_cancel():
+                self.__cancelled_count += 1
+                continue
+            self.__running_count += 1
+            self.__executor.submit(self.__run, fn, future)
+
+    def __run(self, fn: typing.Callable[[], None], future: concurrent.futures.Future[None]) -> None:
+        try:
+            fn()
+            future.set_result(None)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.__lock:
+                self.__running_count -= 1
+                self.__completed_count += 1
+                self.__pump()
+
+
 class ThumbnailSource:
     """Produce a thumbnail for a display."""
-    _executor = concurrent.futures.ThreadPoolExecutor()
+    _scheduler = ThumbnailScheduler()
 
     def __init__(self, ui: UserInterface.UserInterface, display_item: DisplayItem.DisplayItem, will_close_fn: typing.Callable[[uuid.UUID], None], *, _suppress_recompute: bool = False) -> None:
         super().__init__()
@@ -84,7 +261,7 @@ class ThumbnailSource:
         with self.__recompute_lock:
             if not self.__recompute_future or self.__recompute_future.done():
                 if not self.__suppress_recompute:
-                    self.__recompute_future = self._executor.submit(self.__recompute_data_if_needed)
+                    self.__recompute_future = self._scheduler.submit(self.__display_item.uuid, self.__recompute_data_if_needed)
 
     def __graphics_changed(self, graphic_selection: DisplayItem.GraphicSelection) -> None:
         self.__thumbnail_changed()
@@ -130,16 +307,9 @@ class ThumbnailSource:
         ui = self._ui
         try:
             display_item = self.__display_item
-            if display_item.display_data_shape and len(display_item.display_data_shape) == 2:
-                pixel_shape = Geometry.IntSize(height=512, width=512)
-            else:
-                pixel_shape = Geometry.IntSize(height=308, width=512)
-            drawing_context = DisplayPanel.preview(DisplayPanel.DisplayPanelUISettings(ui), display_item, pixel_shape)
-            thumbnail_drawing_context = DrawingContext.DrawingContext()
-            thumbnail_drawing_context.scale(self.width / 512, self.height / 512)
-            thumbnail_drawing_context.translate(0, (pixel_shape.width - pixel_shape.height) * 0.5)
-            thumbnail_drawing_context.add(drawing_context)
-            calculated_data = ui.create_rgba_image(thumbnail_drawing_context, self.width, self.height)
+            calculated_data = self.__compute_thumbnail_data_directly(display_item)
+            if calculated_data is None:
+                calculated_data = self.__compute_thumbnail_data_from_canvas(ui, display_item)
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -154,6 +324,103 @@ class ThumbnailSource:
             self.__cache.set_cached_value(self.__display_item, self.__cache_property_name, calculated_data)
         self.thumbnail_updated_event.fire()
 
+    def __compute_thumbnail_data_from_canvas(self, ui: UserInterface.UserInterface, display_item: DisplayItem.DisplayItem) -> typing.Optional[_NDArray]:
+        if display_item.display_data_shape and len(display_item.display_data_shape) == 2:
+            pixel_shape = Geometry.IntSize(height=512, width=512)
+        else:
+            pixel_shape = Geometry.IntSize(height=308, width=512)
+        drawing_context = DisplayPanel.preview(DisplayPanel.DisplayPanelUISettings(ui), display_item, pixel_shape)
+        thumbnail_drawing_context = DrawingContext.DrawingContext()
+        thumbnail_drawing_context.scale(self.width / 512, self.height / 512)
+        thumbnail_drawing_context.translate(0, (pixel_shape.width - pixel_shape.height) * 0.5)
+        thumbnail_drawing_context.add(drawing_context)
+        return ui.create_rgba_image(thumbnail_drawing_context, self.width, self.height)
+
+    def __compute_thumbnail_data_directly(self, display_item: DisplayItem.DisplayItem) -> typing.Optional[_NDArray]:
+        """Compute the thumbnail directly from the display data, without rendering the display canvas.
+
+        Plain 2d images and single layer line plots are handled here. Returns None for anything else, such as display
+        items with graphics, which must be rendered using the canvas.
+        """
+        if display_item.graphics or len(display_item.display_data_channels) != 1:
+            return None
+        display_data_channel = display_item.display_data_channels[0]
+        display_values = display_data_channel.get_latest_display_values()
+        display_xdata = display_values.display_data_and_metadata if display_values else None
+        display_data = display_xdata.data if display_xdata else None
+        if not display_values or not display_xdata or display_data is None or display_xdata.is_data_rgb_type:
+            return None
+        display_type = display_item.used_display_type
+        if display_type == "image" and display_data.ndim == 2 and numpy.issubdtype(display_data.dtype, numpy.number):
+            return self.__compute_image_thumbnail_data(display_data_channel, display_values, display_data)
+        if display_type == "line_plot" and display_data.ndim == 1 and numpy.issubdtype(display_data.dtype, numpy.number):
+            return self.__compute_line_plot_thumbnail_data(display_item, display_data)
+        return None
+
+    def __compute_image_thumbnail_data(self, display_data_channel: DisplayItem.DisplayDataChannel, display_values: DisplayItem.DisplayValues, display_data: _NDArray) -> typing.Optional[_NDArray]:
+        # the display range comes from the full resolution display values (shared with the display panel) so that
+        # the thumbnail is colored the same as the display. everything after that is done at thumbnail size.
+        display_range = display_values.display_range
+        if display_range is None:
+            return None
+        size = _fit_shape((display_data.shape[0], display_data.shape[1]), Geometry.IntSize(height=self.height, width=self.width))
+        reduced_xdata = DataAndMetadata.new_data_and_metadata(_block_reduce(display_data, size))
+        reduced_display_values = DisplayItem.DisplayValues(reduced_xdata, 0, None, 0, 1, display_range, None,
+                                                           display_values.color_map_data,
+                                                           display_data_channel.brightness,
+                                                           display_data_channel.contrast,
+                                                           display_data_channel.adjustments)
+        display_rgba = reduced_display_values.display_rgba
+        if display_rgba is None:
+            return None
+        thumbnail_data = numpy.zeros((self.height, self.width), dtype=numpy.uint32)
+        top = (self.height - size.height) // 2
+        left = (self.width - size.width) // 2
+        thumbnail_data[top:top + size.height, left:left + size.width] = display_rgba
+        return thumbnail_data
+
+    def __compute_line_plot_thumbnail_data(self, display_item: DisplayItem.DisplayItem, display_data: _NDArray) -> typing.Optional[_NDArray]:
+        # only handle the simple case of a single linear layer; log scales, channel ranges, and multiple layers use
+        # the canvas.
+        display_layers = display_item.display_layers
+        if len(display_layers) > 1 or display_item.get_display_property("y_style", "linear") != "linear":
+            return None
+        if display_item.get_display_property("left_channel") is not None or display_item.get_display_property("right_channel") is not None:
+            return None
+        if display_data.shape[0] == 0 or not numpy.all(numpy.isfinite(display_data)):
+            return None
+        display_layer = display_layers[0] if display_layers else None
+        stroke_color = _color_to_rgba32(display_layer.stroke_color if display_layer else DisplayItem.DisplayItem.DEFAULT_COLORS[0])
+        fill_color = _color_to_rgba32(display_layer.fill_color if display_layer else None)
+        data = display_data.astype(numpy.float64, copy=False)
+        column_min, column_max = _line_envelope(data, self.width)
+        y_min = display_item.get_display_property("y_min")
+        y_max = display_item.get_display_property("y_max")
+        y_min = float(numpy.amin(data)) if y_min is None else float(y_min)
+        y_max = float(numpy.amax(data)) if y_max is None else float(y_max)
+        if y_max <= y_min:
+            y_min, y_max = y_min - 1.0, y_min + 1.0
+        # the plot occupies a centered band with the aspect ratio of the canvas path (308 x 512).
+        plot_height = round(self.height * 308 / 512)
+        plot_top = (self.height - plot_height) // 2
+
+        def to_row(value: _NDArray) -> _NDArray:
+            return numpy.clip(numpy.round((plot_height - 1) * (y_max - value) / (y_max - y_min)), 0, plot_height - 1).astype(numpy.int32)
+
+        rows = numpy.arange(plot_height)[:, numpy.newaxis]
+        top_rows = to_row(column_max)
+        bottom_rows = to_row(column_min)
+        plot_data = numpy.full((plot_height, self.width), 0xFFFFFFFF, dtype=numpy.uint32)
+        if fill_color is not None:
+            baseline_row = to_row(numpy.array(min(max(0.0, y_min), y_max)))
+            fill_mask = (rows >= numpy.minimum(top_rows, baseline_row)) & (rows <= numpy.maximum(bottom_rows, baseline_row))
+            plot_data[fill_mask] = fill_color
+        if stroke_color is not None:
+            plot_data[(rows >= top_rows) & (rows <= bottom_rows)] = stroke_color
+        thumbnail_data = numpy.zeros((self.height, self.width), dtype=numpy.uint32)
+        thumbnail_data[plot_top:plot_top + plot_height] = plot_data
+        return thumbnail_data
+
     @property
     def _is_thumbnail_dirty(self) -> bool:
         return self.__cache_is_dirty
@@ -189,6 +456,14 @@ class ThumbnailManager(metaclass=Utility.Singleton):
                 assert thumbnail_source._ui == ui
             return thumbnail_source
 
+    def set_visible_display_items(self, reporter: typing.Any, display_items: typing.Iterable[DisplayItem.DisplayItem]) -> None:
+        """Report the display items visible in the reporter (a data panel, for instance) so they are rendered first."""
+        ThumbnailSource._scheduler.set_visible(reporter, [display_item.uuid for display_item in display_items])
+
+    @property
+    def scheduler_metrics(self) -> ThumbnailSchedulerMetrics:
+        return ThumbnailSource._scheduler.metrics
+
     def thumbnail_data_for_display_item(self, display_item: typing.Optional[DisplayItem.DisplayItem]) -> typing.Optional[_NDArray]:
         with self.__lock:
             thumbnail_source = self.__thumbnail_sources.get(display_item.uuid) if display_item else None
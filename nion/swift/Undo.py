@@ -5,6 +5,10 @@ import gettext
 import logging
 import typing
 
+if typing.TYPE_CHECKING:
+    from nion.swift.model import Changes
+    from nion.swift.model import DocumentModel
+
 
 _ = gettext.gettext
 
@@ -19,10 +23,14 @@ class UndoableCommand(abc.ABC):
         self.__title = title
         self.__command_id = command_id
         self.__is_mergeable = is_mergeable
+        self.__undelete_logs: typing.List[typing.Tuple[DocumentModel.DocumentModel, Changes.UndeleteLog]] = list()
 
     def close(self) -> None:
         self.__old_modified_state = None
         self.__new_modified_state = None
+        for document_model, undelete_log in self.__undelete_logs:
+            undelete_log.close()
+        self.__undelete_logs = typing.cast(typing.Any, None)
 
     @property
     def title(self) -> str:
@@ -38,16 +46,31 @@ class UndoableCommand(abc.ABC):
 
     @property
     def is_redo_valid(self) -> bool:
-        return self._compare_modified_states(self.__old_modified_state, self._get_modified_state())
+        return self._compare_modified_states(self.__old_modified_state, self._get_modified_state()) and self._can_undelete()
 
     @property
     def is_undo_valid(self) -> bool:
-        return self._compare_modified_states(self.__new_modified_state, self._get_modified_state())
+        return self._compare_modified_states(self.__new_modified_state, self._get_modified_state()) and self._can_undelete()
 
     def _compare_modified_states(self, state1: typing.Any, state2: typing.Any) -> bool:
         # override to allow the undo command to track state; but only use part of the state for comparison
         return bool(state1 == state2)
 
+    def _can_undelete(self) -> bool:
+        # the items deleted by the command must still be restorable; deleted data items may be discarded from the trash.
+        return all(document_model.can_undelete_all(undelete_log) for document_model, undelete_log in self.__undelete_logs)
+
+    def _add_undelete_log(self, document_model: DocumentModel.DocumentModel, undelete_log: Changes.UndeleteLog) -> None:
+        # register the undelete log for items deleted by the command. the command takes ownership of the log.
+        self.__undelete_logs.append((document_model, undelete_log))
+
+    def _undelete_all(self) -> None:
+        # restore the items in the registered undelete logs, most recent first, and release the logs.
+        for document_model, undelete_log in reversed(self.__undelete_logs):
+            document_model.undelete_all(undelete_log)
+            undelete_log.close()
+        self.__undelete_logs.clear()
+
     def initialize(self, modified_state: typing.Any = None) -> None:
         self.__old_modified_state = modified_state if modified_state else self._get_modified_state()
 
@@ -12,6 +12,9 @@ class UndeleteBase(abc.ABC):
     @abc.abstractmethod
     def close(self) -> None: ...
 
+    def can_undelete(self, document_model: DocumentModel.DocumentModel) -> bool:
+        return True
+
     @abc.abstractmethod
     def undelete(self, document_model: DocumentModel.DocumentModel) -> None: ...
 
@@ -32,6 +35,9 @@ class UndeleteLog:
     def append(self, item: UndeleteBase) -> None:
         self.__items.append(item)
 
+    def can_undelete_all(self, document_model: DocumentModel.DocumentModel) -> bool:
+        return all(entry.can_undelete(document_model) for entry in self.__items)
+
     def undelete_all(self, document_model: DocumentModel.DocumentModel) -> None:
         for entry in reversed(self.__items):
             entry.undelete(document_model)
@@ -127,6 +127,99 @@ class SessionManager(abc.ABC):
         pass
 
 
+# default number of bytes of data held in memory above which the data items of a document unload released data. the
+# default of zero unloads released data as soon as it is no longer referenced.
+_g_data_memory_budget = 0
+
+
+class DataMemoryManager:
+    """Track the bytes of data held in memory by data items and unload the least recently used data over budget.
+
+    Data items report when their data is loaded, referenced, released, and unloaded. Released data that can be reloaded
+    from storage is retained so that it does not need to be read again when it is next referenced. When the total
+    bytes held in memory exceed the budget, the least recently used released data is unloaded until the total is
+    within the budget or no released data remains. Referenced data and data that has not been written is never
+    unloaded.
+    """
+
+    def __init__(self, budget: typing.Optional[int] = None) -> None:
+        self.__budget = budget if budget is not None else _g_data_memory_budget
+        self.__lock = threading.RLock()
+        # loaded data items and their bytes, ordered from least to most recently used.
+        self.__loaded_bytes = dict[DataItem, int]()
+        self.__released = set[DataItem]()
+        self.unloaded_count = 0
+
+    @property
+    def budget(self) -> int:
+        return self.__budget
+
+    @budget.setter
+    def budget(self, value: int) -> None:
+        self.__budget = value
+        self.__enforce_budget()
+
+    @property
+    def total_bytes(self) -> int:
+        with self.__lock:
+            return sum(self.__loaded_bytes.values())
+
+    @property
+    def released_bytes(self) -> int:
+        with self.__lock:
+            return sum(self.__loaded_bytes[data_item] for data_item in self.__released)
+
+    @property
+    def data_item_bytes(self) -> typing.Mapping[DataItem, int]:
+        """Return the bytes held in memory for each loaded data item, from least to most recently used."""
+        with self.__lock:
+            return dict(self.__loaded_bytes)
+
+    def _data_loaded(self, data_item: DataItem, nbytes: int, is_referenced: bool) -> None:
+        with self.__lock:
+            self.__loaded_bytes.pop(data_item, None)
+            self.__loaded_bytes[data_item] = nbytes
+            if is_referenced:
+                self.__released.discard(data_item)
+            else:
+                self.__released.add(data_item)
+        self.__enforce_budget()
+
+    def _data_referenced(self, data_item: DataItem) -> None:
+        with self.__lock:
+            nbytes = self.__loaded_bytes.pop(data_item, None)
+            if nbytes is not None:
+                self.__loaded_bytes[data_item] = nbytes
+            self.__released.discard(data_item)
+
+    def _data_released(self, data_item: DataItem) -> None:
+        with self.__lock:
+            if data_item in self.__loaded_bytes:
+                self.__released.add(data_item)
+        self.__enforce_budget()
+
+    def _data_unloaded(self, data_item: DataItem) -> None:
+        with self.__lock:
+            self.__loaded_bytes.pop(data_item, None)
+            self.__released.discard(data_item)
+
+    def __enforce_budget(self) -> None:
+        # choose the data items to unload while holding the lock, but unload them outside of the lock since unloading
+        # requires the data item lock, which may be held by another thread calling into this manager.
+        with self.__lock:
+            excess_bytes = sum(self.__loaded_bytes.values()) - self.__budget
+            candidates = list[DataItem]()
+            for data_item, nbytes in self.__loaded_bytes.items():
+                if excess_bytes <= 0:
+                    break
+                if data_item in self.__released:
+                    candidates.append(data_item)
+                    excess_bytes -= nbytes
+        for data_item in candidates:
+            if data_item._unload_released_data():
+                self.unloaded_count += 1
+
+
 # dates are _local_ time and must use this specific ISO 8601 format. 2013-11-17T08:43:21.389391
 # time zones are offsets (east of UTC) in the following format "+HHMM" or "-HHMM"
 # daylight savings times are time offset (east of UTC) in format "+MM" or "-MM"
@@ -227,6 +320,10 @@ class DataItem(Persistence.PersistentObject):
         self.__metadata: typing.Dict[str, typing.Any] = dict()
         self.__data_ref_count = 0
         self.__data_ref_count_mutex = threading.RLock()
+        # the xdata snapshot is shared by readers until the data or data metadata changes, which increments the
+        # generation. the snapshot is stored with the generation it was made from.
+        self.__xdata_generation = 0
+        self.__xdata_snapshot: typing.Optional[typing.Tuple[int, DataAndMetadata.DataAndMetadata]] = None
         self.__pending_write = True
         self.__in_transaction_state = False
         self.__write_delay_modified_count = 0
@@ -234,6 +331,7 @@ class DataItem(Persistence.PersistentObject):
         self.__source_file_path: typing.Optional[pathlib.Path] = None
         self.__is_live = False
         self.__session_manager: typing.Optional[SessionManager] = None
+        self.__data_memory_manager: typing.Optional[DataMemoryManager] = None
         self.__source_reference = self.create_item_reference()
         self.description_changed_event = Event.Event()
         self.item_changed_event = Event.Event()
@@ -248,6 +346,8 @@ class DataItem(Persistence.PersistentObject):
         self.__change_count_lock = threading.RLock()
         self.__change_changed = False
         self.__change_data_changed = False
+        self.__change_data_slices: typing.Optional[typing.List[typing.Tuple[slice, ...]]] = None
+        self.__data_changed_slices: typing.Optional[typing.Sequence[typing.Tuple[slice, ...]]] = None
         self.__pending_xdata_lock = threading.RLock()
         self.__pending_xdata: typing.Optional[DataAndMetadata.DataAndMetadata] = None
         self.__pending_queue: typing.List[typing.Tuple[DataAndMetadata.DataAndMetadata, typing.Sequence[slice], typing.Sequence[slice], DataAndMetadata.DataMetadata]] = list()
@@ -318,6 +418,8 @@ class DataItem(Persistence.PersistentObject):
         self.__dynamic_title_enabled_stream = typing.cast(typing.Any, None)
         self.__placeholder_title_stream = typing.cast(typing.Any, None)
         self.__data = None
+        self.__xdata_changed()
+        self.set_data_memory_manager(None)
         super().close()
 
     def __str__(self) -> str:
@@ -633,9 +735,15 @@ class DataItem(Persistence.PersistentObject):
                                                                     data_descriptor=data_descriptor,
                                                                     timezone=self.timezone,
                                                                     timezone_offset=self.timezone_offset)
+                self.__xdata_changed()
                 with self.__data_ref_count_mutex:
                     if self.__data_ref_count:
                         self.__load_data()
+                    elif self.__data_and_metadata_unloadable and self.__data is not None:
+                        # drop retained data; it is reloaded when next referenced.
+                        self.__data = None
+                        self.__xdata_changed()
+                        self.__update_data_memory()
                 self.__data_and_metadata_unloadable = self.persistent_object_context is not None
             else:
                 metadata = self._get_persistent_property_value("metadata")
@@ -787,6 +895,7 @@ class DataItem(Persistence.PersistentObject):
         if self.__data_metadata and timezone is not None:
             self.__data_metadata._set_timezone(timezone)
             self.__data_metadata._set_timezone_offset(self.timezone_offset)
+            self.__xdata_changed()
         self.notify_property_changed(name)
 
     # call this when the listeners need to be updated (via data_item_content_changed).
@@ -834,6 +943,17 @@ class DataItem(Persistence.PersistentObject):
     def set_session_manager(self, session_manager: typing.Optional[SessionManager]) -> None:
         self.__session_manager = session_manager
 
+    @property
+    def _data_memory_manager(self) -> typing.Optional[DataMemoryManager]:
+        return self.__data_memory_manager
+
+    def set_data_memory_manager(self, data_memory_manager: typing.Optional[DataMemoryManager]) -> None:
+        with self.__data_ref_count_mutex:
+            if self.__data_memory_manager:
+                self.__data_memory_manager._data_unloaded(self)
+            self.__data_memory_manager = data_memory_manager
+            self.__update_data_memory()
+
     # override from storage to watch for changes to this library item. notify observers.
     def notify_property_changed(self, key: str) -> None:
         super().notify_property_changed(key)
@@ -860,6 +980,7 @@ class DataItem(Persistence.PersistentObject):
         with self.__change_count_lock:
             if self.__change_count == 0:
                 self.__change_thread = threading.current_thread()
+                self.__change_data_slices = list()
             else:
                 if self.__change_thread != threading.current_thread():
                     warnings.warn('begin changes from different threads', RuntimeWarning, stacklevel=2)
@@ -881,10 +1002,12 @@ class DataItem(Persistence.PersistentObject):
                 self.__change_changed = False
                 data_changed = self.__change_data_changed
                 self.__change_data_changed = False
+                data_changed_slices = self.__change_data_slices
         # if the change count is now zero, it means that we're ready
         # to pass on the next value.
         if change_count == 0:
             if data_changed:
+                self.__data_changed_slices = data_changed_slices if data_changed_slices else None
                 self.data_changed_event.fire()
             if not self._is_reading:
                 if data_changed:
@@ -900,6 +1023,8 @@ class DataItem(Persistence.PersistentObject):
             self.__data_ref_count += 1
             if not initial_count or self.__data is None:
                 self.__load_data()
+            if not initial_count and self.__data_memory_manager:
+                self.__data_memory_manager._data_referenced(self)
         return initial_count + 1
 
     def decrement_data_ref_count(self) -> int:
@@ -915,6 +1040,14 @@ class DataItem(Persistence.PersistentObject):
     def _data_ref_count(self) -> int:
         return self.__data_ref_count
 
+    @property
+    def data_changed_slices(self) -> typing.Optional[typing.Sequence[typing.Tuple[slice, ...]]]:
+        """Return the destination slices written by the most recent data change; None if all of the data changed.
+
+        Only partial data updates produce slices. This is intended to be read during the data changed notification.
+        """
+        return self.__data_changed_slices
+
     def set_pending_xdata(self, xd: DataAndMetadata.DataAndMetadata) -> None:
         with self.__pending_xdata_lock:
             self.__pending_xdata = xd
@@ -946,10 +1079,33 @@ class DataItem(Persistence.PersistentObject):
 
     _data_count = 0
 
+    def __xdata_changed(self) -> None:
+        # called when the data or data metadata changes, including changes in place.
+        self.__xdata_generation += 1
+        self.__xdata_snapshot = None
+
+    def __xdata_released(self) -> None:
+        # called when the data is loaded or unloaded without changing. drop the snapshot so it does not hold the data.
+        self.__xdata_snapshot = None
+
+    @property
+    def xdata_generation(self) -> int:
+        """Return a number that changes whenever the data or data metadata changes.
+
+        Read it before reading xdata so that values derived from the xdata can be keyed on it.
+        """
+        return self.__xdata_generation
+
     @property
     def xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+        # return the shared snapshot if it is current. only while the data is referenced, since otherwise reading the
+        # data may load it and the snapshot is discarded when the data is unloaded.
+        xdata_snapshot = self.__xdata_snapshot
+        if xdata_snapshot and xdata_snapshot[0] == self.__xdata_generation and self.__data_ref_count:
+            return xdata_snapshot[1]
         self.increment_data_ref_count()
         try:
+            xdata_generation = self.__xdata_generation
             if self.__data_metadata and self.__data is not None:
                 data_and_metadata = DataAndMetadata.DataAndMetadata(
                     data=self.__data,
@@ -970,6 +1126,8 @@ class DataItem(Persistence.PersistentObject):
 
                 weakref.finalize(data_and_metadata, finalize)
 
+                self.__xdata_snapshot = xdata_generation, data_and_metadata
+
                 return data_and_metadata
 
             return None
@@ -1014,6 +1172,22 @@ class DataItem(Persistence.PersistentObject):
     def data(self) -> typing.Optional[_ImageDataType]:
         return self.__get_data()
 
+    @property
+    def is_data_lazy(self) -> bool:
+        """Return whether the data is read through from storage rather than held in memory.
+
+        Slicing lazy data only reads the requested region from storage. Whole-array operations read all of it.
+
+        This does not load the data. If the data is not loaded, it is lazy if its storage reads through from the file.
+        """
+        data = self.__data
+        if data is not None:
+            return not isinstance(data, numpy.ndarray)
+        if not self.__data_metadata or not self.persistent_storage:
+            return False
+        storage_handler_type = typing.cast(typing.Optional[str], getattr(self.persistent_storage, "get_storage_property")(self, "storage_handler_type"))
+        return storage_handler_type == "hdf5"
+
     def set_data(self, data: _ImageDataType, data_modified: typing.Optional[datetime.datetime] = None) -> None:
         timezone = Utility.get_local_timezone()
         timezone_offset = Utility.TimezoneMinutesToStringConverter().convert(Utility.local_utcoffset_minutes())
@@ -1092,6 +1266,7 @@ class DataItem(Persistence.PersistentObject):
         with self.data_source_changes():
             if self.__data_metadata:  # handle case of missing data and metadata but doing recording
                 self.__data_metadata._set_intensity_calibration(intensity_calibration)
+                self.__xdata_changed()
             self.__intensity_calibration = copy.deepcopy(intensity_calibration)  # backup in case of no data and metadata
             self._set_persistent_property_value("intensity_calibration", intensity_calibration)
 
@@ -1108,6 +1283,7 @@ class DataItem(Persistence.PersistentObject):
         with self.data_source_changes():
             if self.__data_metadata:  # handle case of missing data and metadata but doing recording
                 self.__data_metadata._set_dimensional_calibrations(dimensional_calibrations)
+                self.__xdata_changed()
             self.__dimensional_calibrations = copy.deepcopy(list(dimensional_calibrations))  # backup in case of no data and metadata
             self._set_persistent_property_value("dimensional_calibrations", CalibrationList(dimensional_calibrations))
 
@@ -1129,6 +1305,7 @@ class DataItem(Persistence.PersistentObject):
     def data_modified(self, value: datetime.datetime) -> None:
         if self.__data_metadata:
             self.__data_metadata._set_timestamp(value)
+            self.__xdata_changed()
             self._set_persistent_property_value("data_modified", value)
             self.__metadata_property_changed("data_modified", value)
 
@@ -1141,6 +1318,7 @@ class DataItem(Persistence.PersistentObject):
     def timezone(self, value: str | None) -> None:
         if self.__data_metadata:
             self.__data_metadata._set_timezone(value)
+            self.__xdata_changed()
             self._set_persistent_property_value("timezone", value)
             self.__timezone_property_changed("timezone", value)
 
@@ -1153,6 +1331,7 @@ class DataItem(Persistence.PersistentObject):
     def timezone_offset(self, value: str | None) -> None:
         if self.__data_metadata:
             self.__data_metadata._set_timezone_offset(value)
+            self.__xdata_changed()
             self._set_persistent_property_value("timezone_offset", value)
             self.__timezone_property_changed("timezone_offset", value)
 
@@ -1167,6 +1346,7 @@ class DataItem(Persistence.PersistentObject):
             assert isinstance(metadata, dict)
             if self.__data_metadata:
                 self.__data_metadata._set_metadata(metadata)
+                self.__xdata_changed()
             self.__metadata = copy.deepcopy(metadata) if metadata else dict()
             self._set_persistent_property_value("metadata", self.__metadata)
 
@@ -1193,10 +1373,42 @@ class DataItem(Persistence.PersistentObject):
     def __load_data(self) -> None:
         if self.persistent_object_context and self.__data is None and self.__data_metadata:
             self.__data = typing.cast(typing.Optional[_ImageDataType], self.read_external_data("data"))
+            self.__xdata_released()
+            self.__update_data_memory()
 
     def __unload_data(self) -> None:
         if self.__data_and_metadata_unloadable:
-            self.__data = None
+            if self.__data_memory_manager and isinstance(self.__data, numpy.ndarray):
+                # retain the data until the memory manager needs the memory.
+                self.__data_memory_manager._data_released(self)
+            else:
+                self.__data = None
+                self.__xdata_released()
+                self.__update_data_memory()
+
+    def _unload_released_data(self) -> bool:
+        # called from the memory manager to unload data that is no longer referenced. the lock is not waited for to
+        # avoid lock ordering problems; if it is held, the data is in use and is not unloaded.
+        if self.__data_ref_count_mutex.acquire(blocking=False):
+            try:
+                if not self.__data_ref_count and self.__data_and_metadata_unloadable and not self.__pending_write and self.__data is not None:
+                    self.__data = None
+                    self.__xdata_released()
+                    self.__update_data_memory()
+                    return True
+            finally:
+                self.__data_ref_count_mutex.release()
+        return False
+
+    def __update_data_memory(self) -> None:
+        # report the bytes of the data held in memory to the memory manager. read through data is not counted.
+        data_memory_manager = self.__data_memory_manager
+        if data_memory_manager:
+            data = self.__data
+            if isinstance(data, numpy.ndarray):
+                data_memory_manager._data_loaded(self, data.nbytes, self.__data_ref_count > 0)
+            else:
+                data_memory_manager._data_unloaded(self)
 
     @property
     def is_unloadable(self) -> bool:
@@ -1204,6 +1416,8 @@ class DataItem(Persistence.PersistentObject):
 
     def _force_unload(self) -> None:
         self.__data = None
+        self.__xdata_changed()
+        self.__update_data_memory()
 
     def __set_data_metadata_direct(self, data_metadata: DataAndMetadata.DataMetadata,
                                    data_modified: typing.Optional[datetime.datetime] = None) -> None:
@@ -1214,6 +1428,7 @@ class DataItem(Persistence.PersistentObject):
         # save the data_metadata. this must go before setting the persistent properties below because
         # of how the recorder works (grabs the attribute from data item).
         self.__data_metadata = copy.deepcopy(data_metadata)
+        self.__xdata_changed()
         # set the persistent values for the data_metadata
         self._set_persistent_property_value("data_shape", data_metadata.data_shape)
         self._set_persistent_property_value("data_dtype", DtypeToStringConverter().convert(data_metadata.data_dtype))
@@ -1238,10 +1453,13 @@ class DataItem(Persistence.PersistentObject):
                                        data_modified: typing.Optional[datetime.datetime] = None) -> None:
         assert self.__data_ref_count > 0
         self.__data = data_and_metadata.data if data_and_metadata else None
+        self.__xdata_changed()
+        self.__update_data_memory()
         if data_and_metadata:
             self.__set_data_metadata_direct(data_and_metadata.data_metadata, data_modified)
         self.__change_changed = True
         self.__change_data_changed = True
+        self.__change_data_slices = None  # all of the data changed
         if self._session_manager:
             session_id = self._session_manager.current_session_id
             self.session_id = session_id
@@ -1331,9 +1549,12 @@ class DataItem(Persistence.PersistentObject):
                     assert self.data_dtype == data_metadata.data_dtype
                     assert self.data_dtype == data_and_metadata.data_dtype, f"{self.data_dtype=} == {data_and_metadata.data_dtype=}"
                     self.__data[tuple(dst)] = data_and_metadata._data_ex[tuple(src)]
+                    self.__xdata_changed()
                     # mark changes and update session
                     self.__change_changed = True
                     self.__change_data_changed = True
+                    if self.__change_data_slices is not None:
+                        self.__change_data_slices.append(tuple(dst))
                     if self._session_manager:
                         session_id = self._session_manager.current_session_id
                         self.session_id = session_id
@@ -9,8 +9,10 @@ import dataclasses
 import datetime
 import functools
 import gettext
+import logging
 import math
 import numbers
+import os
 import weakref
 
 import numpy
@@ -378,6 +380,74 @@ def adjustment_factory(adjustment_d: Persistence.PersistentDictType) -> typing.O
         return None
 
 
+# adjustments which transform each element independently of the others. equalization depends on the histogram of the
+# whole image and is not included.
+_ELEMENT_WISE_ADJUSTMENT_TYPES = {"gamma", "log"}
+
+
+def is_element_wise_adjustments(adjustments: typing.Sequence[Persistence.PersistentDictType]) -> bool:
+    """Return whether all adjustments can be applied to a part of the data independently of the rest."""
+    return all(adjustment_d.get("type", None) in _ELEMENT_WISE_ADJUSTMENT_TYPES for adjustment_d in adjustments)
+
+
+class TiledExecutor:
+    """Execute an element-wise function over an array in strips of rows, spread across worker threads.
+
+    Element-wise display stages can be fused into a single function and run per strip, so that the intermediate arrays
+    are only the size of a strip and stay in cache. NumPy releases the GIL for most operations, so the strips are
+    processed concurrently by a small pool of worker threads.
+
+    The function must return an array with the same number of rows as it is passed. The result is assembled into a
+    single array allocated once the first strip has been computed.
+    """
+
+    def __init__(self, strip_rows: int = 256, max_workers: typing.Optional[int] = None) -> None:
+        self.strip_rows = strip_rows
+        self.max_workers = max_workers if max_workers is not None else min(4, os.cpu_count() or 1)
+        self.__executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.__lock = threading.RLock()
+
+    def __get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self.__lock:
+            if not self.__executor:
+                self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tiled-executor")
+            return self.__executor
+
+    def map_rows(self, fn: typing.Callable[[_ImageDataType], _ImageDataType], data: _ImageDataType) -> _ImageDataType:
+        row_count = data.shape[0] if data.ndim > 0 else 0
+        strip_rows = max(self.strip_rows, 1)
+        if data.ndim < 2 or row_count <= strip_rows or self.max_workers <= 1:
+            return fn(data)
+        # compute the first strip on this thread to determine the result shape and dtype.
+        first_result = fn(data[0:strip_rows])
+        result: _ImageDataType = numpy.empty((row_count,) + first_result.shape[1:], first_result.dtype)
+        result[0:strip_rows] = first_result
+
+        def process_strip(start: int) -> None:
+            stop = min(start + strip_rows, row_count)
+            result[start:stop] = fn(data[start:stop])
+
+        futures = [self.__get_executor().submit(process_strip, start) for start in range(strip_rows, row_count, strip_rows)]
+        for future in futures:
+            future.result()  # re-raises exceptions from the strip
+        return result
+
+
+_tiled_executor = TiledExecutor()
+
+
+def _normalize_and_adjust_data(data: _ImageDataType, display_range: typing.Tuple[float, float],
+                               adjustments: typing.Sequence[AdjustmentType]) -> _ImageDataType:
+    # normalize the data to [0, 1] and apply the adjustments. see NormalizedDataProcessor and AdjustedDataProcessor.
+    display_limit_low, display_limit_high = display_range
+    m = 1 / (display_limit_high - display_limit_low) if display_limit_high != display_limit_low else 0.0
+    b = -display_limit_low
+    data = float(m) * (data + float(b))
+    for adjustment in adjustments:
+        data = adjustment.transform(data, display_range)
+    return data
+
+
 @typing.runtime_checkable
 class ProcessorLike(typing.Protocol):
     """A processor like object that can be used to process data and metadata.
@@ -482,6 +552,24 @@ class ProcessorBase(ProcessorLike):
         with self.__lock:
             self.__results[key] = value
 
+    def _release_parameter(self, key: str) -> None:
+        # release a parameter that is only used for the computation, for instance a previous result, without marking
+        # the processor as dirty.
+        with self.__lock:
+            self.__parameters.pop(key, None)
+
+    def get_computed_result(self, key: str) -> typing.Any:
+        """Return the result if it has already been computed, without computing it. Otherwise return None.
+
+        Does not wait if the result is being computed on another thread.
+        """
+        if self.__lock.acquire(blocking=False):
+            try:
+                return self.__results.get(key, None) if not self.__dirty else None
+            finally:
+                self.__lock.release()
+        return None
+
     def _get_data_and_metadata_like(self, key: str) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
         input_data_and_metadata = self._get_parameter(key)
         return DataAndMetadata.promote_ndarray(input_data_and_metadata) if input_data_and_metadata is not None else None
@@ -549,24 +637,51 @@ class DisplayDataProcessor(ProcessorBase):
         self.set_result("data", data_and_metadata)
 
 
+RowRangesType = typing.Tuple[_ImageDataType, _ImageDataType]
+
+
 class DataRangeProcessor(ProcessorBase):
+    """Calculate the data range of the display data.
+
+    For 2d display data, the minimum and maximum of each row are kept as the 'row_ranges' result. When the previous
+    row ranges and the rows changed since then (dirty_rows) are supplied, only the changed rows are reduced and the
+    data range is merged from the row ranges, which is exact whether the range widens or narrows.
+    """
+
     def __init__(self, *,
                  data_metadata: DataAndMetadata.DataMetadata | ProcessorConnection | None = None,
-                 display_data: typing.Union[typing.Optional[DataAndMetadata._DataAndMetadataLike], ProcessorConnection] = None) -> None:
-        super().__init__(data_metadata=data_metadata, display_data=display_data)
+                 display_data: typing.Union[typing.Optional[DataAndMetadata._DataAndMetadataLike], ProcessorConnection] = None,
+                 previous_row_ranges: typing.Optional[RowRangesType] = None,
+                 dirty_rows: typing.Optional[slice] = None) -> None:
+        super().__init__(data_metadata=data_metadata, display_data=display_data, previous_row_ranges=previous_row_ranges, dirty_rows=dirty_rows)
 
     def _execute(self) -> None:
         data_metadata = typing.cast(DataAndMetadata.DataMetadata | None, self._get_parameter("data_metadata"))
         display_data_and_metadata = self._get_data_and_metadata_like("display_data")
         display_data = display_data_and_metadata.data if display_data_and_metadata else None
+        previous_row_ranges = typing.cast(typing.Optional[RowRangesType], self._get_parameter("previous_row_ranges"))
+        dirty_rows = typing.cast(typing.Optional[slice], self._get_parameter("dirty_rows"))
         data_range: typing.Optional[typing.Tuple[float, float]]
+        row_ranges: typing.Optional[RowRangesType] = None
         if display_data is not None and display_data.shape and data_metadata:
             data_shape = data_metadata.data_shape
             data_dtype = data_metadata.data_dtype
             if Image.is_shape_and_dtype_rgb_type(data_shape, data_dtype):
                 data_range = (0, 255)
-            elif Image.is_shape_and_dtype_complex_type(data_shape, data_dtype):
-                data_range = (numpy.amin(display_data), numpy.amax(display_data))
+            elif display_data.ndim == 2:
+                row_mins: _ImageDataType
+                row_maxs: _ImageDataType
+                if previous_row_ranges is not None and dirty_rows is not None and previous_row_ranges[0].shape == display_data.shape[:1] and previous_row_ranges[0].dtype == display_data.dtype:
+                    row_mins = numpy.copy(previous_row_ranges[0])
+                    row_maxs = numpy.copy(previous_row_ranges[1])
+                    if dirty_rows.stop > dirty_rows.start:
+                        row_mins[dirty_rows] = numpy.amin(display_data[dirty_rows], axis=1)
+                        row_maxs[dirty_rows] = numpy.amax(display_data[dirty_rows], axis=1)
+                else:
+                    row_mins = numpy.amin(display_data, axis=1)
+                    row_maxs = numpy.amax(display_data, axis=1)
+                row_ranges = row_mins, row_maxs
+                data_range = (numpy.amin(row_mins), numpy.amax(row_maxs))
             else:
                 data_range = (numpy.amin(display_data), numpy.amax(display_data))
         else:
@@ -580,6 +695,8 @@ class DataRangeProcessor(ProcessorBase):
             if numpy.issubdtype(type(data_range[1]), numpy.bool_):
                 data_range = (data_range[0], int(data_range[1]))
         self.set_result("data_range", data_range)
+        self.set_result("row_ranges", row_ranges)
+        self._release_parameter("previous_row_ranges")
 
 
 class DisplayRangeProcessor(ProcessorBase):
@@ -606,25 +723,51 @@ class DisplayRangeProcessor(ProcessorBase):
 
 
 class DisplayRGBProcessor(ProcessorBase):
+    """Calculate the RGBA display data.
+
+    When the previous RGBA data, the display range used to calculate it, and the rows changed since then (dirty_rows)
+    are supplied, and the display range is unchanged, only the changed rows are recolored.
+    """
+
     def __init__(self, *,
                  adjusted_data: typing.Union[typing.Optional[DataAndMetadata._DataAndMetadataLike], ProcessorConnection] = None,
                  data_range: typing.Union[typing.Optional[typing.Tuple[float, float]], ProcessorConnection] = None,
                  display_range: typing.Union[typing.Optional[typing.Tuple[float, float]], ProcessorConnection] = None,
-                 color_map_data: typing.Union[typing.Optional[_ImageDataType], ProcessorConnection] = None) -> None:
-        super().__init__(adjusted_data=adjusted_data, data_range=data_range, display_range=display_range, color_map_data=color_map_data)
+                 color_map_data: typing.Union[typing.Optional[_ImageDataType], ProcessorConnection] = None,
+                 previous_display_rgba: typing.Optional[_ImageDataType] = None,
+                 previous_display_range: typing.Optional[typing.Tuple[float, float]] = None,
+                 dirty_rows: typing.Optional[slice] = None) -> None:
+        super().__init__(adjusted_data=adjusted_data, data_range=data_range, display_range=display_range, color_map_data=color_map_data,
+                         previous_display_rgba=previous_display_rgba, previous_display_range=previous_display_range, dirty_rows=dirty_rows)
 
     def _execute(self) -> None:
         adjusted_data_and_metadata = self._get_data_and_metadata_like("adjusted_data")
         data_range = typing.cast(typing.Optional[typing.Tuple[float, float]], self._get_parameter("data_range"))
         display_range = typing.cast(typing.Optional[typing.Tuple[float, float]], self._get_parameter("display_range"))
         color_map_data = typing.cast(typing.Optional[_ImageDataType], self._get_parameter("color_map_data"))
+        previous_display_rgba = typing.cast(typing.Optional[_ImageDataType], self._get_parameter("previous_display_rgba"))
+        previous_display_range = typing.cast(typing.Optional[typing.Tuple[float, float]], self._get_parameter("previous_display_range"))
+        dirty_rows = typing.cast(typing.Optional[slice], self._get_parameter("dirty_rows"))
         display_rgba_data: typing.Optional[_ImageDataType] = None
         if adjusted_data_and_metadata:
             if data_range is not None:  # workaround until validating and retrieving data stats is an atomic operation
                 # display_range is just display_limits but calculated if display_limits is None
-                display_rgba = Core.function_display_rgba(adjusted_data_and_metadata, display_range, color_map_data)
-                display_rgba_data = display_rgba.data if display_rgba else None
+                adjusted_data = adjusted_data_and_metadata.data
+                if (adjusted_data is not None and adjusted_data.ndim == 2 and display_range is not None and
+                        previous_display_rgba is not None and dirty_rows is not None and
+                        previous_display_rgba.shape == adjusted_data.shape and previous_display_range == display_range):
+                    # only the dirty rows have changed; recolor them. copy since the previous rgba may be in use.
+                    display_rgba_data = numpy.copy(previous_display_rgba)
+                    if dirty_rows.stop > dirty_rows.start:
+                        display_rgba_data[dirty_rows] = Image.create_rgba_image_from_array(adjusted_data[dirty_rows], display_limits=display_range, lookup=color_map_data)
+                elif adjusted_data is not None and adjusted_data.ndim == 2 and display_range is not None:
+                    # scalar 2d data is colored per element; process it in strips.
+                    display_rgba_data = _tiled_executor.map_rows(functools.partial(Image.create_rgba_image_from_array, display_limits=display_range, lookup=color_map_data), adjusted_data)
+                else:
+                    display_rgba = Core.function_display_rgba(adjusted_data_and_metadata, display_range, color_map_data)
+                    display_rgba_data = display_rgba.data if display_rgba else None
         self.set_result("display_rgba", display_rgba_data)
+        self._release_parameter("previous_display_rgba")
 
 
 class NormalizedDataProcessor(ProcessorBase):
@@ -642,7 +785,10 @@ class NormalizedDataProcessor(ProcessorBase):
             # normalize the data to [0, 1].
             m = 1 / (display_limit_high - display_limit_low) if display_limit_high != display_limit_low else 0.0
             b = -display_limit_low
-            data_and_metadata = DataAndMetadata.new_data_and_metadata(data=float(m) * (display_data_and_metadata.data + float(b)),
+            display_data = display_data_and_metadata.data
+            assert display_data is not None
+            normalized_data = _tiled_executor.map_rows(lambda d: float(m) * (d + float(b)), display_data)
+            data_and_metadata = DataAndMetadata.new_data_and_metadata(data=normalized_data,
                                                                       dimensional_calibrations=display_data_and_metadata.dimensional_calibrations,
                                                                       timestamp=display_data_and_metadata.timestamp,
                                                                       timezone=display_data_and_metadata.timezone,
@@ -663,7 +809,19 @@ class AdjustedDataProcessor(ProcessorBase):
         display_range = typing.cast(typing.Optional[typing.Tuple[float, float]], self._get_parameter("display_range"))
         adjustments = typing.cast(typing.Optional[typing.Sequence[Persistence.PersistentDictType]], self._get_parameter("adjustments"))
         adjusted_data_and_metadata: typing.Optional[DataAndMetadata.DataAndMetadata] = display_data_and_metadata
-        if adjustments:
+        if adjustments and is_element_wise_adjustments(adjustments):
+            # fuse the normalization and the adjustments per strip to avoid the full size normalized intermediate.
+            adjusted_data_and_metadata = None
+            display_data = display_data_and_metadata.data if display_data_and_metadata else None
+            if display_data_and_metadata and display_data is not None and display_range is not None:
+                adjustment_list = [adjustment for adjustment in map(adjustment_factory, adjustments) if adjustment]
+                adjusted_data_and_metadata = DataAndMetadata.new_data_and_metadata(
+                    _tiled_executor.map_rows(functools.partial(_normalize_and_adjust_data, display_range=display_range, adjustments=adjustment_list), display_data),
+                    dimensional_calibrations=display_data_and_metadata.dimensional_calibrations,
+                    timestamp=display_data_and_metadata.timestamp,
+                    timezone=display_data_and_metadata.timezone,
+                    timezone_offset=display_data_and_metadata.timezone_offset)
+        elif adjustments:
             # only request normalized data and metadata if required
             normalized_data_and_metadata = self._get_data_and_metadata_like("normalized_data")
             adjusted_data_and_metadata = normalized_data_and_metadata
@@ -733,7 +891,18 @@ class TransformedDataProcessor(ProcessorBase):
         transformed_display_range = typing.cast(typing.Optional[typing.Tuple[float, float]], self._get_parameter("transformed_display_range"))
         transformed_data_and_metadata: typing.Optional[DataAndMetadata.DataAndMetadata] = None
         if adjusted_data_and_metadata:
-            transformed_data_and_metadata = Core.function_rescale(adjusted_data_and_metadata, data_range=(0.0, 1.0), in_range=transformed_display_range)
+            adjusted_data = adjusted_data_and_metadata.data
+            if adjusted_data is not None and adjusted_data.ndim == 2 and transformed_display_range is not None:
+                # rescaling with a known input range is element-wise; process it in strips.
+                transformed_data = _tiled_executor.map_rows(lambda d: Core.function_rescale(d, data_range=(0.0, 1.0), in_range=transformed_display_range).data, adjusted_data)
+                transformed_data_and_metadata = DataAndMetadata.new_data_and_metadata(data=transformed_data,
+                                                                                      intensity_calibration=Calibration.Calibration(),
+                                                                                      dimensional_calibrations=adjusted_data_and_metadata.dimensional_calibrations,
+                                                                                      timestamp=adjusted_data_and_metadata.timestamp,
+                                                                                      timezone=adjusted_data_and_metadata.timezone,
+                                                                                      timezone_offset=adjusted_data_and_metadata.timezone_offset)
+            else:
+                transformed_data_and_metadata = Core.function_rescale(adjusted_data_and_metadata, data_range=(0.0, 1.0), in_range=transformed_display_range)
         self.set_result("data", transformed_data_and_metadata)
 
 
@@ -760,7 +929,9 @@ class DisplayValues:
                  display_limits: DisplayLimitsType,
                  complex_display_type: typing.Optional[str],
                  color_map_data: typing.Optional[_RGBA32Type], brightness: float, contrast: float,
-                 adjustments: typing.Sequence[Persistence.PersistentDictType]) -> None:
+                 adjustments: typing.Sequence[Persistence.PersistentDictType], *,
+                 previous_display_values: typing.Optional[DisplayValues] = None,
+                 dirty_rows: typing.Optional[slice] = None) -> None:
         DisplayValues._count += 1
 
         self.__data_and_metadata = data_and_metadata
@@ -768,6 +939,23 @@ class DisplayValues:
 
         data_metadata = data_and_metadata.data_metadata if data_and_metadata else None
 
+        # when the previous display values were calculated with the same parameters from the same data, except for the
+        # dirty rows of the display data, their already-computed results are used to only update the dirty rows. only
+        # computed values are taken so that display values do not hold a chain of previous display values.
+        previous_row_ranges: typing.Optional[RowRangesType] = None
+        previous_display_rgba: typing.Optional[_ImageDataType] = None
+        previous_display_range: typing.Optional[typing.Tuple[float, float]] = None
+        if previous_display_values and dirty_rows is not None:
+            previous_row_ranges, previous_display_rgba, previous_display_range = previous_display_values._get_computed_partial_update_results()
+            # the colors of the clean rows can only be reused if each element is colored independently of the others
+            # (equalization, for instance, depends on the whole image) and with the same color map.
+            previous_color_map_data = previous_display_values.color_map_data
+            same_color_map = (previous_color_map_data is None and color_map_data is None) or (
+                    previous_color_map_data is not None and color_map_data is not None and numpy.array_equal(previous_color_map_data, color_map_data))
+            if not is_element_wise_adjustments(adjustments) or not same_color_map:
+                previous_display_rgba = None
+                previous_display_range = None
+
         self.__element_data_processor = ElementDataProcessor(data=data_and_metadata,
                                                              sequence_index=sequence_index,
                                                              collection_index=collection_index,
@@ -781,6 +969,8 @@ class DisplayValues:
         self.__data_range_processor = DataRangeProcessor(
             data_metadata=data_metadata,
             display_data=ProcessorConnection(self.__display_data_processor, "data", "display_data"),
+            previous_row_ranges=previous_row_ranges,
+            dirty_rows=dirty_rows,
         )
 
         self.__display_range_processor = DisplayRangeProcessor(
@@ -816,7 +1006,10 @@ class DisplayValues:
             adjusted_data=ProcessorConnection(self.__adjusted_data_processor, "data", "adjusted_data"),
             data_range=ProcessorConnection(self.__data_range_processor, "data_range"),
             display_range=ProcessorConnection(self.__transformed_display_range_processor, "display_range"),
-            color_map_data=color_map_data
+            color_map_data=color_map_data,
+            previous_display_rgba=previous_display_rgba,
+            previous_display_range=previous_display_range,
+            dirty_rows=dirty_rows,
         )
 
         self.__transformed_data_processor = TransformedDataProcessor(
@@ -881,6 +1074,33 @@ class DisplayValues:
     def transformed_display_range(self) -> typing.Tuple[float, float]:
         return typing.cast(typing.Tuple[float, float], self.__transformed_display_range_processor.get_result("display_range"))
 
+    def _get_computed_partial_update_results(self) -> typing.Tuple[typing.Optional[RowRangesType], typing.Optional[_ImageDataType], typing.Optional[typing.Tuple[float, float]]]:
+        # return the computed row ranges, display rgba, and display range used to update only the dirty rows of the
+        # following display values, without computing anything.
+        return (typing.cast(typing.Optional[RowRangesType], self.__data_range_processor.get_computed_result("row_ranges")),
+                typing.cast(typing.Optional[_ImageDataType], self.__display_rgb_processor.get_computed_result("display_rgba")),
+                typing.cast(typing.Optional[typing.Tuple[float, float]], self.__transformed_display_range_processor.get_computed_result("display_range")))
+
+    def get_computed_arrays(self) -> typing.Sequence[_ImageDataType]:
+        """Return the arrays computed and owned by these display values, without computing anything.
+
+        Arrays that are views of other arrays, such as a slice of the input data, are not included.
+        """
+        results = [
+            self.__element_data_processor.get_computed_result("data"),
+            self.__display_data_processor.get_computed_result("data"),
+            self.__normalized_data_processor.get_computed_result("data"),
+            self.__adjusted_data_processor.get_computed_result("data"),
+            self.__transformed_data_processor.get_computed_result("data"),
+            self.__display_rgb_processor.get_computed_result("display_rgba"),
+        ]
+        arrays = dict[int, _ImageDataType]()
+        for result in results:
+            array = result.data if isinstance(result, DataAndMetadata.DataAndMetadata) else result
+            if isinstance(array, numpy.ndarray) and array.base is None:
+                arrays[id(array)] = array
+        return list(arrays.values())
+
     def get_calibration_styles(self) -> typing.Sequence[CalibrationStyle]:
         display_xdata = self.display_data_and_metadata
         return get_calibration_styles([display_xdata.data_metadata if display_xdata else None])
@@ -893,9 +1113,75 @@ class DisplayValues:
 DisplayValuesSubscription = object
 
 
+class DisplayValuesCache:
+    """A bounded, least-recently-used cache of display values.
+
+    The keys are tuples of the slice/index parameters and display properties used to construct the display values. The
+    keys are compared by equality (they may contain lists and dicts) so the cache is searched linearly; it is small.
+
+    The display values compute their results lazily and retain them, so a cached display values object for an index
+    that was viewed recently does not need to be recomputed.
+
+    The cache is bounded by the number of entries and by the bytes of the arrays computed by the entries. The bytes are
+    measured when an entry is added, since the display values compute lazily; the most recent entry is always kept.
+    """
+
+    def __init__(self, max_count: int = 16, max_nbytes: int = 256 * 1024 * 1024) -> None:
+        self.max_count = max_count
+        self.max_nbytes = max_nbytes
+        self.__entries = list[tuple[typing.Any, DisplayValues]]()
+        self.__lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def get(self, key: typing.Any) -> typing.Optional[DisplayValues]:
+        with self.__lock:
+            for index, (entry_key, display_values) in enumerate(self.__entries):
+                if entry_key == key:
+                    # move to the end, which is the most recently used.
+                    self.__entries.append(self.__entries.pop(index))
+                    return display_values
+        return None
+
+    def __contains__(self, key: typing.Any) -> bool:
+        # unlike get, this does not make the entry the most recently used.
+        with self.__lock:
+            return any(entry_key == key for entry_key, _ in self.__entries)
+
+    def put(self, key: typing.Any, display_values: DisplayValues) -> None:
+        with self.__lock:
+            self.__entries = [entry for entry in self.__entries if entry[0] != key]
+            self.__entries.append((key, display_values))
+            while len(self.__entries) > max(self.max_count, 0):
+                self.__entries.pop(0)
+            while len(self.__entries) > 1 and self.__get_nbytes() > self.max_nbytes:
+                self.__entries.pop(0)
+
+    def __get_nbytes(self) -> int:
+        # arrays may be shared between display values, so count each array once.
+        arrays = dict[int, _ImageDataType]()
+        for _, display_values in self.__entries:
+            for array in display_values.get_computed_arrays():
+                arrays[id(array)] = array
+        return sum(array.nbytes for array in arrays.values())
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries = list()
+
+    @property
+    def display_values_list(self) -> typing.Sequence[DisplayValues]:
+        with self.__lock:
+            return [display_values for _, display_values in self.__entries]
+
+
 class DisplayDataChannel(Persistence.PersistentObject):
     _executor = concurrent.futures.ThreadPoolExecutor()
     _force_sync = 0  # for running tests
+    _display_values_cache_size = 16
+    _display_values_cache_nbytes = 256 * 1024 * 1024
 
     def __init__(self, data_item: typing.Optional[DataItem.DataItem] = None) -> None:
         super().__init__()
@@ -943,6 +1229,17 @@ class DisplayDataChannel(Persistence.PersistentObject):
         self.__computed_display_values_stream = Stream.ValueStream[DisplayValues]()
         self.__computed_display_values_subscription_count = 0
 
+        # cache of display values for recently viewed slices/indexes. the generation is incremented whenever the cache
+        # is cleared so that prefetched display values computed from stale data are not added to the cache.
+        self.__display_values_cache = DisplayValuesCache(DisplayDataChannel._display_values_cache_size, DisplayDataChannel._display_values_cache_nbytes)
+        self.__display_values_cache_generation = 0
+        self.__prefetch_future: typing.Optional[concurrent.futures.Future[None]] = None
+
+        # track the rows of the display data changed by partial data updates since the last display values were made,
+        # so the next display values can be calculated incrementally. None if all of the rows may have changed.
+        self.__last_display_values_key: typing.Optional[typing.Tuple[typing.Any, ...]] = None
+        self.__dirty_rows: typing.Optional[slice] = None
+
         self.data_item_will_change_event = Event.Event()
         self.data_item_did_change_event = Event.Event()
         self.data_item_changed_event = Event.Event()
@@ -1015,6 +1312,11 @@ class DisplayDataChannel(Persistence.PersistentObject):
             display_values_future = self.__display_values_future
         if display_values_future:
             display_values_future.result()
+        with self.__display_values_update_lock:
+            prefetch_future = self.__prefetch_future
+        if prefetch_future:
+            prefetch_future.result()
+        self.__clear_display_values_cache()
         self.__display_values_stream = typing.cast(typing.Any, None)
         self.__computed_display_values_stream = typing.cast(typing.Any, None)
         # continue close.
@@ -1207,6 +1509,8 @@ class DisplayDataChannel(Persistence.PersistentObject):
             self.modified_state += 1
 
         def data_changed() -> None:
+            self.__clear_display_values_cache()
+            self.__add_dirty_rows(self.__data_item.data_changed_slices if self.__data_item else None)
             data_metadata = self._get_data_metadata()
             new_data_shape = data_metadata.data_shape if data_metadata else None
             if new_data_shape != self.__old_data_shape:
@@ -1214,12 +1518,20 @@ class DisplayDataChannel(Persistence.PersistentObject):
             self.__old_data_shape = new_data_shape
             self.data_item_changed_event.fire()
 
+        def data_item_changed() -> None:
+            # calibrations and metadata are part of the display values, so the cached display values are invalid.
+            self.__clear_display_values_cache()
+            self.data_item_changed_event.fire()
+
+        self.__clear_display_values_cache()
+        self.__last_display_values_key = None
+
         if self.__data_item:
             self.__data_item_property_changed_event_listener = self.__data_item.property_changed_event.listen(property_changed)
             self.__data_item_will_change_listener = self.__data_item.will_change_event.listen(self.data_item_will_change_event.fire)
             self.__data_item_did_change_listener = self.__data_item.did_change_event.listen(self.data_item_did_change_event.fire)
-            self.__data_item_item_changed_listener = self.__data_item.item_changed_event.listen(self.data_item_changed_event.fire)
-            self.__data_item_data_item_changed_listener = self.__data_item.data_item_changed_event.listen(self.data_item_changed_event.fire)
+            self.__data_item_item_changed_listener = self.__data_item.item_changed_event.listen(data_item_changed)
+            self.__data_item_data_item_changed_listener = self.__data_item.data_item_changed_event.listen(data_item_changed)
             self.__data_item_data_changed_listener = self.__data_item.data_changed_event.listen(data_changed)
             self.__data_item_description_changed_listener = self.__data_item.description_changed_event.listen(self.data_item_description_changed_event.fire)
 
@@ -1577,18 +1889,82 @@ class DisplayDataChannel(Persistence.PersistentObject):
     def subscribe_to_latest_display_values(self, callback: typing.Callable[[typing.Optional[DisplayValues]], None]) -> DisplayValuesSubscription:
         return Stream.ValueStreamAction(self.__display_values_stream, callback)
 
+    def __clear_display_values_cache(self) -> None:
+        with self.__display_values_update_lock:
+            self.__display_values_cache.clear()
+            self.__display_values_cache_generation += 1
+
+    def get_display_values_nbytes(self) -> int:
+        """Return the bytes of the computed display values held by this display data channel, including the cache."""
+        display_values_list = list(self.__display_values_cache.display_values_list)
+        latest_display_values = self.get_latest_display_values()
+        if latest_display_values:
+            display_values_list.append(latest_display_values)
+        arrays = dict[int, _ImageDataType]()
+        for display_values in display_values_list:
+            for array in display_values.get_computed_arrays():
+                arrays[id(array)] = array
+        return sum(array.nbytes for array in arrays.values())
+
+    def _get_display_values_cache_size(self) -> int:
+        # used for testing
+        return len(self.__display_values_cache)
+
+    def __get_display_values_key(self, sequence_index: int, collection_index: typing.Tuple[int, ...]) -> typing.Tuple[typing.Any, ...]:
+        # the key for the display values cache. the data is not part of the key; the cache is cleared when it changes.
+        return (sequence_index, tuple(collection_index), self.slice_center, self.slice_width, self.display_limits,
+                self.complex_display_type, self.color_map_id, self.brightness, self.contrast, list(self.adjustments))
+
+    def __make_display_values(self, xdata: typing.Optional[DataAndMetadata.DataAndMetadata], sequence_index: int,
+                              collection_index: typing.Tuple[int, ...], *,
+                              previous_display_values: typing.Optional[DisplayValues] = None,
+                              dirty_rows: typing.Optional[slice] = None) -> DisplayValues:
+        return DisplayValues(xdata, sequence_index, collection_index, self.slice_center, self.slice_width,
+                             self.display_limits, self.complex_display_type, self.__color_map_data, self.brightness,
+                             self.contrast, self.adjustments, previous_display_values=previous_display_values,
+                             dirty_rows=dirty_rows)
+
+    def __add_dirty_rows(self, data_changed_slices: typing.Optional[typing.Sequence[typing.Tuple[slice, ...]]]) -> None:
+        # convert the slices of the data changed by a partial update to the rows of the display data. this is only
+        # possible when the display data is the data itself (a 2d image, not a sequence, collection, or rgb).
+        with self.__display_values_update_lock:
+            data_metadata = self._get_data_metadata()
+            if (not data_changed_slices or not data_metadata or data_metadata.is_sequence or
+                    data_metadata.collection_dimension_count != 0 or len(data_metadata.data_shape) != 2):
+                self.__last_display_values_key = None
+                return
+            row_count = data_metadata.data_shape[0]
+            start, stop = (self.__dirty_rows.start, self.__dirty_rows.stop) if self.__dirty_rows else (row_count, 0)
+            for data_changed_slice in data_changed_slices:
+                row_slice = data_changed_slice[0] if len(data_changed_slice) > 0 else slice(None)
+                if not isinstance(row_slice, slice) or row_slice.indices(row_count)[2] != 1:
+                    self.__last_display_values_key = None
+                    return
+                row_start, row_stop, _ = row_slice.indices(row_count)
+                if row_stop > row_start:
+                    start, stop = min(start, row_start), max(stop, row_stop)
+            self.__dirty_rows = slice(start, max(start, stop))
+
     def __update_display_values_stream_value(self) -> DisplayValues | None:
-        # update the display values stream with a new display values stream value.
+        # update the display values stream with a new display values stream value. use the display values from the
+        # cache if this slice/index has been viewed recently with the same display properties. if only some rows of the
+        # data have changed since the last display values were made with the same properties, pass the last display
+        # values and the dirty rows so that only the dirty rows are recalculated where possible.
         with self.__display_values_update_lock:
             if self.__data_item:
-                display_values = DisplayValues(self.__data_item.xdata,
-                                               self.sequence_index,
-                                               self.collection_index,
-                                               self.slice_center, self.slice_width,
-                                               self.display_limits,
-                                               self.complex_display_type,
-                                               self.__color_map_data, self.brightness,
-                                               self.contrast, self.adjustments)
+                key = self.__get_display_values_key(self.sequence_index, self.collection_index)
+                display_values = self.__display_values_cache.get(key)
+                if not display_values:
+                    previous_display_values: typing.Optional[DisplayValues] = None
+                    dirty_rows: typing.Optional[slice] = None
+                    if self.__dirty_rows is not None and self.__last_display_values_key is not None and self.__last_display_values_key == key:
+                        previous_display_values = self.__display_values_stream.value
+                        dirty_rows = self.__dirty_rows
+                    display_values = self.__make_display_values(self.__data_item.xdata, self.sequence_index, self.collection_index,
+                                                                previous_display_values=previous_display_values, dirty_rows=dirty_rows)
+                    self.__display_values_cache.put(key, display_values)
+                self.__last_display_values_key = key
+                self.__dirty_rows = None
                 self.__has_pending_display_values = True
                 self.__display_values_stream.send_value(display_values)
                 return display_values
@@ -1626,6 +2002,7 @@ class DisplayDataChannel(Persistence.PersistentObject):
                 with self.__display_values_update_lock:
                     if not self.__has_pending_display_values:
                         self.__display_values_future = None
+                        self.__queue_prefetch_display_values()
                         break
 
         # use this only for _force_sync below.
@@ -1649,6 +2026,68 @@ class DisplayDataChannel(Persistence.PersistentObject):
         if DisplayDataChannel._force_sync:
             if display_values_future:
                 display_values_future.result()
+                with self.__display_values_update_lock:
+                    prefetch_future = self.__prefetch_future
+                if prefetch_future:
+                    prefetch_future.result()
+
+    def __get_prefetch_indexes(self) -> typing.List[typing.Tuple[int, typing.Tuple[int, ...]]]:
+        # return the sequence and collection indexes adjacent to the current one. for sequences, the sequence index
+        # is stepped; otherwise the last collection index is stepped. a 2d collection of 1d data is displayed as a
+        # slice sum over the whole collection, which does not depend on the collection index.
+        data_metadata = self._get_data_metadata()
+        sequence_index = self.sequence_index
+        collection_index = tuple(self.collection_index)
+        indexes = list[typing.Tuple[int, typing.Tuple[int, ...]]]()
+        if data_metadata and data_metadata.is_sequence:
+            for i in (sequence_index + 1, sequence_index - 1):
+                if 0 <= i < data_metadata.max_sequence_index:
+                    indexes.append((i, collection_index))
+        elif (data_metadata and data_metadata.collection_dimension_count > 0 and
+              not (data_metadata.collection_dimension_count == 2 and data_metadata.datum_dimension_count == 1)):
+            axis = data_metadata.collection_dimension_count - 1
+            count = data_metadata.collection_dimension_shape[axis]
+            for i in (collection_index[axis] + 1, collection_index[axis] - 1):
+                if 0 <= i < count:
+                    indexes.append((sequence_index, collection_index[:axis] + (i,) + collection_index[axis + 1:]))
+        return indexes
+
+    def __queue_prefetch_display_values(self) -> None:
+        # speculatively compute the display values of the adjacent indexes on the display executor so that stepping
+        # through a sequence or collection finds them in the cache. must be called with the update lock held. live
+        # data changes before the prefetched display values would be used, so do not compete with its updates.
+        if self.__closing or self.__prefetch_future or not self.__data_item or self.__data_item.is_live:
+            return
+        generation = self.__display_values_cache_generation
+        xdata = self.__data_item.xdata
+        prefetch_list = list[tuple[typing.Any, DisplayValues]]()
+        for sequence_index, collection_index in self.__get_prefetch_indexes():
+            key = self.__get_display_values_key(sequence_index, collection_index)
+            if key not in self.__display_values_cache:
+                prefetch_list.append((key, self.__make_display_values(xdata, sequence_index, collection_index)))
+
+        def prefetch_display_values() -> None:
+            try:
+                for key, display_values in prefetch_list:
+                    if self.__closing:
+                        break
+                    try:
+                        display_data_and_metadata = display_values.display_data_and_metadata
+                        if display_data_and_metadata and len(display_data_and_metadata.data_shape) == 2:
+                            getattr(display_values, "display_rgba")
+                        else:
+                            getattr(display_values, "adjusted_data_and_metadata")
+                    except Exception as e:
+                        logging.warning("Unable to prefetch display values: %s", e)
+                    with self.__display_values_update_lock:
+                        if generation == self.__display_values_cache_generation and not self.__closing:
+                            self.__display_values_cache.put(key, display_values)
+            finally:
+                with self.__display_values_update_lock:
+                    self.__prefetch_future = None
+
+        if prefetch_list:
+            self.__prefetch_future = DisplayDataChannel._executor.submit(prefetch_display_values)
 
     def increment_display_ref_count(self, amount: int = 1) -> None:
         """Increment display reference count to indicate this library item is currently displayed."""
@@ -1661,6 +2100,9 @@ class DisplayDataChannel(Persistence.PersistentObject):
         """Decrement display reference count to indicate this library item is no longer displayed."""
         assert not self._closed
         self.__display_ref_count -= amount
+        if self.__display_ref_count == 0:
+            # release the cached display values (and the data they reference) when no longer displayed.
+            self.__clear_display_values_cache()
         if self.__data_item:
             for _ in range(amount):
                 self.__data_item.decrement_data_ref_count()
@@ -2547,8 +2989,9 @@ class DisplayItem(Persistence.PersistentObject):
     def notify_property_changed(self, key: str) -> None:
         super().notify_property_changed(key)
         # this is a hack right now to not notify content changes when only the displayed title changes.
-        # in addition to be more efficient, this avoids a close bug appearing in various tests.
-        if key not in ("displayed_title",):
+        # in addition to be more efficient, this avoids a close bug appearing in various tests. the text for filter
+        # is notified as part of the content changes, so it must not notify content changes itself.
+        if key not in ("displayed_title", "text_for_filter"):
             self._notify_display_item_content_changed()
 
     def __display_type_changed(self, name: str, value: str) -> None:
@@ -2926,6 +3369,9 @@ class DisplayItem(Persistence.PersistentObject):
         # if the change count is now zero, it means that we're ready to notify listeners.
         if change_count == 0:
             self.__write_delay_data_changed = True
+            # the text for filter includes the size and date of the data; notify before item changed so that text
+            # indexes are up to date when filters are re-evaluated.
+            self.notify_property_changed("text_for_filter")
             self.item_changed_event.fire()
             self.__update_displays()  # this ensures that the display will validate
 
@@ -2956,6 +3402,7 @@ class DisplayItem(Persistence.PersistentObject):
     def __item_changed(self) -> None:
         # this event is only triggered when the data item changed live state; everything else goes through
         # the data changed messages.
+        self.notify_property_changed("text_for_filter")
         self.item_changed_event.fire()
         self.notify_property_changed("displayed_title")
 
@@ -7,6 +7,7 @@ import collections
 import concurrent.futures
 import contextlib
 import copy
+import dataclasses
 import datetime
 import functools
 import gettext
@@ -264,6 +265,9 @@ class UndeleteDataItem(Changes.UndeleteBase):
     def close(self) -> None:
         pass
 
+    def can_undelete(self, document_model: DocumentModel) -> bool:
+        return document_model.can_restore_data_item(self.data_item_uuid)
+
     def undelete(self, document_model: DocumentModel) -> None:
         document_model.restore_data_item(self.data_item_uuid, self.index)
         document_model.restore_items_order("data_items", self.order)
@@ -574,6 +578,25 @@ class MappedItemManager(metaclass=Registry.Singleton):
         return None
 
 
+@dataclasses.dataclass(frozen=True)
+class DataMemoryReport:
+    """A snapshot of the bytes held in memory by the data of a document.
+
+    The data item bytes and computation output bytes are the data held by data items; the released bytes are the part
+    of those which is not referenced and will be unloaded first when over budget. The display values bytes are the
+    computed display data held by each display item.
+    """
+    budget: int
+    released_bytes: int
+    data_item_bytes: typing.Mapping[DataItem.DataItem, int]
+    computation_output_bytes: typing.Mapping[DataItem.DataItem, int]
+    display_values_bytes: typing.Mapping[DisplayItem.DisplayItem, int]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.data_item_bytes.values()) + sum(self.computation_output_bytes.values()) + sum(self.display_values_bytes.values())
+
+
 class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, DataItem.SessionManager):
     """Manages storage and dependencies between data items and other objects.
 
@@ -615,6 +638,7 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
         self.__project_property_changed_listener = project.property_changed_event.listen(self.__project_property_changed)
 
         self.__transaction_manager = TransactionManager(self)
+        self.__data_memory_manager = DataItem.DataMemoryManager()
         self.__data_structure_listeners: typing.Dict[DataStructure.DataStructure, Event.EventListener] = dict()
         self.__live_data_items_lock = threading.RLock()
         self.__live_data_items: typing.Dict[uuid.UUID, int] = dict()
@@ -887,6 +911,27 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
     def _project(self) -> Project.Project:
         return self.__project
 
+    @property
+    def data_memory_manager(self) -> DataItem.DataMemoryManager:
+        return self.__data_memory_manager
+
+    def get_data_memory_report(self) -> DataMemoryReport:
+        """Return a report of the bytes held in memory by data items, computation outputs, and display values."""
+        data_item_bytes = dict[DataItem.DataItem, int]()
+        computation_output_bytes = dict[DataItem.DataItem, int]()
+        for data_item, nbytes in self.__data_memory_manager.data_item_bytes.items():
+            if self.get_data_item_computation(data_item):
+                computation_output_bytes[data_item] = nbytes
+            else:
+                data_item_bytes[data_item] = nbytes
+        display_values_bytes = dict[DisplayItem.DisplayItem, int]()
+        for display_item in self.__display_items:
+            nbytes = sum(display_data_channel.get_display_values_nbytes() for display_data_channel in display_item.display_data_channels)
+            if nbytes:
+                display_values_bytes[display_item] = nbytes
+        return DataMemoryReport(self.__data_memory_manager.budget, self.__data_memory_manager.released_bytes,
+                                data_item_bytes, computation_output_bytes, display_values_bytes)
+
     @property
     def implicit_dependencies(self) -> typing.List[AbstractImplicitDependency]:
         return self.__implicit_dependencies
@@ -926,6 +971,7 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
         self.__data_items.append(data_item)
         data_item._document_model = self
         data_item.set_session_manager(self)
+        data_item.set_data_memory_manager(self.__data_memory_manager)
         self.notify_insert_item("data_items", data_item, before_index)
         self.__transaction_manager._add_item(data_item)
 
@@ -938,6 +984,7 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
         self.data_item_will_be_removed_event.fire(data_item)
         # remove it from the persistent_storage
         data_item._document_model = None
+        data_item.set_data_memory_manager(None)
         assert data_item is not None
         assert data_item in self.data_items
         index = self.data_items.index(data_item)
@@ -967,6 +1014,9 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
     def restore_data_item(self, data_item_uuid: uuid.UUID, before_index: int = 0) -> typing.Optional[DataItem.DataItem]:
         return self._project.restore_data_item(data_item_uuid)
 
+    def can_restore_data_item(self, data_item_uuid: uuid.UUID) -> bool:
+        return self._project.can_restore_data_item(data_item_uuid)
+
     def restore_items_order(self, name: str, order: typing.List[Persistence.PersistentObjectSpecifier]) -> None:
         if name == "data_items":
             self.__data_items = typing.cast(typing.List[DataItem.DataItem], restore_item_order(self._project, order))
@@ -1338,6 +1388,13 @@ class DocumentModel(Observable.Observable, ReferenceCounting.ReferenceCounted, D
     def undelete_all(self, undelete_log: Changes.UndeleteLog) -> None:
         undelete_log.undelete_all(self)
 
+    def can_undelete_all(self, undelete_log: Changes.UndeleteLog) -> bool:
+        """Return whether the items in the undelete log can still be restored.
+
+        Deleted data items are kept in the trash, which discards the oldest items when it is over its size limit.
+        """
+        return undelete_log.can_undelete_all(self)
+
     def __remove_dependency(self, source_item: Persistence.PersistentObject, target_item: Persistence.PersistentObject) -> None:
         # print(f"remove dependency {source_item} {target_item}")
         with self.__dependency_tree_lock:
@@ -13,7 +13,9 @@ import numpy.typing
 import os.path
 import pathlib
 import shutil
+import sqlite3
 import threading
+import time
 import typing
 import uuid
 
@@ -24,6 +26,7 @@ from nion.swift.model import Migration
 from nion.swift.model import Model
 from nion.swift.model import NDataHandler
 from nion.swift.model import Persistence
+from nion.swift.model import StartupTrace
 from nion.swift.model import StorageHandler
 from nion.swift.model import Utility
 from nion.utils import Event
@@ -42,6 +45,74 @@ _CreateStorageHandlerFn = typing.Type[StorageHandler.StorageHandler]
 
 _g_large_format_size = 16 * 1024 * 1024
 
+# maximum total bytes of deleted items retained in the trash for undo. the most recently deleted item is always retained.
+_g_trash_size_limit = 16 * 1024 * 1024 * 1024
+
+# file listings of project data folders scanned ahead of reading the project, keyed by folder.
+_prefetched_file_paths_lock = threading.Lock()
+_prefetched_file_paths: typing.Dict[pathlib.Path, typing.List[pathlib.Path]] = dict()
+
+
+class TrashIndex:
+    """An index of items in the trash, oldest first, bounded by the total size of the items.
+
+    Each entry records the uuid of the deleted item, a reference to its payload in the trash, and its size in bytes.
+    When an item is added and the total size exceeds the limit, the oldest entries are removed from the index and
+    returned so that the caller can discard their payloads. If the index has a file path, it is written atomically
+    whenever it changes.
+    """
+
+    def __init__(self, file_path: typing.Optional[pathlib.Path] = None) -> None:
+        self.__file_path = file_path
+        self.__entries: typing.List[PersistentDictType] = list()
+        if file_path and file_path.exists():
+            try:
+                with file_path.open() as fp:
+                    self.__entries = list(json.load(fp).get("entries", list()))
+            except Exception as e:
+                logging.debug("Unable to read trash index %s: %s", file_path, e)
+
+    @property
+    def entries(self) -> typing.Sequence[PersistentDictType]:
+        return list(self.__entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(int(entry.get("size", 0)) for entry in self.__entries)
+
+    def get_entry(self, item_uuid_str: str) -> typing.Optional[PersistentDictType]:
+        for entry in self.__entries:
+            if entry.get("uuid") == item_uuid_str:
+                return entry
+        return None
+
+    def add_entry(self, item_uuid_str: str, reference: str, size: int) -> typing.Sequence[PersistentDictType]:
+        self.__entries = [entry for entry in self.__entries if entry.get("uuid") != item_uuid_str]
+        self.__entries.append({"uuid": item_uuid_str, "reference": reference, "size": size})
+        evicted_entries = list()
+        while len(self.__entries) > 1 and self.total_bytes > _g_trash_size_limit:
+            evicted_entries.append(self.__entries.pop(0))
+        self.__write()
+        return evicted_entries
+
+    def remove_entry(self, item_uuid_str: str) -> typing.Optional[PersistentDictType]:
+        entry = self.get_entry(item_uuid_str)
+        if entry is not None:
+            self.__entries.remove(entry)
+            self.__write()
+        return entry
+
+    def clear(self) -> None:
+        self.__entries = list()
+        if self.__file_path and self.__file_path.exists():
+            self.__file_path.unlink()
+
+    def __write(self) -> None:
+        if self.__file_path:
+            self.__file_path.parent.mkdir(parents=True, exist_ok=True)
+            with Utility.AtomicFileWriter(self.__file_path) as fp:
+                json.dump({"entries": self.__entries}, fp)
+
 
 class ReaderInfo:
     def __init__(self,
@@ -153,10 +224,7 @@ def migrate_to_latest(source_project_storage_system: MigrationReader,
                 preliminary_reader_info_list.append(reader_info)
             except Exception:
                 storage_handler.close()
-                logging.debug("Error reading %s", storage_handler.reference)
-                import traceback
-                traceback.print_exc()
-                traceback.print_stack()
+                logging.exception("Error reading %s", storage_handler.reference)
             storage_handler.prepare_move()
 
         # now read the library properties which contains the data item deletions. data item deletions exist to
@@ -199,10 +267,7 @@ def migrate_to_latest(source_project_storage_system: MigrationReader,
                                 if library_update:
                                     library_updates[data_item_uuid] = library_update
             except Exception:
-                logging.debug(f"Error reading {reader_info.storage_handler.reference}")
-                import traceback
-                traceback.print_exc()
-                traceback.print_stack()
+                logging.exception("Error reading %s", reader_info.storage_handler.reference)
 
         for storage_handler in storage_handlers:
             storage_handler.close()
@@ -215,8 +280,7 @@ def migrate_to_latest(source_project_storage_system: MigrationReader,
     # connections, computations, and display items. for instance, before version 13, the data item and display item
     # were both stored in the data item file; this migrates the display portion to the library properties.
     for reader_info in reader_info_list:
-        properties = reader_info.properties
-        properties = Utility.clean_dict(copy.deepcopy(properties) if properties else dict())
+        properties = reader_info.properties or dict()
         version = properties.get("version", 0)
         if version == DataItem.DataItem.writer_version:
             data_item_uuid = uuid.UUID(typing.cast(str, properties.get("uuid", str(uuid.uuid4()))))
@@ -370,12 +434,17 @@ class PersistentStorageSystem(Persistence.PersistentStorageInterface):
         assert storage_dict is not None
         with self.__properties_lock:
             storage_dict["modified"] = item.modified.isoformat()
+        self._storage_dict_changed(item, storage_dict)
         persistent_object_parent = item.persistent_object_parent
         parent = persistent_object_parent.parent if persistent_object_parent else None
         if parent:
             self.__update_modified_and_get_storage_dict(parent)
         return storage_dict
 
+    def _storage_dict_changed(self, item: Persistence.PersistentObject, storage_dict: PersistentDictType) -> None:
+        """Called when the storage dict of the item or one of its children changes. Subclasses may track changes."""
+        pass
+
     def insert_relationship_item(self, parent: Persistence.PersistentObject, name: str, before_index: int, item: Persistence.PersistentObject) -> None:
         # insert item in internal storage
         self.__set_persistent_storage(item, item.write_to_dict(), self)
@@ -474,6 +543,9 @@ class PersistentStorageSystem(Persistence.PersistentStorageInterface):
     def restore_item(self, data_item_uuid: uuid.UUID) -> typing.Optional[PersistentDictType]:
         raise NotImplementedError()
 
+    def can_restore_item(self, data_item_uuid: uuid.UUID) -> bool:
+        return False
+
     def prune(self) -> None:
         pass
 
@@ -489,35 +561,345 @@ class PersistentStorageSystem(Persistence.PersistentStorageInterface):
         return None
 
 
+def _is_top_level_item(item: Persistence.PersistentObject) -> bool:
+    persistent_object_parent = item.persistent_object_parent
+    parent = persistent_object_parent.parent if persistent_object_parent else None
+    return parent is not None and not parent.persistent_object_parent
+
+
+class PropertiesFragmentCache:
+    """Cache the JSON text of the items in the top level lists of a properties dict.
+
+    Only the items marked as changed since the last write are serialized again. Items are tracked by identity; the
+    cache holds a reference to each item dict so that an identity cannot be reused while it is cached.
+    """
+
+    def __init__(self) -> None:
+        # map the list name to the item dicts, their ids, and their JSON text.
+        self.__item_lists: typing.Dict[str, typing.Tuple[typing.List[PersistentDictType], typing.List[int], typing.List[str]]] = dict()
+        self.__changed_ids: typing.Set[int] = set()
+
+    def clear(self) -> None:
+        self.__item_lists.clear()
+        self.__changed_ids.clear()
+
+    def mark_changed(self, item_dict: PersistentDictType) -> None:
+        self.__changed_ids.add(id(item_dict))
+
+    def set_item_fragments(self, name: str, item_dicts: typing.List[PersistentDictType], fragments: typing.List[str]) -> None:
+        """Set the JSON text of the items, for instance when the items were just read."""
+        self.__item_lists[name] = (list(item_dicts), list(map(id, item_dicts)), fragments)
+
+    def get_item_fragments(self, name: str, value: typing.Any) -> typing.Optional[typing.Tuple[typing.Sequence[str], typing.Sequence[int], bool]]:
+        """Return the JSON text of the items, the indexes of the items serialized again, and whether the items in the
+        list are different from the last write. Return None if value is not a list of item dicts."""
+        if not isinstance(value, list) or not value:
+            return None
+        item_ids = list(map(id, value))
+        cached = self.__item_lists.get(name)
+        if cached and cached[1] == item_ids:
+            fragments = cached[2]
+            changed_indexes: typing.List[int] = list()
+            if self.__changed_ids:
+                index_map = dict(zip(item_ids, range(len(item_ids))))
+                changed_indexes = sorted(index_map[item_id] for item_id in self.__changed_ids if item_id in index_map)
+                for index in changed_indexes:
+                    fragments[index] = json.dumps(Utility.clean_dict(value[index]))
+            return fragments, changed_indexes, False
+        if not all(isinstance(item_dict, dict) for item_dict in value):
+            self.__item_lists.pop(name, None)
+            return None
+        fragments = [json.dumps(Utility.clean_dict(item_dict)) for item_dict in value]
+        self.set_item_fragments(name, value, fragments)
+        return fragments, list(range(len(fragments))), True
+
+    def end_write(self, names: typing.Iterable[str]) -> None:
+        """Discard the lists other than names, which were just written, and the changes, which are now written."""
+        self.__item_lists = {name: self.__item_lists[name] for name in names if name in self.__item_lists}
+        self.__changed_ids.clear()
+
+    def dumps(self, properties: PersistentDictType) -> str:
+        """Return the JSON text of properties, equivalent to json.dumps(Utility.clean_dict(properties))."""
+        parts: typing.List[str] = list()
+        names: typing.List[str] = list()
+        for key, value in properties.items():
+            item_fragments = self.get_item_fragments(key, value)
+            if item_fragments is not None:
+                parts.append(json.dumps(key) + ": [" + ", ".join(item_fragments[0]) + "]")
+                names.append(key)
+            else:
+                cleaned_value = Utility.clean_item(value)
+                if cleaned_value is not None:
+                    parts.append(json.dumps(key) + ": " + json.dumps(cleaned_value))
+        self.end_write(names)
+        return "{" + ", ".join(parts) + "}"
+
+
+class WriteBehindFileWriter:
+    """Write text to a file on a thread after a delay, replacing the file atomically.
+
+    Text written during the delay replaces the pending text, so a burst of writes results in a single file write. The
+    thread exits when nothing is pending and is started again by the next write.
+    """
+
+    def __init__(self, file_path: pathlib.Path, delay: float) -> None:
+        self.__file_path = file_path
+        self.__delay = delay
+        self.__condition = threading.Condition()
+        self.__pending_text: typing.Optional[str] = None
+        self.__is_writing = False
+        self.__flush_count = 0
+        self.__thread: typing.Optional[threading.Thread] = None
+
+    def close(self) -> None:
+        self.flush()
+        with self.__condition:
+            thread = self.__thread
+        if thread:
+            thread.join()
+
+    def write(self, text: str) -> None:
+        with self.__condition:
+            self.__pending_text = text
+            if not self.__thread:
+                self.__thread = threading.Thread(target=self.__run, name="write-behind")
+                self.__thread.start()
+            self.__condition.notify_all()
+
+    def flush(self) -> None:
+        """Write the pending text, if any, without waiting for the delay and wait until it is written."""
+        with self.__condition:
+            self.__flush_count += 1
+            self.__condition.notify_all()
+            try:
+                while self.__pending_text is not None or self.__is_writing:
+                    self.__condition.wait()
+            finally:
+                self.__flush_count -= 1
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                if self.__pending_text is None:
+                    self.__thread = None
+                    return
+                deadline = time.monotonic() + self.__delay
+                while self.__flush_count == 0:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        break
+                    self.__condition.wait(remaining)
+                text = self.__pending_text
+                assert text is not None
+                self.__pending_text = None
+                self.__is_writing = True
+            try:
+                with Utility.AtomicFileWriter(self.__file_path) as fp:
+                    fp.write(text)
+            except Exception as e:
+                logging.exception("Unable to write %s: %s", self.__file_path, e)
+            finally:
+                with self.__condition:
+                    self.__is_writing = False
+                    self.__condition.notify_all()
+
+
 class FilePersistentStorageSystem(PersistentStorageSystem):
-    """File based persistent storage system."""
+    """File based persistent storage system.
 
-    def __init__(self, path: pathlib.Path) -> None:
+    Only the top level items (project references, for instance) that changed since the last write are serialized
+    again. If write_delay is positive, the file is written on a thread after the delay; call flush or close to write
+    pending changes.
+    """
+
+    def __init__(self, path: pathlib.Path, *, write_delay: float = 0.0) -> None:
         self.__path = path
+        self.__fragment_cache = PropertiesFragmentCache()
+        self.__writer = WriteBehindFileWriter(path, write_delay) if path and write_delay > 0.0 else None
         super().__init__()
 
     def close(self) -> None:
-        pass
+        if self.__writer:
+            self.__writer.close()
+            self.__writer = None
 
     @property
     def path(self) -> pathlib.Path:
         return self.__path
 
+    def flush(self) -> None:
+        if self.__writer:
+            self.__writer.flush()
+
+    def load_properties(self) -> None:
+        self.__fragment_cache.clear()
+        super().load_properties()
+
+    def _storage_dict_changed(self, item: Persistence.PersistentObject, storage_dict: PersistentDictType) -> None:
+        if _is_top_level_item(item):
+            self.__fragment_cache.mark_changed(storage_dict)
+
     def _read_properties(self) -> PersistentDictType:
+        self.flush()
         properties = dict()
         if self.__path and self.__path.exists():
             try:
                 with self.__path.open("r") as fp:
                     properties = json.load(fp)
-            except Exception:
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                # the file is corrupt. keep it for recovery and start with empty properties. other errors, such as
+                # the file being unreadable at the moment, are raised so that the properties are not discarded.
+                logging.warning("Unable to read %s (%s); moving it aside.", self.__path, e)
                 os.replace(self.__path, self.__path.with_suffix(".bak"))
         return properties
 
     def _write_properties(self) -> None:
         if self.__path:
-            with Utility.AtomicFileWriter(self.__path) as fp:
-                properties = Utility.clean_dict(self.get_storage_properties())
-                json.dump(properties, fp)
+            text = self.__fragment_cache.dumps(self.get_storage_properties())
+            if self.__writer:
+                self.__writer.write(text)
+            else:
+                with Utility.AtomicFileWriter(self.__path) as fp:
+                    fp.write(text)
+
+
+class SQLitePersistentStorageSystem(PersistentStorageSystem):
+    """SQLite based persistent storage system.
+
+    Each item of the top level lists (project references, for instance) is stored in its own row of the items table
+    and only the rows of the items that changed since the last write are written. The properties table stores the
+    remaining properties in the root row and the item uuids of each list in a row for the list, written only when the
+    items in the list change.
+    """
+
+    root_key = "."
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.__path = path
+        self.__fragment_cache = PropertiesFragmentCache()
+        self.__item_keys: typing.Dict[str, typing.List[str]] = dict()  # map the list name to its item keys
+        # the connection may be used from the thread that reads the profile and then from the main thread.
+        self.__conn: typing.Optional[sqlite3.Connection] = None
+        self.__conn_lock = threading.RLock()
+        super().__init__()
+
+    def close(self) -> None:
+        with self.__conn_lock:
+            if self.__conn:
+                self.__conn.close()
+                self.__conn = None
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self.__path
+
+    def __get_connection(self) -> sqlite3.Connection:
+        if not self.__conn:
+            self.__conn = sqlite3.connect(str(self.__path), check_same_thread=False)
+            self.__conn.execute("PRAGMA journal_mode = WAL")
+            self.__conn.execute("PRAGMA synchronous = NORMAL")
+            with self.__conn:
+                self.__conn.execute("CREATE TABLE IF NOT EXISTS properties(key TEXT PRIMARY KEY, value TEXT)")
+                self.__conn.execute("CREATE TABLE IF NOT EXISTS items(key TEXT PRIMARY KEY, value TEXT)")
+        return self.__conn
+
+    def load_properties(self) -> None:
+        self.__fragment_cache.clear()
+        super().load_properties()
+
+    def set_properties(self, properties: PersistentDictType) -> None:
+        """Replace the stored properties, for instance to import properties from a JSON file.
+
+        Call load_properties to load the new properties.
+        """
+        self.__write(properties)
+
+    def _storage_dict_changed(self, item: Persistence.PersistentObject, storage_dict: PersistentDictType) -> None:
+        if _is_top_level_item(item):
+            self.__fragment_cache.mark_changed(storage_dict)
+
+    def _read_properties(self) -> PersistentDictType:
+        properties: PersistentDictType = dict()
+        self.__item_keys = dict()
+        if self.__path.exists():
+            try:
+                with self.__conn_lock:
+                    conn = self.__get_connection()
+                    property_rows = dict(conn.execute("SELECT key, value FROM properties").fetchall())
+                    item_rows = dict(conn.execute("SELECT key, value FROM items").fetchall())
+                properties = json.loads(property_rows.pop(self.root_key, "{}"))
+                for name, item_uuids_text in property_rows.items():
+                    keys = [f"{name}/{item_uuid}" for item_uuid in json.loads(item_uuids_text)]
+                    keys = [key for key in keys if key in item_rows]
+                    fragments = [item_rows[key] for key in keys]
+                    item_dicts = [json.loads(fragment) for fragment in fragments]
+                    if item_dicts:
+                        # the row text is what a write would produce, so the items are not written until they change.
+                        self.__fragment_cache.set_item_fragments(name, item_dicts, fragments)
+                        self.__item_keys[name] = keys
+                    properties[name] = item_dicts
+            except sqlite3.OperationalError:
+                # the database is locked by another process or cannot be accessed at the moment; it is not corrupt.
+                raise
+            except (sqlite3.DatabaseError, json.JSONDecodeError) as e:
+                # the database is corrupt. keep it, along with its write-ahead log, for recovery and start with empty
+                # properties.
+                logging.warning("Unable to read %s (%s); moving it aside.", self.__path, e)
+                backup_path = self.__path.with_suffix(".bak")
+                # copy the write-ahead log before closing, since closing the connection may remove it.
+                for suffix in ("-wal", "-shm"):
+                    file_path = self.__path.with_name(self.__path.name + suffix)
+                    if file_path.exists():
+                        shutil.copyfile(file_path, backup_path.with_name(backup_path.name + suffix))
+                self.close()
+                for suffix in ("-wal", "-shm"):
+                    self.__path.with_name(self.__path.name + suffix).unlink(missing_ok=True)
+                os.replace(self.__path, backup_path)
+                properties = dict()
+                self.__item_keys = dict()
+        return properties
+
+    def _write_properties(self) -> None:
+        self.__write(self.get_storage_properties())
+
+    def __write(self, properties: PersistentDictType) -> None:
+        root_properties: PersistentDictType = dict()
+        item_keys: typing.Dict[str, typing.List[str]] = dict()
+        list_rows: typing.List[typing.Tuple[str, str]] = list()
+        item_rows: typing.List[typing.Tuple[str, str]] = list()
+        for name, value in properties.items():
+            item_fragments = self.__fragment_cache.get_item_fragments(name, value)
+            keys = self.__item_keys.get(name)
+            if item_fragments is not None and (item_fragments[2] or keys is None):
+                # the items in the list are different from the last write. items without unique uuids are stored in
+                # the root row instead.
+                item_uuids = [item_dict.get("uuid") for item_dict in value]
+                keys = [f"{name}/{item_uuid}" for item_uuid in item_uuids] if all(item_uuids) else None
+                if keys is not None and len(set(keys)) == len(keys):
+                    list_rows.append((name, json.dumps(item_uuids)))
+                else:
+                    keys = None
+            if item_fragments is not None and keys is not None:
+                fragments, changed_indexes = item_fragments[0], item_fragments[1]
+                item_rows.extend((keys[index], fragments[index]) for index in changed_indexes)
+                item_keys[name] = keys
+            else:
+                root_properties[name] = value
+        removed_list_names = set(self.__item_keys) - set(item_keys)
+        removed_keys: typing.Set[str] = set()
+        for name, keys in self.__item_keys.items():
+            if item_keys.get(name) is not keys:
+                removed_keys.update(set(keys) - set(item_keys.get(name, list())))
+        root_text = json.dumps(Utility.clean_dict(root_properties))
+        with self.__conn_lock:
+            conn = self.__get_connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO properties(key, value) VALUES (?, ?)", [(self.root_key, root_text)] + list_rows)
+                conn.executemany("DELETE FROM properties WHERE key = ?", [(name,) for name in removed_list_names])
+                conn.executemany("INSERT OR REPLACE INTO items(key, value) VALUES (?, ?)", item_rows)
+                conn.executemany("DELETE FROM items WHERE key = ?", [(key,) for key in removed_keys])
+        self.__item_keys = item_keys
+        self.__fragment_cache.end_write(item_keys)
 
 
 class MemoryPersistentStorageSystem(PersistentStorageSystem):
@@ -575,6 +957,10 @@ class ProjectStorageSystem(PersistentStorageSystem):
     @abc.abstractmethod
     def _find_storage_handlers(self) -> typing.Sequence[StorageHandler.StorageHandler]: ...
 
+    def prefetch_storage_handler_scan(self) -> None:
+        """Scan for storage handlers ahead of reading the project. Called from a thread; may do nothing."""
+        pass
+
     @abc.abstractmethod
     def _remove_storage_handler(self, storage_handler: StorageHandler.StorageHandler, *, safe: bool = False) -> None: ...
 
@@ -584,6 +970,9 @@ class ProjectStorageSystem(PersistentStorageSystem):
     @abc.abstractmethod
     def _restore_item(self, data_item_uuid: uuid.UUID) -> typing.Optional[PersistentDictType]: ...
 
+    @abc.abstractmethod
+    def _can_restore_item(self, data_item_uuid: uuid.UUID) -> bool: ...
+
     @abc.abstractmethod
     def _prune(self) -> None: ...
 
@@ -650,22 +1039,30 @@ class ProjectStorageSystem(PersistentStorageSystem):
 
         The dict may contain keys for data_items, display_items, data_structures, connections, and computations.
         """
-        storage_handlers = self._find_storage_handlers()
-
         reader_info_list = list()
         reader_error_list = list()
-        for storage_handler in storage_handlers:
-            try:
-                large_format = self._is_storage_handler_large_format(storage_handler)
-                storage_handler_properties = storage_handler.read_properties()
-                storage_handler.prepare_move()
-                assert storage_handler_properties is not None
-                properties = Migration.transform_to_latest(storage_handler_properties)
-                assert properties.get("uuid")
-                reader_info = ReaderInfo(properties, [False], large_format, storage_handler, storage_handler.reference)
-                reader_info_list.append(reader_info)
-            except Exception as e:
-                reader_error_list.append(Persistence.ReaderError(storage_handler.reference, e, traceback.extract_stack()))
+
+        storage_handler_properties_list = list()
+        with StartupTrace.trace_span("storage handler scan"):
+            for storage_handler in self._find_storage_handlers():
+                try:
+                    large_format = self._is_storage_handler_large_format(storage_handler)
+                    storage_handler_properties = storage_handler.read_properties()
+                    storage_handler.prepare_move()
+                    assert storage_handler_properties is not None
+                    storage_handler_properties_list.append((storage_handler, storage_handler_properties, large_format))
+                except Exception as e:
+                    reader_error_list.append(Persistence.ReaderError(storage_handler.reference, e, traceback.extract_stack()))
+
+        with StartupTrace.trace_span("migration", args={"count": len(storage_handler_properties_list)}):
+            for storage_handler, storage_handler_properties, large_format in storage_handler_properties_list:
+                try:
+                    properties = Migration.transform_to_latest(storage_handler_properties)
+                    assert properties.get("uuid")
+                    reader_info = ReaderInfo(properties, [False], large_format, storage_handler, storage_handler.reference)
+                    reader_info_list.append(reader_info)
+                except Exception as e:
+                    reader_error_list.append(Persistence.ReaderError(storage_handler.reference, e, traceback.extract_stack()))
 
         # to allow later writing back to storage, associate the data items with their storage adapters
         for reader_info in reader_info_list:
@@ -772,6 +1169,10 @@ class ProjectStorageSystem(PersistentStorageSystem):
     def restore_item(self, data_item_uuid: uuid.UUID) -> typing.Optional[PersistentDictType]:
         return self.__restore_item(data_item_uuid)
 
+    def can_restore_item(self, data_item_uuid: uuid.UUID) -> bool:
+        """Return whether the deleted data item is still in the trash and can be restored."""
+        return self._can_restore_item(data_item_uuid)
+
     def prune(self) -> None:
         self._prune()
 
@@ -790,6 +1191,9 @@ class ProjectStorageSystem(PersistentStorageSystem):
         if name == "file_path":
             storage = self.__storage_adapter_map.get(data_item.uuid)
             return storage.storage_handler.reference if storage else None
+        if name == "storage_handler_type":
+            storage = self.__storage_adapter_map.get(data_item.uuid)
+            return storage.storage_handler.storage_handler_type if storage else None
         return None
 
     def __read_data_item_data(self, data_item: DataItem.DataItem) -> typing.Optional[_NDArray]:
@@ -851,6 +1255,7 @@ class FileProjectStorageSystem(ProjectStorageSystem):
         super().__init__()
         self.__project_path = project_path
         self.__project_data_path = project_data_path
+        self.__trash_index: typing.Optional[TrashIndex] = None
 
     def load_properties(self) -> None:
         # in order to be resilient to name changes, first make a list of folders in project_data_folders which
@@ -918,7 +1323,12 @@ class FileProjectStorageSystem(ProjectStorageSystem):
         # if there are two handlers, first is small, second is large
         # if there is only one handler, it is used in all cases
         is_large_format = storage_handler_attributes.n_bytes > _g_large_format_size or storage_handler_attributes._force_large_format
-        return self._file_handler_factories[-1] if is_large_format else self._file_handler_factories[0]
+        file_handler_factory = self._file_handler_factories[-1] if is_large_format else self._file_handler_factories[0]
+        # the project can configure compression of the hdf5 files for new data.
+        storage_compression = self.get_storage_properties().get("storage_compression")
+        if storage_compression and isinstance(file_handler_factory, HDF5Handler.HDF5HandlerFactory):
+            return HDF5Handler.HDF5HandlerFactory(storage_compression)
+        return file_handler_factory
 
     def _make_storage_handler(self, storage_handler_attributes: StorageHandler.StorageHandlerAttributes, file_handler_factory: typing.Optional[StorageHandler.StorageHandlerFactoryLike] = None) -> StorageHandler.StorageHandler:
         file_handler_factory = file_handler_factory if file_handler_factory else self._get_storage_handler_factory(storage_handler_attributes)
@@ -928,20 +1338,39 @@ class FileProjectStorageSystem(ProjectStorageSystem):
     def _find_storage_handlers(self) -> typing.Sequence[StorageHandler.StorageHandler]:
         return self.__find_storage_handlers(self.__project_data_path)
 
+    def prefetch_storage_handler_scan(self) -> None:
+        # list the project data folder so that the scan when reading the project only needs to make the handlers.
+        project_data_path = self.__project_data_path
+        if project_data_path:
+            file_paths = self.__list_file_paths(project_data_path, skip_trash=True)
+            with _prefetched_file_paths_lock:
+                _prefetched_file_paths[project_data_path] = file_paths
+
     def _is_storage_handler_large_format(self, storage_handler: StorageHandler.StorageHandler) -> bool:
         return isinstance(storage_handler, HDF5Handler.HDF5Handler)
 
+    def __get_trash_index(self) -> TrashIndex:
+        if not self.__trash_index:
+            self.__trash_index = TrashIndex(self._trash_dir / "index.json")
+        return self.__trash_index
+
     def _remove_storage_handler(self, storage_handler: StorageHandler.StorageHandler, *, safe: bool = False) -> None:
         assert self.__project_data_path is not None
         file_path = pathlib.Path(storage_handler.reference)
         file_name = file_path.parts[-1]
         trash_dir = self.__project_data_path / "trash"
         new_file_path = trash_dir / file_name
+        item_uuid_str = storage_handler.read_properties().get("uuid") if safe and file_path.exists() else None
         storage_handler.prepare_move()  # moving files in the storage handler requires it to be closed.
         # TODO: move this functionality to the storage handler.
         if safe and not os.path.exists(new_file_path):
             trash_dir.mkdir(exist_ok=True)
+            # within the project data folder, this is a rename; the data is not copied or read.
             shutil.move(str(file_path), new_file_path)
+            if item_uuid_str:
+                # record the item in the trash index and discard the oldest items if the trash is over its limit.
+                for entry in self.__get_trash_index().add_entry(item_uuid_str, file_name, new_file_path.stat().st_size):
+                    (trash_dir / entry["reference"]).unlink(missing_ok=True)
         storage_handler.remove()
 
     def _replace_storage_handler(self, storage_handler: StorageHandler.StorageHandler, storage_handler_attributes: StorageHandler.StorageHandlerAttributes) -> StorageHandler.StorageHandler:
@@ -953,7 +1382,12 @@ class FileProjectStorageSystem(ProjectStorageSystem):
         assert self.__project_data_path is not None
         data_item_uuid_str = str(data_item_uuid)
         trash_dir = self.__project_data_path / "trash"
-        storage_handlers = self.__find_storage_handlers(trash_dir, skip_trash=False)
+        trash_entry = self.__get_trash_index().remove_entry(data_item_uuid_str)
+        if trash_entry:
+            # the index identifies the file directly; avoid reading every file in the trash.
+            storage_handlers = self.__make_storage_handlers(trash_dir, [trash_dir / trash_entry["reference"]])
+        else:
+            storage_handlers = self.__find_storage_handlers(trash_dir, skip_trash=False)
         try:
             for storage_handler in storage_handlers:
                 storage_handler_properties = storage_handler.read_properties()
@@ -978,6 +1412,10 @@ class FileProjectStorageSystem(ProjectStorageSystem):
                 storage_handler.close()
         return None
 
+    def _can_restore_item(self, data_item_uuid: uuid.UUID) -> bool:
+        trash_entry = self.__get_trash_index().get_entry(str(data_item_uuid))
+        return trash_entry is not None and (self._trash_dir / trash_entry["reference"]).exists()
+
     def _prune(self) -> None:
         if self.__project_data_path:
             trash_dir = self.__project_data_path / "trash"
@@ -987,6 +1425,7 @@ class FileProjectStorageSystem(ProjectStorageSystem):
                 # tracking items in the trash. when items are again retained in the trash, update the disabled
                 # test_delete_and_undelete_from_file_storage_system_restores_data_item_after_reload
                 file_path.unlink()
+            self.__get_trash_index().clear()
 
     @property
     def _trash_dir(self) -> pathlib.Path:
@@ -996,7 +1435,8 @@ class FileProjectStorageSystem(ProjectStorageSystem):
     def _migrate_data_item(self, reader_info: ReaderInfo, index: int, count: int) -> typing.Optional[ReaderInfo]:
         storage_handler = reader_info.storage_handler
         properties = reader_info.properties
-        properties = Utility.clean_dict(copy.deepcopy(properties) if properties else dict())
+        # clean_dict makes a copy, so the migrated properties can be written without copying them again.
+        properties = Utility.clean_dict(properties or dict())
         data_item_uuid = uuid.UUID(typing.cast(str, properties["uuid"]))
         old_data_item = DataItem.DataItem(item_uuid=data_item_uuid)
         with contextlib.closing(old_data_item):
@@ -1014,7 +1454,7 @@ class FileProjectStorageSystem(ProjectStorageSystem):
                     target_storage_handler.prepare_move()
                     shutil.copyfile(storage_handler.reference, target_storage_handler.reference)
                     shutil.copystat(storage_handler.reference, target_storage_handler.reference)
-                    target_storage_handler.write_properties(Migration.transform_from_latest(copy.deepcopy(properties)), datetime.datetime.now())
+                    target_storage_handler.write_properties(Migration.transform_from_latest(properties), datetime.datetime.now())
                     logging.getLogger("migration").info(f"Copying data item ({index + 1}/{count}) {data_item_uuid} to new library.")
                     return ReaderInfo(properties, [False], self._is_storage_handler_large_format(target_storage_handler),
                                       target_storage_handler, target_storage_handler.reference)
@@ -1096,13 +1536,28 @@ class FileProjectStorageSystem(ProjectStorageSystem):
         return None
 
     def __find_storage_handlers(self, directory: typing.Optional[pathlib.Path], *, skip_trash: bool = True) -> typing.Sequence[StorageHandler.StorageHandler]:
-        storage_handlers = list()
+        file_paths: typing.Optional[typing.List[pathlib.Path]] = None
+        if directory and skip_trash:
+            # use the listing from a prefetch, if any. it is only used once so that later scans see changes.
+            with _prefetched_file_paths_lock:
+                file_paths = _prefetched_file_paths.pop(directory, None)
+        if file_paths is None:
+            file_paths = self.__list_file_paths(directory, skip_trash=skip_trash)
+        return self.__make_storage_handlers(directory, file_paths)
+
+    def __list_file_paths(self, directory: typing.Optional[pathlib.Path], *, skip_trash: bool) -> typing.List[pathlib.Path]:
+        file_paths = list()
         if directory and directory.exists():
-            absolute_file_paths = set()
             for file_path in directory.rglob("*"):
                 if not skip_trash or file_path.parent.name != "trash":
                     if not file_path.name.startswith("."):
-                        absolute_file_paths.add(str(file_path))
+                        file_paths.append(file_path)
+        return file_paths
+
+    def __make_storage_handlers(self, directory: typing.Optional[pathlib.Path], file_paths: typing.Sequence[pathlib.Path]) -> typing.Sequence[StorageHandler.StorageHandler]:
+        storage_handlers = list()
+        if directory and directory.exists():
+            absolute_file_paths = set(str(file_path) for file_path in file_paths)
             for file_handler_factory in self._file_handler_factories:
                 for data_file in filter(file_handler_factory.is_matching, absolute_file_paths):
                     try:
@@ -1199,6 +1654,7 @@ class MemoryProjectStorageSystem(ProjectStorageSystem):
         self.__data_properties_map = data_properties_map if data_properties_map is not None else dict()
         self.__data_map = data_map if data_map is not None else dict()
         self.__trash_map = trash_map if trash_map is not None else dict()
+        self.__trash_index = TrashIndex()
         self._test_data_read_event = data_read_event or Event.Event()
         self._write_count = 0
 
@@ -1237,6 +1693,9 @@ class MemoryProjectStorageSystem(ProjectStorageSystem):
         if safe:
             assert storage_handler_reference not in self.__trash_map
             self.__trash_map[storage_handler_reference] = {"data": data, "properties": properties}
+            size = data.nbytes if data is not None else 0
+            for entry in self.__trash_index.add_entry(storage_handler_reference, storage_handler_reference, size):
+                self.__trash_map.pop(entry["reference"], None)
         storage_handler.close()  # moving files in the storage handler requires it to be closed.
 
     def _replace_storage_handler(self, storage_handler: StorageHandler.StorageHandler, storage_handler_attributes: StorageHandler.StorageHandlerAttributes) -> StorageHandler.StorageHandler:
@@ -1246,7 +1705,10 @@ class MemoryProjectStorageSystem(ProjectStorageSystem):
 
     def _restore_item(self, data_item_uuid: uuid.UUID) -> typing.Optional[PersistentDictType]:
         data_item_uuid_str = str(data_item_uuid)
-        trash_entry = self.__trash_map.pop(data_item_uuid_str)
+        self.__trash_index.remove_entry(data_item_uuid_str)
+        trash_entry = self.__trash_map.pop(data_item_uuid_str, None)
+        if trash_entry is None:
+            return None
         assert data_item_uuid_str not in self.__data_properties_map
         assert data_item_uuid_str not in self.__data_map
         self.__data_properties_map[data_item_uuid_str] = Migration.transform_to_latest(trash_entry["properties"])
@@ -1256,15 +1718,18 @@ class MemoryProjectStorageSystem(ProjectStorageSystem):
         properties = Migration.transform_to_latest(properties)
         return properties
 
+    def _can_restore_item(self, data_item_uuid: uuid.UUID) -> bool:
+        return str(data_item_uuid) in self.__trash_map
+
     def _prune(self) -> None:
         pass  # disabled for testing self.__trash_map = dict()
 
     def _migrate_data_item(self, reader_info: ReaderInfo, index: int, count: int) -> typing.Optional[ReaderInfo]:
         storage_handler = reader_info.storage_handler
         properties = reader_info.properties
-        properties = Utility.clean_dict(copy.deepcopy(properties) if properties else dict())
         if reader_info.changed_ref[0]:
-            self.__data_properties_map[storage_handler.reference] = Migration.transform_from_latest(copy.deepcopy(properties))
+            # clean_dict makes a copy, so the stored properties do not share structure with the reader info.
+            self.__data_properties_map[storage_handler.reference] = Migration.transform_from_latest(Utility.clean_dict(properties or dict()))
         return reader_info
 
     def _migrate_library_properties(self, library_properties: PersistentDictType, reader_info_list: typing.List[ReaderInfo]) -> None:
@@ -1299,8 +1764,18 @@ class MemoryProjectStorageSystem(ProjectStorageSystem):
         return self._find_storage_handlers()
 
 
-def make_file_persistent_storage_system(path: pathlib.Path) -> Persistence.PersistentStorageInterface:
-    return FilePersistentStorageSystem(path)
+def clear_prefetched_storage_handler_scans() -> None:
+    # discard prefetched scans that were not used so that they cannot become stale.
+    with _prefetched_file_paths_lock:
+        _prefetched_file_paths.clear()
+
+
+def make_file_persistent_storage_system(path: pathlib.Path, *, write_delay: float = 0.0) -> Persistence.PersistentStorageInterface:
+    return FilePersistentStorageSystem(path, write_delay=write_delay)
+
+
+def make_sqlite_persistent_storage_system(path: pathlib.Path) -> SQLitePersistentStorageSystem:
+    return SQLitePersistentStorageSystem(path)
 
 
 def make_memory_persistent_storage_system() -> Persistence.PersistentStorageInterface:
@@ -4,8 +4,10 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
 import io
 import json
+import logging
 import os
 import pathlib
 import threading
@@ -30,6 +32,9 @@ if typing.TYPE_CHECKING:
 PersistentDictType = typing.Dict[str, typing.Any]
 _NDArray = numpy.typing.NDArray[typing.Any]
 
+# maximum size in bytes of the blocks used when processing out-of-core data.
+_g_block_size = 64 * 1024 * 1024
+
 
 def make_directory_if_needed(directory_path: str) -> None:
     """
@@ -42,43 +47,96 @@ def make_directory_if_needed(directory_path: str) -> None:
         os.makedirs(directory_path)
 
 
-def get_write_chunk_shape_for_data(data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike) -> typing.Optional[DataAndMetadata.ShapeType]:
+# the compression ids which can be configured for a project and the corresponding h5py dataset options.
+compression_options: typing.Mapping[str, PersistentDictType] = {
+    "gzip": {"compression": "gzip", "compression_opts": 4},
+    "lzf": {"compression": "lzf"},
+    "shuffle-gzip": {"shuffle": True, "compression": "gzip", "compression_opts": 4},
+}
+
+
+def get_write_chunk_shape_for_data(data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike,
+                                   data_descriptor: typing.Optional[DataAndMetadata.DataDescriptor] = None, *,
+                                   is_compressed: bool = False) -> typing.Optional[DataAndMetadata.ShapeType]:
     """
     Calculate an appropriate write chunk shape for a given data shape and dtype.
 
     The target chunk size is 580 kB which seems to be a sweet spot according to benchmarks.
     The algorithm assumes that the data is c-contiguous in memory.
 
+    Chunks follow the access patterns of the data. Chunks of a sequence are aligned to frames. If the data descriptor
+    describes a collection and a datum is smaller than the target size, a chunk holds whole datums for a near square
+    tile of collection positions within a single sequence index, so that reading a region of the collection (a pick,
+    for instance) touches few chunks.
+
     If the total number of chunks that the calculated chunk shape would lead to is less than 100 (i.e. the file will
-    be less than 58 MB in size) or if the data shape is not suitable for chunking, return None.
+    be less than 58 MB in size) or if the data shape is not suitable for chunking, return None. Compressed data must
+    be chunked, so in that case only data not suitable for chunking returns None.
     """
     data_dtype = numpy.dtype(data_dtype)
 
     target_chunk_size = 580*1024/data_dtype.itemsize
-    chunk_size = 1
-    counter = len(data_shape)
-    chunk_shape = [1] * len(data_shape)
-    while chunk_size < target_chunk_size and counter > 0:
-        counter -= 1
-        chunk_size *= data_shape[counter]
-        chunk_shape[counter] = data_shape[counter]
-
-    if chunk_size == 0: # This means one of the input dimensions was "0", so chunking cannot be used
+
+    if 0 in data_shape:  # chunking cannot be used if one of the input dimensions is "0"
         return None
 
-    chunk_size //= data_shape[counter]
-    remaining_elements = min(max(target_chunk_size // chunk_size, 1), data_shape[counter])
-    chunk_shape[counter] = int(remaining_elements)
+    chunk_shape: typing.List[int] = list()
+    if data_descriptor and data_descriptor.collection_dimension_count > 0 and data_descriptor.expected_dimension_count == len(data_shape):
+        datum_shape = data_shape[len(data_shape) - data_descriptor.datum_dimension_count:]
+        datum_size = int(numpy.prod(datum_shape, dtype=numpy.int64))
+        if datum_size <= target_chunk_size:
+            collection_index = 1 if data_descriptor.is_sequence else 0
+            collection_shape = data_shape[collection_index:collection_index + data_descriptor.collection_dimension_count]
+            remaining_count = max(int(target_chunk_size // datum_size), 1)
+            tile_shape = list()
+            for i, collection_length in enumerate(collection_shape):
+                dimensions_left = len(collection_shape) - i
+                tile_length = max(round(remaining_count ** (1 / dimensions_left)) if dimensions_left > 1 else remaining_count, 1)
+                # use a power of two so that tiles divide common scan sizes without partially filled edge chunks.
+                tile_length = min(1 << (tile_length.bit_length() - 1), collection_length)
+                tile_shape.append(tile_length)
+                remaining_count = max(remaining_count // tile_length, 1)
+            chunk_shape = [1] * collection_index + tile_shape + list(datum_shape)
+
+    if not chunk_shape:
+        chunk_size = 1
+        counter = len(data_shape)
+        chunk_shape = [1] * len(data_shape)
+        while chunk_size < target_chunk_size and counter > 0:
+            counter -= 1
+            chunk_size *= data_shape[counter]
+            chunk_shape[counter] = data_shape[counter]
+
+        chunk_size //= data_shape[counter]
+        remaining_elements = min(max(target_chunk_size // chunk_size, 1), data_shape[counter])
+        chunk_shape[counter] = int(remaining_elements)
 
     n_chunks = 1
     for i in range(len(chunk_shape)):
         n_chunks *= data_shape[i] // chunk_shape[i]
-    if n_chunks < 100:
+    if n_chunks < 100 and not is_compressed:
         return None
 
     return tuple(chunk_shape)
 
 
+def get_block_slices(data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike, block_size: typing.Optional[int] = None) -> typing.Iterator[typing.Tuple[slice, ...]]:
+    """
+    Generate slices along the first axis covering data of the given shape with blocks of at most block_size bytes.
+
+    Out-of-core data can be processed block by block using these slices. If a single row along the first axis is
+    larger than the block size, the blocks are single rows.
+    """
+    block_size = block_size if block_size is not None else _g_block_size
+    if not data_shape:
+        yield tuple()
+        return
+    row_size = numpy.dtype(data_dtype).itemsize * int(numpy.prod(data_shape[1:], dtype=numpy.int64))
+    rows_per_block = max(block_size // max(row_size, 1), 1)
+    for start in range(0, data_shape[0], rows_per_block):
+        yield (slice(start, min(start + rows_per_block, data_shape[0])),)
+
+
 _HDF5FilePointer = typing.Any
 
 
@@ -129,11 +187,14 @@ class HDF5FileManager:
             self.__file_entries[path]._count += 1
             return self.__file_entries[path]
 
-    def close(self, path: pathlib.Path) -> None:
+    def close(self, path: pathlib.Path) -> bool:
+        """Close the path. Return whether the file is closed, i.e. it is no longer opened by any handler."""
         with self.__lock:
             self.__file_entries[path]._count -= 1
             if self.__file_entries[path]._count == 0:
                 self.__file_entries.pop(path).close()
+                return True
+            return False
 
     def force_close(self, path: pathlib.Path) -> None:
         with self.__lock:
@@ -144,26 +205,52 @@ class HDF5FileManager:
 _file_manager = HDF5FileManager()
 
 
+def _repack_file(file_path: pathlib.Path) -> None:
+    # hdf5 does not return the space of deleted or shrunk datasets to the file system. copy the contents to a new file
+    # and replace the old file with it. the dataset creation properties (chunks, compression, maxshape) are kept.
+    temp_file_path = file_path.with_name(file_path.name + ".repack")
+    try:
+        with h5py.File(file_path, "r") as src, h5py.File(temp_file_path, "w") as dst:
+            for name in src:
+                src.copy(src[name], dst, name=name)
+            for key, value in src.attrs.items():
+                dst.attrs[key] = value
+        os.replace(temp_file_path, file_path)
+    except Exception as e:
+        logging.warning("Unable to repack %s: %s", file_path, e)
+        if temp_file_path.exists():
+            temp_file_path.unlink()
+
+
 class HDF5Handler(StorageHandler.StorageHandler):
     count = 0  # useful for detecting leaks in tests
     open = 0  # useful for detecting unclosed files
 
-    def __init__(self, file_path: typing.Union[str, pathlib.Path]) -> None:
+    def __init__(self, file_path: typing.Union[str, pathlib.Path], compression: typing.Optional[str] = None) -> None:
         self.__file_path = str(file_path)
+        self.__compression = compression
+        self.__compression_options = compression_options.get(compression, dict()) if compression else dict()
         self.__lock = threading.RLock()
         self.__file = _file_manager.open(pathlib.Path(self.__file_path))
         self.__dataset: typing.Any = None
+        # digests of the frames (the items along the leading axis) last written to a resizable dataset, used to write
+        # only the frames that changed. None if unknown.
+        self.__frame_digests: typing.Optional[typing.List[bytes]] = None
+        # whether space was freed within the file by replacing or shrinking the dataset.
+        self.__needs_repack = False
         self._write_count = 0
         HDF5Handler.count += 1
 
     def close(self) -> None:
         HDF5Handler.count -= 1
         self.__close_fp()
-        _file_manager.close(pathlib.Path(self.__file_path))
+        if _file_manager.close(pathlib.Path(self.__file_path)) and self.__needs_repack and os.path.isfile(self.__file_path):
+            _repack_file(pathlib.Path(self.__file_path))
+        self.__needs_repack = False
 
     @property
     def factory(self) -> StorageHandler.StorageHandlerFactoryLike:
-        return HDF5HandlerFactory()
+        return HDF5HandlerFactory(self.__compression)
 
     @property
     def storage_handler_type(self) -> str:
@@ -214,53 +301,122 @@ class HDF5Handler(StorageHandler.StorageHandler):
     def write_data(self, data: _NDArray, data_descriptor: DataAndMetadata.DataDescriptor, file_datetime: datetime.datetime) -> None:
         with self.__lock:
             assert data is not None
-            json_properties = None
             # handle three cases:
             #   1 - 'data' doesn't yet exist (require_dataset)
-            #   2 - 'data' exists but is a different size (delete, then require_dataset)
+            #   2 - 'data' exists but is a different size (resize in place or replace the dataset)
             #   3 - 'data' exists and is the same size (overwrite)
             if not "data" in self.__file.fp:
                 # case 1
-                chunks = get_write_chunk_shape_for_data(data.shape, data.dtype)
-                self.__dataset = self.__file.fp.require_dataset("data", shape=data.shape, dtype=data.dtype, chunks=chunks)
+                self.__dataset = self.__require_dataset(data.shape, data.dtype, data_descriptor)
             else:
                 if self.__dataset is None:
                     self.__dataset = self.__file.fp["data"]
                 if self.__dataset.shape != data.shape or self.__dataset.dtype != data.dtype:
                     # case 2
-                    json_properties = self.__dataset.attrs.get("properties", "")
-                    self.__close_fp()
-                    os.remove(self.__file_path)
-                    chunks = get_write_chunk_shape_for_data(data.shape, data.dtype)
-                    self.__dataset = self.__file.fp.require_dataset("data", shape=data.shape, dtype=data.dtype, chunks=chunks)
+                    if self.__can_resize_dataset(data.shape, data.dtype):
+                        self.__resize_dataset(data.shape)
+                    else:
+                        self.__replace_dataset(data.shape, data.dtype, data_descriptor)
             self.__copy_data(data)
-            if json_properties is not None:
-                self.__dataset.attrs["properties"] = json_properties
             self.__file.fp.flush()
 
     def reserve_data(self, data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike, data_descriptor: DataAndMetadata.DataDescriptor, file_datetime: datetime.datetime) -> None:
         # reserve data of the given shape and dtype, filled with zeros
         with self.__lock:
-            json_properties = None
-            # first read existing properties and then close existing data set and file.
             if "data" in self.__file.fp:
                 if self.__dataset is None:
                     self.__dataset = self.__file.fp["data"]
-                json_properties = self.__dataset.attrs.get("properties", "")
-                self.__close_fp()
-                os.remove(self.__file_path)
-                self.__file.open()
-            # reserve the data
-            chunks = get_write_chunk_shape_for_data(data_shape, data_dtype)
-            self.__dataset = self.__file.fp.require_dataset("data", shape=data_shape, dtype=data_dtype, fillvalue=0, chunks=chunks)
-            if json_properties is not None:
-                self.__dataset.attrs["properties"] = json_properties
+                # a resizable dataset is cleared by shrinking it to nothing and growing it again; this drops the
+                # allocated chunks, which then read as the fill value, without writing the zeros.
+                if self.__dataset.fillvalue == 0 and self.__can_resize_dataset(data_shape, data_dtype):
+                    self.__resize_dataset((0,) + tuple(data_shape[1:]))
+                    self.__resize_dataset(data_shape)
+                else:
+                    self.__replace_dataset(data_shape, data_dtype, data_descriptor, fillvalue=0)
+                self.__frame_digests = None
+            else:
+                self.__dataset = self.__require_dataset(data_shape, data_dtype, data_descriptor, fillvalue=0)
             self.__file.fp.flush()
 
+    def __require_dataset(self, data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike, data_descriptor: DataAndMetadata.DataDescriptor, **kwargs: typing.Any) -> typing.Any:
+        # create the dataset, chunked for the access pattern of the data and compressed if configured. sequences are
+        # always chunked so that they can grow and shrink in place along the sequence axis; chunked data can be resized
+        # along the leading axis only, since the chunk layout is chosen for the other axes.
+        is_sequence = data_descriptor.is_sequence and len(data_shape) > 0
+        chunks = get_write_chunk_shape_for_data(data_shape, data_dtype, data_descriptor, is_compressed=bool(self.__compression_options) or is_sequence)
+        if chunks:
+            return self.__file.fp.create_dataset("data", shape=data_shape, dtype=data_dtype, chunks=chunks, maxshape=(None,) + tuple(data_shape[1:]), **self.__compression_options, **kwargs)
+        return self.__file.fp.require_dataset("data", shape=data_shape, dtype=data_dtype, **kwargs)
+
+    def __can_resize_dataset(self, data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike) -> bool:
+        # the dataset can be resized in place along the leading axis if it is chunked and has the same dtype and the
+        # same shape along the other axes.
+        dataset = self.__dataset
+        maxshape = dataset.maxshape
+        if dataset.dtype != numpy.dtype(data_dtype) or dataset.chunks is None or maxshape is None:
+            return False
+        if len(data_shape) == 0 or len(data_shape) != len(dataset.shape) or tuple(data_shape[1:]) != tuple(dataset.shape[1:]):
+            return False
+        return not (maxshape[0] is not None and data_shape[0] > maxshape[0])
+
+    def __resize_dataset(self, data_shape: DataAndMetadata.ShapeType) -> None:
+        # resize the dataset in place along the leading axis. shrinking frees space within the file; the file is
+        # repacked when it is closed.
+        if data_shape[0] < self.__dataset.shape[0]:
+            self.__needs_repack = True
+            if self.__frame_digests is not None:
+                self.__frame_digests = self.__frame_digests[:data_shape[0]]
+        self.__dataset.resize(data_shape)
+
+    def __replace_dataset(self, data_shape: DataAndMetadata.ShapeType, data_dtype: numpy.typing.DTypeLike, data_descriptor: DataAndMetadata.DataDescriptor, **kwargs: typing.Any) -> None:
+        # replace the dataset within the open file, keeping the properties stored on the dataset. the new dataset is
+        # chunked and compressed for the new shape. the space of the old dataset is freed within the file; the file is
+        # repacked when it is closed.
+        json_properties = self.__dataset.attrs.get("properties", None)
+        self.__dataset = None
+        self.__frame_digests = None
+        del self.__file.fp["data"]
+        self.__dataset = self.__require_dataset(data_shape, data_dtype, data_descriptor, **kwargs)
+        if json_properties is not None:
+            self.__dataset.attrs["properties"] = json_properties
+        self.__needs_repack = True
+
+    def __get_frame_digests(self, data: _NDArray) -> typing.Optional[typing.List[bytes]]:
+        # return the digests of the frames of the data if the dataset is resizable along the leading axis; otherwise
+        # None. the digests are compared with those of the last write to write only the changed frames.
+        maxshape = self.__dataset.maxshape
+        if self.__dataset.chunks is None or not maxshape or maxshape[0] is not None or data.ndim == 0:
+            return None
+        return [hashlib.blake2b(numpy.ascontiguousarray(frame).data, digest_size=16).digest() for frame in data]
+
     def __copy_data(self, data: _NDArray) -> None:
         if id(data) != id(self.__dataset):
-            self.__dataset[:] = data
+            if isinstance(data, numpy.ndarray) and not isinstance(data, numpy.memmap):
+                frame_digests = self.__get_frame_digests(data)
+                last_frame_digests = self.__frame_digests
+                if frame_digests is not None and last_frame_digests is not None:
+                    # write only the runs of frames that changed since the last write, so that growing a sequence by
+                    # a frame writes a frame.
+                    start: typing.Optional[int] = None
+                    for index, frame_digest in enumerate(frame_digests + [b""]):
+                        changed = index < len(frame_digests) and (index >= len(last_frame_digests) or last_frame_digests[index] != frame_digest)
+                        if changed and start is None:
+                            start = index
+                        elif not changed and start is not None:
+                            self.__dataset[start:index] = data[start:index]
+                            start = None
+                else:
+                    self.__dataset[:] = data
+                self.__frame_digests = frame_digests
+            else:
+                # data read through from another file or memory mapped; copy it in blocks so it is never fully loaded into memory.
+                for block_slice in get_block_slices(data.shape, data.dtype):
+                    self.__dataset[block_slice] = data[block_slice]
+                self.__frame_digests = None
             self._write_count += 1
+        else:
+            # the data was written through the dataset.
+            self.__frame_digests = None
 
     def write_properties(self, properties: PersistentDictType, file_datetime: datetime.datetime) -> None:
         with self.__lock:
@@ -279,20 +435,27 @@ class HDF5Handler(StorageHandler.StorageHandler):
             self.__ensure_dataset()
             if self.__dataset.shape == (0, ):
                 return None
+            # the dataset may be written directly by the caller, so the digests of the last write are not reliable.
+            self.__frame_digests = None
             return typing.cast(typing.Optional[_NDArray], self.__dataset)
 
     def remove(self) -> None:
+        self.__needs_repack = False
         self.__close_fp()
         if os.path.isfile(self.__file_path):
             os.remove(self.__file_path)
 
     def __close_fp(self) -> None:
         self.__dataset = None
+        self.__frame_digests = None
         self.__file.close()
 
 
 class HDF5HandlerFactory(StorageHandler.StorageHandlerFactoryLike):
 
+    def __init__(self, compression: typing.Optional[str] = None) -> None:
+        self.compression = compression
+
     def get_storage_handler_type(self) -> str:
         return "hdf5"
 
@@ -302,7 +465,7 @@ class HDF5HandlerFactory(StorageHandler.StorageHandlerFactoryLike):
         return False
 
     def make(self, file_path: pathlib.Path) -> StorageHandler.StorageHandler:
-        return HDF5Handler(self.make_path(file_path))
+        return HDF5Handler(self.make_path(file_path), self.compression)
 
     def make_path(self, file_path: pathlib.Path) -> str:
         return str(file_path.with_suffix(self.get_extension()))
@@ -1,13 +1,19 @@
 # standard libraries
+import asyncio
+import concurrent.futures
 import copy
 import dataclasses
 import datetime
+import functools
 import io
 import json
+import gettext
 import logging
 import os
 import pathlib
+import threading
 import time
+import traceback
 import typing
 import uuid
 import zipfile
@@ -21,9 +27,11 @@ import numpy
 from nion.data import Calibration
 from nion.data import DataAndMetadata
 from nion.data import Image
+from nion.swift.model import Activity
 from nion.swift.model import DataItem
 from nion.swift.model import DisplayItem
 from nion.swift.model import FileStorageSystem
+from nion.swift.model import NDataHandler
 from nion.swift.model import StorageHandler
 from nion.swift.model import Utility
 from nion.utils import DateTime
@@ -33,6 +41,14 @@ from nion.utils import Registry
 DataElementType = typing.Dict[str, typing.Any]
 _DataArrayType = numpy.typing.NDArray[typing.Any]
 
+_ = gettext.gettext
+
+# imported npy and ndata arrays at least this size are memory mapped and streamed into large format storage.
+_g_memory_map_import_size = 64 * 1024 * 1024
+
+# csv files are read and written in blocks of this many rows.
+_g_csv_block_rows = 65536
+
 
 class ImportExportIncompatibleDataError(Exception):
     pass
@@ -118,11 +134,38 @@ class ImportExportHandler:
         data_metadata = data_item.data_metadata if data_item else None
         return data_metadata is not None and self.can_write(data_metadata, extension)
 
+    @property
+    def is_display_item_writer_thread_safe(self) -> bool:
+        """Return whether the function returned by get_display_item_writer can be called on a worker thread.
+
+        Handlers that override get_display_item_writer capture what they need from the display item, and handlers that
+        only override write_data write the data captured by the default get_display_item_writer. Handlers that only
+        override write_display_item read the display item when writing, so their writer is called on the main thread.
+        """
+        handler_type = type(self)
+        return handler_type.get_display_item_writer is not ImportExportHandler.get_display_item_writer or handler_type.write_display_item is ImportExportHandler.write_display_item
+
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        """Return a function to write the display item, capturing what it needs from the display item.
+
+        This method is called on the main thread. The returned function is called on a worker thread if the handler
+        is_display_item_writer_thread_safe. Subclasses that render or encode can capture a snapshot here so the work is
+        done off the main thread.
+        """
+        if type(self).write_display_item is ImportExportHandler.write_display_item:
+            # only the data is written; capture it so the writer does not read the data item.
+            data_item = display_item.data_item
+            assert data_item
+            return functools.partial(self.__write_data_to_path, data_item.data, path, extension)
+        return functools.partial(self.write_display_item, display_item, path, extension)
+
     def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
         data_item = display_item.data_item
         assert data_item
+        self.__write_data_to_path(data_item.data, path, extension)
+
+    def __write_data_to_path(self, data: typing.Optional[_DataArrayType], path: pathlib.Path, extension: str) -> None:
         with open(path, 'wb') as f:
-            data = data_item.data
             if data is not None:
                 self.write_data(data, extension, f)
 
@@ -130,6 +173,62 @@ class ImportExportHandler:
         pass
 
 
+class BatchActivity(Activity.Activity):
+    """An activity tracking the progress of a batch of files. The batch can be cancelled from any thread."""
+
+    def __init__(self, activity_id: str, title: str, total: int) -> None:
+        super().__init__(activity_id, title)
+        self.__total = total
+        self.__count = 0
+        self.__lock = threading.RLock()
+        self.__cancel_event = threading.Event()
+
+    @property
+    def total(self) -> int:
+        return self.__total
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    def _increment_count(self) -> None:
+        with self.__lock:
+            self.__count += 1
+        self.notify_property_changed("count")
+        self.notify_property_changed("displayed_title")
+
+    @property
+    def is_cancellable(self) -> bool:
+        return True
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self.__cancel_event.set()
+        self.notify_property_changed("displayed_title")
+
+    @property
+    def displayed_title(self) -> str:
+        state = _("cancelling") if self.is_cancelled else f"{self.__count}/{self.__total}"
+        return self.title + " (" + state + ")"
+
+
+class ImportActivity(BatchActivity):
+    """An activity tracking the progress of a batch import."""
+
+    def __init__(self, total: int) -> None:
+        super().__init__("import", _("Import"), total)
+
+
+class ExportActivity(BatchActivity):
+    """An activity tracking the progress of a batch export."""
+
+    def __init__(self, total: int) -> None:
+        super().__init__("export", _("Export"), total)
+
+
 class ImportExportManager(metaclass=Utility.Singleton):
     """
         Tracks import/export plugins.
@@ -184,6 +283,45 @@ class ImportExportManager(metaclass=Utility.Singleton):
         io_handler = self.__find_io_handler_for_extension(extension)
         return io_handler.read_import_data(extension, path, project_storage_system) if io_handler else ImportData(list(), dict(), list())
 
+    def read_import_data_batch(self, paths: typing.Sequence[pathlib.Path], project_storage_system: FileStorageSystem.ProjectStorageSystem, *,
+                               activity: typing.Optional[BatchActivity] = None,
+                               max_workers: typing.Optional[int] = None) -> typing.Sequence[typing.Tuple[pathlib.Path, ImportData]]:
+        """Read the import data for each path, decoding the files in parallel on a pool of worker threads.
+
+        The import data is returned in the order of the paths. Files that cannot be read are reported and skipped. If
+        the activity is cancelled, files that have not started decoding are skipped; files already decoded are returned.
+        The activity count is incremented as each file finishes.
+
+        The number of worker threads defaults to the number of processors, since decoding is mostly compute bound.
+
+        This method can be called from any thread.
+        """
+
+        def read_import_data(path: pathlib.Path) -> typing.Optional[ImportData]:
+            try:
+                if activity and activity.is_cancelled:
+                    return None
+                return self.read_import_data(path, project_storage_system)
+            except Exception as e:
+                logging.debug(f"Could not read image {path} / {e}")
+                traceback.print_exc()
+                traceback.print_stack()
+                return None
+            finally:
+                if activity:
+                    activity._increment_count()
+
+        if max_workers is None:
+            max_workers = max(min(len(paths), os.cpu_count() or 1), 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import") as executor:
+            futures = [executor.submit(read_import_data, path) for path in paths]
+            results = list[typing.Tuple[pathlib.Path, ImportData]]()
+            for path, future in zip(paths, futures):
+                import_data = future.result()
+                if import_data is not None:
+                    results.append((path, import_data))
+        return results
+
     # read file, return data
     def read_data(self, path: pathlib.Path) -> typing.Optional[_DataArrayType]:
         extension = path.suffix[1:].lower()  # remove the leading "." and convert to lower case
@@ -194,16 +332,90 @@ class ImportExportManager(metaclass=Utility.Singleton):
         return None
 
     def write_display_item_with_writer(self, writer: ImportExportHandler, display_item: DisplayItem.DisplayItem, path: pathlib.Path) -> None:
+        display_item_writer = self.get_display_item_writer_with_writer(writer, display_item, path)
+        if display_item_writer:
+            display_item_writer()
+
+    def get_display_item_writer_with_writer(self, writer: ImportExportHandler, display_item: DisplayItem.DisplayItem, path: pathlib.Path) -> typing.Optional[typing.Callable[[], None]]:
+        """Return a function to write the display item to the path, or None if the writer cannot write it.
+
+        This method must be called on the main thread. The returned function can be called on any thread.
+        """
         extension = path.suffix
         if extension:
             extension = extension[1:].lower()  # remove the leading "."
             if extension in writer.extensions and writer.can_write_display_item(display_item, extension):
-                start = time.time()
-                writer.write_display_item(display_item, path, extension)
-                elapsed = time.time() - start
-                export_metrics_str = f"{int(elapsed)}s ({path}) {'/'.join(data_item.size_and_data_format_as_string for data_item in display_item.data_items)}"
-                logging.getLogger("export").info(f"Export {export_metrics_str}")
-                logging.getLogger("_commands").info(f"# export metrics {export_metrics_str}")
+                display_item_writer = writer.get_display_item_writer(display_item, path, extension)
+                size_and_data_format_str = '/'.join(data_item.size_and_data_format_as_string for data_item in display_item.data_items)
+
+                def write_display_item() -> None:
+                    start = time.time()
+                    display_item_writer()
+                    elapsed = time.time() - start
+                    export_metrics_str = f"{int(elapsed)}s ({path}) {size_and_data_format_str}"
+                    logging.getLogger("export").info(f"Export {export_metrics_str}")
+                    logging.getLogger("_commands").info(f"# export metrics {export_metrics_str}")
+
+                return write_display_item
+        return None
+
+    async def write_display_items_async(self, writer: ImportExportHandler, display_item_paths: typing.Sequence[typing.Tuple[DisplayItem.DisplayItem, pathlib.Path]], *,
+                                        activity: typing.Optional[BatchActivity] = None,
+                                        max_workers: typing.Optional[int] = None,
+                                        max_pending: typing.Optional[int] = None) -> typing.List[typing.Optional[Exception]]:
+        """Write each display item to its path, encoding the files in parallel on a pool of worker threads.
+
+        This method must be awaited on the main thread event loop. Each display item is captured by its writer on the
+        main thread just before it is queued; at most max_pending items are queued at once so that the captured data
+        is bounded. If the activity is cancelled, display items not yet queued are skipped.
+
+        Returns a list with an exception for each display item that failed or None if it was written. Skipped items
+        have a CancelledError.
+        """
+        loop = asyncio.get_running_loop()
+        results: typing.List[typing.Optional[Exception]] = [None] * len(display_item_paths)
+        max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        max_pending = max_pending or 2 * max_workers
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export") as executor:
+            pending: typing.Dict[asyncio.Future[None], int] = dict()
+
+            async def wait_pending(return_when: str) -> None:
+                done, _pending = await asyncio.wait(pending.keys(), return_when=return_when)
+                for future in done:
+                    index = pending.pop(future)
+                    exception = future.exception()
+                    if exception:
+                        logging.debug(f"Could not export {display_item_paths[index][1]} / {exception}")
+                    results[index] = typing.cast(typing.Optional[Exception], exception)
+                    if activity:
+                        activity._increment_count()
+
+            for index, (display_item, path) in enumerate(display_item_paths):
+                if activity and activity.is_cancelled:
+                    results[index] = concurrent.futures.CancelledError()
+                    continue
+                if len(pending) >= max_pending:
+                    await wait_pending(asyncio.FIRST_COMPLETED)
+                try:
+                    display_item_writer = self.get_display_item_writer_with_writer(writer, display_item, path)
+                    if not display_item_writer:
+                        raise ImportExportIncompatibleDataError(path)
+                    if not writer.is_display_item_writer_thread_safe:
+                        # the writer reads the display item, so write it here on the main thread.
+                        display_item_writer()
+                        if activity:
+                            activity._increment_count()
+                        continue
+                except Exception as e:
+                    logging.debug(f"Could not export {path} / {e}")
+                    results[index] = e
+                    if activity:
+                        activity._increment_count()
+                    continue
+                pending[loop.run_in_executor(executor, display_item_writer)] = index
+            if pending:
+                await wait_pending(asyncio.ALL_COMPLETED)
+        return results
 
     def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path) -> None:
         extension = path.suffix
@@ -214,6 +426,17 @@ class ImportExportManager(metaclass=Utility.Singleton):
                     io_handler.write_display_item(display_item, path, extension)
 
 
+def _set_data_element_mapped_data(data_element: DataElementType, data: _DataArrayType) -> None:
+    # small memory mapped arrays are read into memory. large ones stay mapped and are marked as large format so that
+    # the storage handler copies them in blocks; the whole array is never loaded into memory.
+    if isinstance(data, numpy.memmap):
+        if data.nbytes < _g_memory_map_import_size:
+            data = numpy.array(data)
+        else:
+            data_element["large_format"] = True
+    data_element["data"] = data
+
+
 # create a new data item with a data element.
 # data element is a dict which can be processed into a data item
 # when this method returns, the data item has not been added to a document. therefore, the
@@ -593,23 +816,118 @@ class StandardImportExportHandler(ImportExportHandler):
     def can_write(self, data_metadata: DataAndMetadata.DataMetadata, extension: str) -> bool:
         return len(data_metadata.dimensional_shape) == 2
 
-    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        # capture the display values; rendering and encoding happen when the writer is called.
         display_data_channel = display_item.display_data_channel
         assert display_data_channel
         display_values = display_data_channel.get_latest_computed_display_values()
         assert display_values
+        return functools.partial(self.__write_display_values, display_values, path, extension)
+
+    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+        self.get_display_item_writer(display_item, path, extension)()
+
+    def __write_display_values(self, display_values: DisplayItem.DisplayValues, path: pathlib.Path, extension: str) -> None:
         data = display_values.display_rgba  # export the display rather than the data for these types
         assert data is not None
         imageio.imwrite(path, numpy.flip(Image.get_rgb_view(data), 2), extension="." + extension)
 
 
+def _count_csv_rows(path: pathlib.Path) -> int:
+    # count the lines in the file without decoding it. this is an upper bound on the number of data rows since it
+    # includes comment and blank lines.
+    row_count = 0
+    last_byte = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            row_count += block.count(b"\n")
+            last_byte = block[-1:]
+    return row_count + (1 if last_byte != b"\n" else 0)
+
+
+def read_csv_data(path: pathlib.Path, delimiter: str = ",", *, block_rows: typing.Optional[int] = None) -> _DataArrayType:
+    """Read a csv file of floating point values into a float array.
+
+    The file is parsed in blocks of rows with a vectorized conversion into an array preallocated from the line count.
+    Comments starting with '#' and blank lines are skipped. Like numpy.loadtxt, single row or single column results
+    are squeezed.
+    """
+    block_rows = block_rows if block_rows is not None else _g_csv_block_rows
+    data: typing.Optional[_DataArrayType] = None
+    column_count = 0
+    row = 0
+    with open(path, "r") as f:
+        for lines in iter(lambda: list(itertools.islice(f, block_rows)), []):
+            text = "".join(lines)
+            if "#" in text:
+                text = "\n".join(line.split("#", 1)[0] for line in lines)
+            if data is None:
+                first_line = next((line for line in text.splitlines() if line.strip()), None)
+                if first_line is None:
+                    continue
+                column_count = len(first_line.split(delimiter))
+                data = numpy.empty((_count_csv_rows(path), column_count), dtype=float)
+            values = numpy.fromstring(text.replace(delimiter, " "), dtype=float, sep=" ")
+            block_row_count = values.shape[0] // column_count
+            if values.shape[0] != block_row_count * column_count or text.count(delimiter) != block_row_count * (column_count - 1):
+                raise ValueError(f"Invalid csv data in {path}.")
+            data[row:row + block_row_count] = values.reshape(block_row_count, column_count)
+            row += block_row_count
+    if data is None:
+        return numpy.empty((0,), dtype=float)
+    if row < data.shape[0]:
+        data = data[:row].copy()
+    return numpy.squeeze(data)
+
+
+def write_csv_data(f: typing.TextIO, data: _DataArrayType, delimiter: str = ", ", *, format_: str = "%.18e", block_rows: typing.Optional[int] = None) -> None:
+    """Write a 1d or 2d array to a csv text stream, equivalent to numpy.savetxt.
+
+    Each block of rows is formatted with a single format operation using a block template which is reused between
+    blocks, so memory use is bounded by the block size.
+    """
+    if numpy.iscomplexobj(data):
+        numpy.savetxt(f, data, delimiter=delimiter, fmt=format_)
+        return
+    block_rows = block_rows if block_rows is not None else _g_csv_block_rows
+    data = data if data.ndim == 2 else data.reshape(-1, 1)
+    row_template = delimiter.join([format_] * data.shape[1]) + "\n"
+    block_template = str()
+    for start in range(0, data.shape[0], block_rows):
+        block = data[start:start + block_rows]
+        if len(block_template) != len(row_template) * block.shape[0]:
+            block_template = row_template * block.shape[0]
+        f.write(block_template % tuple(block.ravel().tolist()))
+
+
+def write_csv_table(f: typing.TextIO, headers: typing.Sequence[str], data_list: typing.Sequence[_DataArrayType], delimiter: str = ", ", *, block_rows: typing.Optional[int] = None) -> None:
+    """Write a header line and columns of possibly different lengths to a csv text stream.
+
+    Values are converted to strings a block of rows at a time; missing values in shorter columns are left empty.
+    """
+    block_rows = block_rows if block_rows is not None else _g_csv_block_rows
+    f.write("# " + delimiter.join(headers) + "\n")
+    row_count = max((len(data) for data in data_list), default=0)
+    for start in range(0, row_count, block_rows):
+        stop = min(start + block_rows, row_count)
+        columns = list()
+        for data in data_list:
+            column = numpy.full((stop - start,), "", dtype=object)
+            values = data[start:stop]
+            # match the formatting of python scalars, which is the shortest repr of the double value.
+            column[:values.shape[0]] = (values.astype(numpy.float64) if values.dtype.kind == "f" else values).astype(str)
+            columns.append(column)
+        rows = numpy.stack(columns, axis=-1).tolist() if columns else [[] for _ in range(stop - start)]
+        f.write("".join(delimiter.join(row) + "\n" for row in rows))
+
+
 class CSVImportExportHandler(ImportExportHandler):
 
     def __init__(self, io_handler_id: str, name: str, extensions: typing.Sequence[str]) -> None:
         super().__init__(io_handler_id, name, extensions)
 
     def read_data_elements(self, extension: str, path: pathlib.Path) -> typing.List[DataElementType]:
-        data = numpy.loadtxt(str(path), delimiter=',')
+        data = read_csv_data(path, delimiter=',')
         if data is not None:
             data_element: DataElementType = dict()
             data_element["data"] = data
@@ -619,13 +937,21 @@ class CSVImportExportHandler(ImportExportHandler):
     def can_write(self, data_metadata: DataAndMetadata.DataMetadata, extension: str) -> bool:
         return 0 < len(data_metadata.dimensional_shape) <= 2
 
-    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        # capture the data; formatting and writing happen when the writer is called.
         data_item = display_item.data_item
         assert data_item
         assert data_item.data_metadata
-        data = data_item.data
-        if data is not None and self.can_write(data_item.data_metadata, 'csv'):
-            numpy.savetxt(path, data, delimiter=', ')
+        data = data_item.data if self.can_write(data_item.data_metadata, 'csv') else None
+        return functools.partial(self.__write_data, data, path)
+
+    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+        self.get_display_item_writer(display_item, path, extension)()
+
+    def __write_data(self, data: typing.Optional[_DataArrayType], path: pathlib.Path) -> None:
+        if data is not None:
+            with open(path, "w") as f:
+                write_csv_data(f, data, delimiter=', ')
 
 
 def build_table(display_item: DisplayItem.DisplayItem) -> typing.Tuple[typing.List[str], typing.List[_DataArrayType]]:
@@ -688,21 +1014,17 @@ class CSV1ImportExportHandler(ImportExportHandler):
     def can_write_display_item(self, display_item: DisplayItem.DisplayItem, extension: str) -> bool:
         return all(data_item.is_data_1d for data_item in display_item.data_items)
 
-    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        # capture the table; formatting and writing happen when the writer is called.
         headers, data_list = build_table(display_item)
+        return functools.partial(self.__write_table, headers, data_list, path)
 
-        newline = "\n"
-        delimiter = ", "
-        format_ = "{}" # We need to stick with an empty format string here, otherwise we will have problems with the
-                       # fill value of zip_longest
-        row_template = delimiter.join([format_] * len(data_list))
-        row_template += newline
-        header_template = "# " + row_template
+    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+        self.get_display_item_writer(display_item, path, extension)()
 
+    def __write_table(self, headers: typing.Sequence[str], data_list: typing.Sequence[_DataArrayType], path: pathlib.Path) -> None:
         with open(path, "w+") as f:
-            f.write(header_template.format(*headers))
-            for row in itertools.zip_longest(*data_list, fillvalue=""):
-                f.write(row_template.format(*row))
+            write_csv_table(f, headers, data_list, delimiter=", ")
 
 
 class NDataImportExportHandler(ImportExportHandler):
@@ -711,26 +1033,37 @@ class NDataImportExportHandler(ImportExportHandler):
         super().__init__(io_handler_id, name, extensions)
 
     def read_data_elements(self, extension: str, path: pathlib.Path) -> typing.List[DataElementType]:
-        zip_file = zipfile.ZipFile(path, 'r')
-        namelist = zip_file.namelist()
-        if "metadata.json" in namelist and "data.npy" in namelist:
-            metadata = json.loads(zip_file.read("metadata.json").decode("utf-8"))
-            data_bytes = zip_file.read("data.npy")
-            data = numpy.load(io.BytesIO(data_bytes))
-            if data is not None:
-                data_element = metadata
-                data_element["data"] = data
-                return [data_element]
+        with zipfile.ZipFile(path, 'r') as zip_file:
+            namelist = zip_file.namelist()
+            if "metadata.json" in namelist and "data.npy" in namelist:
+                metadata = json.loads(zip_file.read("metadata.json").decode("utf-8"))
+                data: typing.Optional[_DataArrayType] = None
+                if zip_file.getinfo("data.npy").compress_type == zipfile.ZIP_STORED:
+                    with open(path, "rb") as fp:
+                        local_files, dir_files, eocd = NDataHandler.parse_zip(fp)
+                        data = NDataHandler.map_data(fp, local_files, dir_files, b"data.npy")
+                if data is None:
+                    data = numpy.load(io.BytesIO(zip_file.read("data.npy")))
+                if data is not None:
+                    data_element = metadata
+                    _set_data_element_mapped_data(data_element, data)
+                    return [data_element]
         return list()
 
     def can_write(self, data_metadata: DataAndMetadata.DataMetadata, extension: str) -> bool:
         return True
 
-    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        # capture the data and metadata; encoding and writing happen when the writer is called.
         data_item = display_item.data_item
         assert data_item
         data_element = create_data_element_from_data_item(data_item, include_data=False)
-        data = data_item.data
+        return functools.partial(self.__write_data_element, data_element, data_item.data, path)
+
+    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+        self.get_display_item_writer(display_item, path, extension)()
+
+    def __write_data_element(self, data_element: DataElementType, data: typing.Optional[_DataArrayType], path: pathlib.Path) -> None:
         if data is not None:
             root = str(path.parent)
             metadata_path = root + "_metadata.json"
@@ -791,7 +1124,11 @@ class NumPyImportExportHandler(ImportExportHandler):
         super().__init__(io_handler_id, name, extensions)
 
     def read_data_elements(self, extension: str, path: pathlib.Path) -> typing.List[DataElementType]:
-        data = numpy.load(str(path))
+        try:
+            data = numpy.load(str(path), mmap_mode="r")
+        except ValueError:
+            # object arrays and empty arrays cannot be memory mapped.
+            data = numpy.load(str(path))
         metadata_path = path.with_suffix(".json")
         if metadata_path.exists():
             with open(metadata_path) as f:
@@ -800,20 +1137,26 @@ class NumPyImportExportHandler(ImportExportHandler):
             metadata = dict()
         if data is not None:
             data_element = metadata
-            data_element["data"] = data
+            _set_data_element_mapped_data(data_element, data)
             return [data_element]
         return list()
 
     def can_write(self, data_metadata: DataAndMetadata.DataMetadata, extension: str) -> bool:
         return True
 
-    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+    def get_display_item_writer(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> typing.Callable[[], None]:
+        # capture the data and metadata; writing happens when the writer is called.
         data_item = display_item.data_item
         assert data_item
+        data_element = create_data_element_from_data_item(data_item, include_data=False)
+        return functools.partial(self.__write_data_element, data_element, data_item.data, path)
+
+    def write_display_item(self, display_item: DisplayItem.DisplayItem, path: pathlib.Path, extension: str) -> None:
+        self.get_display_item_writer(display_item, path, extension)()
+
+    def __write_data_element(self, data_element: DataElementType, data: typing.Optional[_DataArrayType], path: pathlib.Path) -> None:
         data_path = path
         metadata_path = data_path.with_suffix(".json")
-        data_element = create_data_element_from_data_item(data_item, include_data=False)
-        data = data_item.data
         if data is not None:
             try:
                 with open(str(metadata_path), "w") as fp:
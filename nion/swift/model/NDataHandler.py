@@ -307,6 +307,37 @@ def read_data(fp: typing.BinaryIO, local_files: typing.Dict[int, typing.Tuple[by
     return None
 
 
+def map_data(fp: typing.BinaryIO, local_files: typing.Dict[int, typing.Tuple[bytes, int, int, int]], dir_files: typing.Dict[bytes, typing.Tuple[int, int]], name_bytes: bytes) -> typing.Optional[_NDArray]:
+    """
+        Memory map a numpy data array from the zip file without reading it
+
+        :param fp: a file pointer
+        :param local_files: the local files structure
+        :param dir_files: the directory headers
+        :param name: the name of the data file to map
+        :return: a read-only memory mapped numpy data array, if found and mappable
+
+        The data file must be stored uncompressed, which is always the case for files
+        written by this module. Arrays of object dtype or with no elements cannot be mapped.
+
+        The local_files and dir_files should be passed from
+        the results of parse_zip.
+    """
+    if name_bytes in dir_files:
+        fp.seek(local_files[dir_files[name_bytes][1]][1])
+        version = numpy.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = numpy.lib.format.read_array_header_1_0(fp)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = numpy.lib.format.read_array_header_2_0(fp)
+        else:
+            return None
+        if dtype.hasobject or numpy.prod(shape, dtype=numpy.int64) == 0:
+            return None
+        return numpy.memmap(fp, dtype=dtype, mode="r", offset=fp.tell(), shape=shape, order="F" if fortran_order else "C")
+    return None
+
+
 def read_json(fp: typing.BinaryIO, local_files: typing.Dict[int, typing.Tuple[bytes, int, int, int]], dir_files: typing.Dict[bytes, typing.Tuple[int, int]], name_bytes: bytes) -> PersistentDictType:
     """
         Read json properties from the zip file
@@ -15,6 +15,7 @@ import re
 import traceback
 import typing
 import uuid
+import warnings
 import weakref
 
 # third party libraries
@@ -331,6 +332,10 @@ class PersistentStorageInterface(typing.Protocol):
     @abc.abstractmethod
     def restore_item(self, data_item_uuid: uuid.UUID) -> typing.Optional[PersistentDictType]: ...
 
+    def can_restore_item(self, data_item_uuid: uuid.UUID) -> bool:
+        # storage systems which discard deleted items should override to report whether the item is still available.
+        return True
+
     @abc.abstractmethod
     def prune(self) -> None: ...
 
@@ -350,15 +355,26 @@ class PersistentObjectContext:
     All objects participating in this context should register and unregister themselves with this context at appropriate
     times.
 
-    Other objects can listen to the registration_event to know when a specific object is registered or unregistered.
+    Other objects can register a registration changed function for a specific uuid to know when the object with that
+    uuid is registered or unregistered. Only the functions registered for the uuid of the object are called.
+
+    The registration_event is deprecated. It is fired for every object to every listener and is only created and fired
+    once something has listened to it.
     """
 
     def __init__(self) -> None:
         # Python 3.9+: weakref typing
         self.__objects: typing.Dict[PersistentObjectSpecifier, typing.Any] = dict()
-        self.registration_event = Event.Event()
+        self.__registration_event: typing.Optional[Event.Event] = None
         self.__registration_changed_map: typing.Dict[uuid.UUID, typing.Dict[typing.Any, typing.Callable[[typing.Optional[PersistentObject], typing.Optional[PersistentObject]], None]]] = dict()
 
+    @property
+    def registration_event(self) -> Event.Event:
+        warnings.warn("registration_event is deprecated; use register_registration_changed_fn instead.", DeprecationWarning, stacklevel=2)
+        if self.__registration_event is None:
+            self.__registration_event = Event.Event()
+        return self.__registration_event
+
     def unregister_registration_changed_fn(self, uuid_: uuid.UUID, key: typing.Any) -> None:
         registration_changed_key_map = self.__registration_changed_map.get(uuid_, dict())
         registration_changed_key_map.pop(key)
@@ -369,16 +385,22 @@ class PersistentObjectContext:
         registration_changed_key_map = self.__registration_changed_map.setdefault(uuid_, dict())
         registration_changed_key_map[key] = registration_changed_fn
 
+    def __notify_registration_changed(self, uuid_: uuid.UUID, registered_object: typing.Optional[PersistentObject], unregistered_object: typing.Optional[PersistentObject]) -> None:
+        # only the functions registered for this uuid are called; most objects have none.
+        if self.__registration_event is not None:
+            self.__registration_event.fire(registered_object, unregistered_object)
+        registration_changed_key_map = self.__registration_changed_map.get(uuid_)
+        if registration_changed_key_map:
+            for registration_changed_fn in list(registration_changed_key_map.values()):
+                if callable(registration_changed_fn):
+                    registration_changed_fn(registered_object, unregistered_object)
+
     def register(self, object: PersistentObject) -> None:
         # print(f"register {object} {item_specifier.write()} {len(self.__objects) + 1}")
         # assert item_specifier not in self.__objects
         item_specifier = object.item_specifier
         self.__objects[item_specifier] = weakref.ref(object)
-        self.registration_event.fire(object, None)
-        registration_changed_key_map = self.__registration_changed_map.get(object.uuid, dict())
-        for registration_changed_fn in list(registration_changed_key_map.values()):
-            if callable(registration_changed_fn):
-                registration_changed_fn(object, None)
+        self.__notify_registration_changed(object.uuid, object, None)
 
     def unregister(self, object: PersistentObject) -> None:
         # print(f"unregister {object} {item_specifier.write()} {len(self.__objects) - 1}")
@@ -386,11 +408,7 @@ class PersistentObjectContext:
         item_specifier = object.item_specifier
         if item_specifier in self.__objects:
             self.__objects.pop(item_specifier)
-            self.registration_event.fire(None, object)
-            registration_changed_key_map = self.__registration_changed_map.get(object.uuid, dict())
-            for registration_changed_fn in list(registration_changed_key_map.values()):
-                if callable(registration_changed_fn):
-                    registration_changed_fn(None, object)
+            self.__notify_registration_changed(object.uuid, None, object)
 
     def get_registered_object(self, item_specifier: PersistentObjectSpecifier) -> typing.Optional[PersistentObject]:
         object_weakref = self.__objects.get(item_specifier, None)
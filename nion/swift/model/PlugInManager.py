@@ -9,9 +9,11 @@ import inspect
 import json
 import logging
 import os
+import pathlib
 import pkgutil
 import re
 import sys
+import threading
 import time
 import traceback
 import types
@@ -67,10 +69,13 @@ class APIBroker:
 
 extensions: typing.List[typing.Any] = list()
 
+# import times of the loaded plug-ins, in seconds, for profiling startup.
+plug_in_import_times: typing.Dict[str, float] = dict()
+
 
 def load_plug_in(module_path: str, module_name: str) -> typing.Optional[types.ModuleType]:
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         # First load the module.
         module = importlib.import_module(module_name)
         # Now scan through the module and look for extensions and tests.
@@ -98,8 +103,9 @@ def load_plug_in(module_path: str, module_name: str) -> typing.Optional[types.Mo
                 extension_id = getattr(cls, "extension_id", None)
                 if extension_id:
                     extensions.append(cls(APIBroker()))
-        elapsed_s = int(time.time() - start_time)
-        plugin_loaded_str = f"Plug-in '{module_name}' loaded ({module_path}) ({elapsed_s}s)."
+        elapsed_s = time.perf_counter() - start_time
+        plug_in_import_times[module_name] = elapsed_s
+        plugin_loaded_str = f"Plug-in '{module_name}' loaded ({module_path}) ({elapsed_s:.2f}s)."
         list_of_tests_str = " Tests: " + ",".join(tests) if len(tests) > 0 else ""
         log_message(plugin_loaded_str + list_of_tests_str)
         return module
@@ -112,6 +118,100 @@ def load_plug_in(module_path: str, module_name: str) -> typing.Optional[types.Mo
     return None
 
 
+class PlugInManifestCache:
+    """A cache of plug-in manifests and module availability, persisted between launches.
+
+    Manifests are keyed by their path and are valid while the modification time and size of the manifest file are
+    unchanged. Module availability is valid while the modification times of the directories on the import path are
+    unchanged, so installing or removing packages invalidates it.
+    """
+
+    def __init__(self, file_path: typing.Optional[pathlib.Path] = None) -> None:
+        self.__file_path = file_path
+        self.__lock = threading.RLock()
+        self.__manifests: typing.Dict[str, PersistentDictType] = dict()
+        self.__module_exists_map: typing.Dict[str, bool] = dict()
+        self.__path_signature: typing.List[typing.Any] = list()
+        self.__path_signature_checked = False
+        self.__dirty = False
+        if file_path and file_path.exists():
+            try:
+                with open(file_path) as f:
+                    properties = json.load(f)
+                if properties.get("version") == 1:
+                    self.__manifests = properties.get("manifests", dict())
+                    self.__module_exists_map = properties.get("modules", dict())
+                    self.__path_signature = properties.get("path_signature", list())
+            except Exception as e:
+                logger.info("Cannot read plug-in cache from %s", file_path)
+                logger.info(e)
+
+    def save(self) -> None:
+        with self.__lock:
+            if self.__dirty and self.__file_path:
+                properties = {"version": 1, "manifests": self.__manifests, "modules": self.__module_exists_map, "path_signature": self.__path_signature}
+                try:
+                    temp_file_path = self.__file_path.with_suffix(".temp")
+                    with open(temp_file_path, "w") as f:
+                        json.dump(properties, f)
+                    os.replace(temp_file_path, self.__file_path)
+                    self.__dirty = False
+                except Exception as e:
+                    logger.info("Cannot write plug-in cache to %s", self.__file_path)
+                    logger.info(e)
+
+    def read_manifest(self, manifest_path: str) -> typing.Optional[PersistentDictType]:
+        """Return the manifest at the path or None if there is no manifest. Raises an exception if it is invalid."""
+        try:
+            stat_result = os.stat(manifest_path)
+        except OSError:
+            return None
+        signature = [stat_result.st_mtime_ns, stat_result.st_size]
+        with self.__lock:
+            entry = self.__manifests.get(manifest_path)
+            if entry and entry.get("signature") == signature:
+                return typing.cast(PersistentDictType, copy.deepcopy(entry["manifest"]))
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        with self.__lock:
+            self.__manifests[manifest_path] = {"signature": signature, "manifest": copy.deepcopy(manifest)}
+            self.__dirty = True
+        return typing.cast(PersistentDictType, manifest)
+
+    def __check_path_signature(self) -> None:
+        # module availability is only valid for the import path it was found with.
+        if not self.__path_signature_checked:
+            path_signature = [[path, os.stat(path).st_mtime_ns] for path in sys.path if os.path.isdir(path)]
+            if path_signature != self.__path_signature:
+                self.__path_signature = path_signature
+                self.__module_exists_map = dict()
+                self.__dirty = True
+            self.__path_signature_checked = True
+
+    def module_exists(self, module: str) -> bool:
+        """Return whether the module can be found, without importing it."""
+        with self.__lock:
+            self.__check_path_signature()
+            if module in self.__module_exists_map:
+                return self.__module_exists_map[module]
+        try:
+            module_exists = importlib.util.find_spec(module) is not None
+        except ModuleNotFoundError:
+            module_exists = False
+        with self.__lock:
+            self.__module_exists_map[module] = module_exists
+            self.__dirty = True
+        return module_exists
+
+    def find_modules(self, modules: typing.Sequence[str]) -> None:
+        """Look up the availability of the modules so later calls to module_exists are cached.
+
+        Finding a module imports its parent packages, so this is done on the calling thread.
+        """
+        for module in modules:
+            self.module_exists(module)
+
+
 class _AdapterProtocol(typing.Protocol):
     module_name: str
     module_path: str
@@ -123,7 +223,7 @@ class _AdapterProtocol(typing.Protocol):
 
 
 class ModuleAdapter(_AdapterProtocol):
-    def __init__(self, package_name: str, module_info: _ModuleInfoType) -> None:
+    def __init__(self, package_name: str, module_info: _ModuleInfoType, manifest_cache: typing.Optional[PlugInManifestCache] = None) -> None:
         self.module_name = package_name + "." + module_info.name
         self.module_path = package_name
         self.loaded_module: typing.Optional[types.ModuleType] = None
@@ -132,13 +232,13 @@ class ModuleAdapter(_AdapterProtocol):
         path = getattr(module_info.module_finder, 'path', None)
         if path:
             self.manifest_path = os.path.join(path, module_info.name, "manifest.json")
-            if os.path.exists(self.manifest_path):
-                try:
-                    with open(self.manifest_path) as f:
-                        self.manifest.update(json.load(f))
-                except Exception as e:
-                    logger.info("Cannot read manifest file from %s", self.manifest_path)
-                    logger.info(e)
+            try:
+                manifest = (manifest_cache or PlugInManifestCache()).read_manifest(self.manifest_path)
+                if manifest is not None:
+                    self.manifest.update(manifest)
+            except Exception as e:
+                logger.info("Cannot read manifest file from %s", self.manifest_path)
+                logger.info(e)
         get_data = getattr(module_info.module_finder, 'get_data', None)
         if get_data:
             try:
@@ -156,20 +256,18 @@ class ModuleAdapter(_AdapterProtocol):
 
 
 class PlugInAdapter(_AdapterProtocol):
-    def __init__(self, directory: str, relative_path: str) -> None:
+    def __init__(self, directory: str, relative_path: str, manifest_cache: typing.Optional[PlugInManifestCache] = None) -> None:
         plugin_dir = os.path.join(directory, relative_path)
         self.manifest_path = os.path.join(plugin_dir, "manifest.json")
         self.module_name = relative_path
         self.module_path = directory
         self.loaded_module: typing.Optional[types.ModuleType] = None
         self.manifest: PersistentDictType = dict()
-        if os.path.exists(self.manifest_path):
-            try:
-                with open(self.manifest_path) as f:
-                    self.manifest = json.load(f)
-            except Exception as e:
-                logger.info("Cannot read manifest file from %s", self.manifest_path)
-                logger.info(e)
+        try:
+            self.manifest = (manifest_cache or PlugInManifestCache()).read_manifest(self.manifest_path) or dict()
+        except Exception as e:
+            logger.info("Cannot read manifest file from %s", self.manifest_path)
+            logger.info(e)
 
     def load(self) -> None:
         self.loaded_module = load_plug_in(self.module_path, self.module_name)
@@ -232,8 +330,8 @@ def load_plug_ins(document_location: str, data_location: str, root_dir: typing.O
         else:
             logger.info("NOT Loading plug-ins from %s (missing)", plugins_dir)
 
-    version_map: PersistentDictType = dict()
-    module_exists_map: typing.Dict[str, bool] = dict()
+    # the cache of manifests and module availability is stored with the application data.
+    manifest_cache = PlugInManifestCache(pathlib.Path(data_location) / "PlugInCache.json" if data_location is not None else None)
 
     plugin_adapters = list[_AdapterProtocol]()
 
@@ -243,12 +341,67 @@ def load_plug_ins(document_location: str, data_location: str, root_dir: typing.O
     import nionswift_plugin
     modules = pkgutil.iter_modules(getattr(nionswift_plugin, "__path__"))
     for module_info in sorted(modules, key=case_insensitive_name):
-        plugin_adapters.append(ModuleAdapter(getattr(nionswift_plugin, "__name__"), module_info))
+        plugin_adapters.append(ModuleAdapter(getattr(nionswift_plugin, "__name__"), module_info, manifest_cache))
 
     for directory, relative_path in plugin_dirs:
-        plugin_adapters.append(PlugInAdapter(directory, relative_path))
+        plugin_adapters.append(PlugInAdapter(directory, relative_path, manifest_cache))
+
+    _load_plug_in_adapters(plugin_adapters, manifest_cache)
+
+    manifest_cache.save()
+
+
+# lazy plug-ins by the kind and identifier of the entry points they declare.
+__lazy_plug_in_adapters: typing.Dict[typing.Tuple[str, str], _AdapterProtocol] = dict()
+__lazy_plug_in_lock = threading.RLock()
+
+
+def load_lazy_plug_in(kind: str, identifier: typing.Optional[str]) -> bool:
+    """Load the lazy plug-in declaring the entry point, if any. Return whether a plug-in was loaded.
+
+    A plug-in can declare lazy entry points in its manifest, for instance the computation types it registers, using
+    {"lazy": {"computation_types": ["computation-type-id"]}}. The plug-in is not imported at startup; it is imported
+    and run the first time one of its entry points is looked up.
+    """
+    with __lazy_plug_in_lock:
+        plugin_adapter = __lazy_plug_in_adapters.get((kind, identifier or str()))
+        if not plugin_adapter:
+            return False
+        # load the lazy plug-ins it requires first.
+        plugin_adapters = _get_required_plug_in_adapters([plugin_adapter], {value.manifest.get("identifier"): value for value in __lazy_plug_in_adapters.values()})
+        for key in [key for key, value in __lazy_plug_in_adapters.items() if value in plugin_adapters]:
+            __lazy_plug_in_adapters.pop(key)
+        _load_and_run_plug_in_adapters(plugin_adapters)
+        return plugin_adapter.loaded_module is not None
+
+
+def _get_required_plug_in_adapters(plugin_adapters: typing.Sequence[_AdapterProtocol], plugin_adapter_map: typing.Mapping[typing.Any, _AdapterProtocol]) -> typing.List[_AdapterProtocol]:
+    # return the plug-in adapters and the plug-in adapters in the map they require, directly or indirectly, with the
+    # required plug-in adapters before the plug-in adapters requiring them.
+    required_plugin_adapters = list[_AdapterProtocol]()
+
+    def add_plugin_adapter(plugin_adapter: _AdapterProtocol) -> None:
+        if plugin_adapter not in required_plugin_adapters:
+            for requirement in plugin_adapter.manifest.get("requires", list()):
+                required_plugin_adapter = plugin_adapter_map.get(requirement.split()[0])
+                if required_plugin_adapter and required_plugin_adapter is not plugin_adapter:
+                    add_plugin_adapter(required_plugin_adapter)
+            if plugin_adapter not in required_plugin_adapters:
+                required_plugin_adapters.append(plugin_adapter)
+
+    for plugin_adapter in plugin_adapters:
+        add_plugin_adapter(plugin_adapter)
+    return required_plugin_adapters
 
-    ordered_module_adapters = list[_AdapterProtocol]()
+
+def _load_plug_in_adapters(plugin_adapters: typing.Sequence[_AdapterProtocol], manifest_cache: PlugInManifestCache) -> None:
+    version_map: PersistentDictType = dict()
+
+    # look up the modules required by the plug-ins.
+    manifest_cache.find_modules(sorted({module for plugin_adapter in plugin_adapters for module in plugin_adapter.manifest.get("modules", list()) if isinstance(module, str)}))
+
+    # the plug-ins in the order their requirements were satisfied, with their lazy entry points.
+    resolved_plugin_adapters = list[typing.Tuple[_AdapterProtocol, typing.Dict[str, typing.List[str]]]]()
 
     progress = True
     while progress:
@@ -258,6 +411,7 @@ def load_plug_ins(document_location: str, data_location: str, root_dir: typing.O
         for plugin_adapter in plugin_adapters_copy:
             manifest_path = plugin_adapter.manifest_path
             manifest = plugin_adapter.manifest
+            lazy_entry_points: typing.Dict[str, typing.List[str]] = dict()
             if manifest:
                 manifest_valid = True
                 if not "name" in manifest:
@@ -275,14 +429,15 @@ def load_plug_ins(document_location: str, data_location: str, root_dir: typing.O
                 if "requires" in manifest and not isinstance(manifest["requires"], list):
                     logger.info("Invalid manifest ('requires' not a list): %s", manifest_path)
                     manifest_valid = False
+                if "lazy" in manifest:
+                    lazy_entry_points = manifest["lazy"]
+                    if not isinstance(lazy_entry_points, dict) or not all(isinstance(v, list) and all(isinstance(i, str) for i in v) for v in lazy_entry_points.values()):
+                        logger.info("Invalid manifest ('lazy' not a dict of lists of identifiers): %s", manifest_path)
+                        manifest_valid = False
                 if not manifest_valid:
                     continue
                 for module in manifest.get("modules", list()):
-                    if module in module_exists_map:
-                        module_exists = module_exists_map.get(module)
-                    else:
-                        module_exists = importlib.util.find_spec(module) is not None
-                        module_exists_map[module] = module_exists
+                    module_exists = manifest_cache.module_exists(module)
                     if not module_exists:
                         log_message(f"Plug-in '{plugin_adapter.module_name}' NOT loaded ({plugin_adapter.module_path}).")
                         logger.info("Cannot satisfy requirement (%s): %s", module, manifest_path)
@@ -317,24 +472,54 @@ def load_plug_ins(document_location: str, data_location: str, root_dir: typing.O
             #   otherwise defer until next round
             #   stop if no plug-ins loaded in the round
             #   count on the user to have correct dependencies
-            plugin_adapter.load()
-            if plugin_adapter.loaded_module:
-                ordered_module_adapters.append(plugin_adapter)
-                __modules.append(plugin_adapter.loaded_module)
+            resolved_plugin_adapters.append((plugin_adapter, lazy_entry_points))
             progress = True
     for plugin_adapter in plugin_adapters:
         log_message(f"Plug-in '{plugin_adapter.module_name}' NOT loaded (requirements) ({plugin_adapter.module_path}).")
 
-    for plugin_adapter in ordered_module_adapters:
+    # a lazy plug-in required by a plug-in loaded now is loaded now too, so that it is run before the plug-ins that
+    # require it, and on this thread rather than on the thread that first uses one of its entry points.
+    plugin_adapter_map = {plugin_adapter.manifest.get("identifier"): plugin_adapter for plugin_adapter, _ in resolved_plugin_adapters}
+    eager_plugin_adapters = _get_required_plug_in_adapters([plugin_adapter for plugin_adapter, lazy_entry_points in resolved_plugin_adapters if not lazy_entry_points], plugin_adapter_map)
+    ordered_module_adapters = list[_AdapterProtocol]()
+    for plugin_adapter, lazy_entry_points in resolved_plugin_adapters:
+        if plugin_adapter in eager_plugin_adapters:
+            ordered_module_adapters.append(plugin_adapter)
+        else:
+            # lazy plug-ins are loaded when one of their entry points is first used.
+            with __lazy_plug_in_lock:
+                for kind, identifiers in lazy_entry_points.items():
+                    for identifier in identifiers:
+                        __lazy_plug_in_adapters[(kind, identifier)] = plugin_adapter
+            log_message(f"Plug-in '{plugin_adapter.module_name}' deferred until first use ({plugin_adapter.module_path}).")
+
+    _load_and_run_plug_in_adapters(ordered_module_adapters)
+
+    # log the slowest imports to make it easy to see where startup time goes.
+    if plug_in_import_times:
+        total_s = sum(plug_in_import_times.values())
+        slowest = sorted(plug_in_import_times.items(), key=lambda item: item[1], reverse=True)[:10]
+        logger.info("Plug-in import time %.2fs total; slowest: %s", total_s, ", ".join(f"{name} {elapsed_s:.2f}s" for name, elapsed_s in slowest))
+
+
+def _load_and_run_plug_in_adapters(plugin_adapters: typing.Sequence[_AdapterProtocol]) -> None:
+    loaded_module_adapters = list[_AdapterProtocol]()
+    for plugin_adapter in plugin_adapters:
+        plugin_adapter.load()
+        if plugin_adapter.loaded_module:
+            loaded_module_adapters.append(plugin_adapter)
+            __modules.append(plugin_adapter.loaded_module)
+
+    for plugin_adapter in loaded_module_adapters:
         module = plugin_adapter.loaded_module
         assert module
         for member in inspect.getmembers(module):
             if inspect.isfunction(member[1]) and member[0] == "run":
                 try:
-                    start_time = time.time()
+                    start_time = time.perf_counter()
                     member[1]()
-                    elapsed_s = int(time.time() - start_time)
-                    log_message(f"Plug-in '{plugin_adapter.module_name}' initialized ({elapsed_s}s)")
+                    elapsed_s = time.perf_counter() - start_time
+                    log_message(f"Plug-in '{plugin_adapter.module_name}' initialized ({elapsed_s:.2f}s)")
                 except Exception as e:
                     log_message(f"Plug-in '" + str(module) + "' exception during 'run'.")
                     logger.info(traceback.format_exc())
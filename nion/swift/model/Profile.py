@@ -217,6 +217,15 @@ class ProjectReference(Persistence.PersistentObject):
                 return project.uuid
         return None
 
+    def prefetch_project(self, profile_context: typing.Optional[ProfileContext] = None) -> None:
+        """Scan the project storage ahead of loading the project. May be called from a thread."""
+        if not self.project:
+            project_storage_system = self.make_storage(profile_context)
+            if project_storage_system:
+                with contextlib.closing(project_storage_system):
+                    project_storage_system.load_properties()
+                    project_storage_system.prefetch_storage_handler_scan()
+
     def upgrade(self, profile_context: typing.Optional[ProfileContext] = None) -> typing.Optional[ProjectReference]:
         if self.project_state == "needs_upgrade":
             project_storage_system = self.make_storage(profile_context)
@@ -370,6 +379,28 @@ def project_reference_factory(lookup_id: typing.Callable[[str], str]) -> typing.
     return PlaceholderProjectReference(type)
 
 
+def read_built_in_project_reference(properties: Persistence.PersistentDictType, project_reference_uuid: uuid.UUID) -> typing.Optional[ProjectReference]:
+    """Read the project reference with the uuid from the profile properties if it is a built-in type.
+
+    Does not use the project reference factory hook, so it is safe to call before the plug-ins are loaded. Returns None
+    if the project reference is not found or is not a built-in type. The caller is responsible for closing it.
+    """
+    for project_reference_properties in properties.get("project_references", list()):
+        if project_reference_properties.get("uuid") == str(project_reference_uuid):
+            type = project_reference_properties.get("type")
+            project_reference: typing.Optional[ProjectReference] = None
+            if type == IndexProjectReference.type:
+                project_reference = IndexProjectReference()
+            elif type == FolderProjectReference.type:
+                project_reference = FolderProjectReference()
+            if project_reference:
+                project_reference.begin_reading()
+                project_reference.read_from_dict(project_reference_properties)
+                project_reference.finish_reading()
+            return project_reference
+    return None
+
+
 class ScriptItem(Schema.Entity):
     def __init__(self, entity_type: Schema.EntityType, context: typing.Optional[Schema.EntityContext] = None) -> None:
         super().__init__(entity_type, context)
@@ -18,6 +18,7 @@ from nion.swift.model import DataItem
 from nion.swift.model import DataStructure
 from nion.swift.model import DisplayItem
 from nion.swift.model import FileStorageSystem
+from nion.swift.model import HDF5Handler
 from nion.swift.model import Persistence
 from nion.swift.model import Symbolic
 from nion.swift.model import WorkspaceLayout
@@ -57,6 +58,7 @@ class Project(Persistence.PersistentObject):
         self.define_property("mapped_items", list(), changed=self.__property_changed, hidden=True)  # list of item references, used for shortcut variables in scripts
         self.define_property("filter_id", hidden=True)
         self.define_property("data_group_uuid", converter=Converter.UuidToStringConverter(), hidden=True)
+        self.define_property("storage_compression", hidden=True)  # compression id for new large format data, see HDF5Handler
 
         self.handle_start_read: typing.Optional[typing.Callable[[], None]] = None
         self.handle_insert_model_item: typing.Optional[typing.Callable[[Persistence.PersistentContainerType, str, int, Persistence.PersistentObject], None]] = None
@@ -115,6 +117,15 @@ class Project(Persistence.PersistentObject):
         if filter_id != self.filter_id:
             self._set_persistent_property_value("filter_id", str(filter_id) if filter_id else None)
 
+    @property
+    def storage_compression(self) -> typing.Optional[str]:
+        return typing.cast(typing.Optional[str], self._get_persistent_property_value("storage_compression"))
+
+    @storage_compression.setter
+    def storage_compression(self, storage_compression: typing.Optional[str]) -> None:
+        assert storage_compression is None or storage_compression in HDF5Handler.compression_options
+        self._set_persistent_property_value("storage_compression", storage_compression)
+
     @property
     def data_group(self) -> typing.Optional[DataGroup.DataGroup]:
         uuid_str = typing.cast(typing.Optional[str], self._get_persistent_property_value("data_group_uuid"))
@@ -328,6 +339,7 @@ class Project(Persistence.PersistentObject):
                 if data_group_uuid and existing_data_group_uuid != data_group_uuid:
                     self._get_persistent_property("data_group_uuid").set_value(str(data_group_uuid))
                 self._get_persistent_property("filter_id").set_value(properties.get("filter_id", None))
+                self._get_persistent_property("storage_compression").set_value(properties.get("storage_compression", None))
                 self._get_persistent_property("data_item_references").set_value(properties.get("data_item_references", dict()))
                 self._get_persistent_property("mapped_items").set_value(properties.get("mapped_items", list()))
                 self.__has_been_read = True
@@ -438,6 +450,9 @@ class Project(Persistence.PersistentObject):
             return data_item
         return None
 
+    def can_restore_data_item(self, data_item_uuid: uuid.UUID) -> bool:
+        return self.__storage_system.can_restore_item(data_item_uuid)
+
     def append_display_item(self, display_item: DisplayItem.DisplayItem) -> None:
         assert not self.get_item_by_uuid("display_items", display_item.uuid)
         self.append_item("display_items", display_item)
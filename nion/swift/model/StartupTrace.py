@@ -0,0 +1,114 @@
+"""Opt-in startup tracer.
+
+Records wall-time spans for the named stages of application startup and writes them as a Chrome trace-format JSON
+file, which can be viewed with chrome://tracing or https://ui.perfetto.dev.
+
+Tracing is enabled by setting the NIONSWIFT_STARTUP_TRACE environment variable to the path of the trace file, or by
+calling start_tracing. When tracing is not enabled, trace_span is a no-op.
+"""
+
+from __future__ import annotations
+
+# standard libraries
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+
+# local libraries
+from nion.swift.model import Utility
+
+STARTUP_TRACE_ENVIRONMENT_VARIABLE: typing.Final[str] = "NIONSWIFT_STARTUP_TRACE"
+
+
+class StartupTracer:
+    """Collect trace events. Thread safe so that concurrent stages can record their spans."""
+
+    def __init__(self, file_path: typing.Optional[pathlib.Path] = None) -> None:
+        self.file_path = file_path
+        self.__lock = threading.Lock()
+        self.__origin_ns = time.perf_counter_ns()
+        self.__events: typing.List[typing.Dict[str, typing.Any]] = list()
+        self.__thread_names: typing.Dict[int, str] = dict()
+
+    @property
+    def events(self) -> typing.Sequence[typing.Mapping[str, typing.Any]]:
+        with self.__lock:
+            return list(self.__events)
+
+    def now(self) -> int:
+        return time.perf_counter_ns()
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, category: str = "startup", args: typing.Optional[typing.Mapping[str, typing.Any]] = None) -> None:
+        """Add a complete event (phase X) from start_ns to end_ns, which are perf_counter_ns values."""
+        thread = threading.current_thread()
+        event: typing.Dict[str, typing.Any] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self.__origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident or 0,
+        }
+        if args:
+            event["args"] = dict(args)
+        with self.__lock:
+            self.__events.append(event)
+            self.__thread_names.setdefault(thread.ident or 0, thread.name)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "startup", args: typing.Optional[typing.Mapping[str, typing.Any]] = None) -> typing.Iterator[None]:
+        start_ns = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, start_ns, self.now(), category, args)
+
+    def write(self, file_path: typing.Optional[pathlib.Path] = None) -> None:
+        file_path = file_path or self.file_path
+        assert file_path
+        with self.__lock:
+            events = list(self.__events)
+            # metadata events give the threads readable names in the trace viewer.
+            for thread_id, thread_name in self.__thread_names.items():
+                events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread_id, "args": {"name": thread_name}})
+        with Utility.AtomicFileWriter(file_path) as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+
+_tracer: typing.Optional[StartupTracer] = None
+
+
+def start_tracing(file_path: typing.Optional[pathlib.Path] = None) -> typing.Optional[StartupTracer]:
+    """Start tracing to file_path or the path in the environment variable. Return the tracer or None if not enabled."""
+    global _tracer
+    if not file_path:
+        file_path_str = os.environ.get(STARTUP_TRACE_ENVIRONMENT_VARIABLE)
+        file_path = pathlib.Path(file_path_str) if file_path_str else None
+    if file_path and not _tracer:
+        _tracer = StartupTracer(file_path)
+    return _tracer
+
+
+def stop_tracing() -> typing.Optional[StartupTracer]:
+    """Stop tracing and write the trace file, if tracing. Return the tracer or None if not tracing."""
+    global _tracer
+    tracer = _tracer
+    _tracer = None
+    if tracer and tracer.file_path:
+        tracer.write()
+    return tracer
+
+
+def get_tracer() -> typing.Optional[StartupTracer]:
+    return _tracer
+
+
+def trace_span(name: str, category: str = "startup", args: typing.Optional[typing.Mapping[str, typing.Any]] = None) -> typing.ContextManager[None]:
+    """Return a context manager recording a span for name, if tracing."""
+    tracer = _tracer
+    return tracer.span(name, category, args) if tracer else contextlib.nullcontext()
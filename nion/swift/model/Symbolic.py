@@ -11,6 +11,7 @@ from __future__ import annotations
 # standard libraries
 import ast
 import asyncio
+import collections
 import concurrent.futures
 import contextlib
 import copy
@@ -244,7 +245,7 @@ class ComputationOutput(Persistence.PersistentObject):
                 if name and (output := processor.get_output(name)):
                     if label := output.label:
                         return label
-            compute_class = _computation_types.get(computation.processing_id)
+            compute_class = get_computation_type(computation.processing_id)
             if compute_class:
                 label = typing.cast(typing.Optional[str], getattr(compute_class, "outputs", dict()).get(name, dict()).get("label", str()))
                 if label:
@@ -1062,7 +1063,7 @@ class ComputationVariable(Persistence.PersistentObject):
                     if label := parameter.label:
                         return label
             processing_id = computation.processing_id
-            compute_class = _computation_types.get(processing_id) if processing_id else None
+            compute_class = get_computation_type(processing_id)
             if compute_class:
                 label = typing.cast(typing.Optional[str], getattr(compute_class, "inputs", dict()).get(name, dict()).get("label", str()))
                 if label:
@@ -1075,7 +1076,7 @@ class ComputationVariable(Persistence.PersistentObject):
         computation = self.container
         if isinstance(computation, Computation):
             processing_id = computation.processing_id
-            compute_class = _computation_types.get(processing_id) if processing_id else None
+            compute_class = get_computation_type(processing_id)
             if compute_class:
                 label = typing.cast(typing.Optional[str], getattr(compute_class, "inputs", dict()).get(self.name, dict()).get("entity_id", str()))
                 if label:
@@ -1099,11 +1100,53 @@ def result_factory(lookup_id: typing.Callable[[str], str]) -> ComputationOutput:
     return ComputationOutput()
 
 
+class DataSourceCache:
+    """Keep values derived from data sources so that later data sources with the same inputs can reuse them.
+
+    Each value is stored with a key describing its inputs: the data item and its xdata generation, the display values,
+    and the geometry of the crop graphic and mask graphics. A bound item keeps one of these for the data sources it
+    makes, so that repeated evaluations, such as while dragging a graphic, only recompute values whose inputs changed.
+
+    Thread safe, since data sources are evaluated on computation threads.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = threading.RLock()
+        self.__entries: dict[str, tuple[typing.Any, typing.Any]] = dict()
+
+    def get_or_compute(self, name: str, key: typing.Any, compute: typing.Callable[[], typing.Any]) -> typing.Any:
+        with self.__lock:
+            entry = self.__entries.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        # compute outside the lock. if two threads compute the same value, the last one is kept.
+        value = compute()
+        with self.__lock:
+            self.__entries[name] = (key, value)
+        return value
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+def _make_read_only(xdata: typing.Optional[DataAndMetadata.DataAndMetadata]) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+    # derived values are shared between accesses and evaluations. make them read-only so that a computation modifying
+    # its input in place fails instead of changing the input seen by later evaluations. this does not copy.
+    data = xdata.data if xdata else None
+    if isinstance(data, numpy.ndarray):
+        data.flags.writeable = False
+    return xdata
+
+
 class DataSource:
-    def __init__(self, data_item: DataItem.DataItem | None, display_data_channel: DisplayItem.DisplayDataChannel | None, graphic: Graphics.Graphic | None) -> None:
+    def __init__(self, data_item: DataItem.DataItem | None, display_data_channel: DisplayItem.DisplayDataChannel | None, graphic: Graphics.Graphic | None, cache: DataSourceCache | None = None) -> None:
         assert not (data_item and display_data_channel)
         self.__data_item = data_item
         self.__display_data_channel = display_data_channel
+        self.__cache = cache
+        # derived values are computed at most once per data source, which is made once per evaluation.
+        self.__values: dict[str, typing.Any] = dict()
         display_item = typing.cast("DisplayItem.DisplayItem", display_data_channel.container) if display_data_channel else None
         self.__mask_items = list[Graphics.MaskItem]()
         if display_item:
@@ -1112,15 +1155,29 @@ class DataSource:
                     if graphic_.used_role in ("mask", "fourier_mask"):
                         self.__mask_items.append(graphic_.get_mask_item())
         data_item = display_data_channel.data_item if display_data_channel else data_item
+        # read the generation before the xdata so that a concurrent change can only make the key older than the xdata.
+        self.__xdata_key = (data_item, data_item.xdata_generation) if data_item else None
         self.__xdata = data_item.xdata if data_item else None
         self.__display_data_shape_calculator = DisplayItem.DisplayDataShapeCalculator(self.__xdata.data_metadata if self.__xdata else None)
         self.__graphic_bounds = graphic.bounds if isinstance(graphic, Graphics.RectangleTypeGraphic) else None
         self.__graphic_rotation = graphic.rotation if isinstance(graphic, Graphics.RectangleTypeGraphic) else 0.0
         self.__graphic_interval = graphic.interval if isinstance(graphic, Graphics.IntervalGraphic) else None
         self.__display_values = display_data_channel.get_latest_display_values() if display_data_channel else None
+        # keys describing the graphic geometry. mask items are plain records of the mask graphic geometry.
+        self.__graphic_key = (self.__graphic_bounds, self.__graphic_rotation, self.__graphic_interval)
+        self.__mask_key = tuple((type(mask_item), tuple(vars(mask_item).items())) for mask_item in self.__mask_items)
 
     def close(self) -> None:
         self.__display_values = None
+        self.__values.clear()
+
+    def __get_value(self, name: str, key: typing.Any, compute: typing.Callable[[], typing.Any]) -> typing.Any:
+        # return the value for name, computing it only if it has not been computed for this data source and the cache
+        # does not have it for the same key.
+        if name not in self.__values:
+            cache = self.__cache
+            self.__values[name] = cache.get_or_compute(name, key, compute) if cache else compute()
+        return self.__values[name]
 
     @property
     def data(self) -> typing.Optional[DataAndMetadata._ImageDataType]:
@@ -1144,8 +1201,11 @@ class DataSource:
         if display_data_channel:
             display_values = self.__display_values
             if display_values:
-                display_rgba = display_values.display_rgba
-                return DataAndMetadata.new_data_and_metadata(Image.get_byte_view(display_rgba)) if display_rgba is not None else None
+                def compute_display_rgba() -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+                    display_rgba = display_values.display_rgba
+                    return DataAndMetadata.new_data_and_metadata(Image.get_byte_view(display_rgba)) if display_rgba is not None else None
+
+                return typing.cast(typing.Optional[DataAndMetadata.DataAndMetadata], self.__get_value("display_rgba", display_values, compute_display_rgba))
         return None
 
     @property
@@ -1185,49 +1245,73 @@ class DataSource:
             return Core.function_crop_interval(xdata, self.__graphic_interval)
         return xdata
 
+    def __get_cropped_xdata(self, name: str, key: typing.Any, get_xdata: typing.Callable[[], typing.Optional[DataAndMetadata.DataAndMetadata]]) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+        # without a crop graphic, the cropped xdata is the uncropped xdata. do not keep it.
+        if self.__graphic_bounds is None and self.__graphic_interval is None:
+            return get_xdata()
+
+        def compute_cropped_xdata() -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+            xdata = get_xdata()
+            cropped_xdata = self.__cropped_xdata(xdata)
+            # the crop does not apply to all data; leave the uncropped xdata as it is.
+            return _make_read_only(cropped_xdata) if cropped_xdata is not xdata else cropped_xdata
+
+        return typing.cast(typing.Optional[DataAndMetadata.DataAndMetadata], self.__get_value(name, (key, self.__graphic_key), compute_cropped_xdata))
+
     def _crop_xdata(self, xdata: typing.Optional[DataAndMetadata.DataAndMetadata]) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
         return self.__cropped_xdata(xdata)
 
     @property
     def cropped_element_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
-        return self.__cropped_xdata(self.element_xdata)
+        return self.__get_cropped_xdata("cropped_element_xdata", self.__display_values, lambda: self.element_xdata)
 
     @property
     def cropped_display_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
-        return self.__cropped_xdata(self.display_xdata)
+        return self.__get_cropped_xdata("cropped_display_xdata", self.__display_values, lambda: self.display_xdata)
 
     @property
     def cropped_normalized_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
-        return self.__cropped_xdata(self.normalized_xdata)
+        return self.__get_cropped_xdata("cropped_normalized_xdata", self.__display_values, lambda: self.normalized_xdata)
 
     @property
     def cropped_adjusted_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
-        return self.__cropped_xdata(self.adjusted_xdata)
+        return self.__get_cropped_xdata("cropped_adjusted_xdata", self.__display_values, lambda: self.adjusted_xdata)
 
     @property
     def cropped_transformed_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
-        return self.__cropped_xdata(self.transformed_xdata)
+        return self.__get_cropped_xdata("cropped_transformed_xdata", self.__display_values, lambda: self.transformed_xdata)
 
     @property
     def cropped_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
         xdata = self.__xdata
-        return self.__cropped_xdata(xdata) if xdata else None
+        return self.__get_cropped_xdata("cropped_xdata", self.__xdata_key, lambda: xdata) if xdata else None
 
     @property
     def filtered_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
         xdata = self.__xdata
-        filter_xdata = self.filter_xdata
-        if xdata and filter_xdata:
-            if xdata.is_data_complex_type:
-                return Core.function_fourier_mask(xdata, filter_xdata)
-            else:
-                return filter_xdata * xdata
-        return xdata
+        if not xdata:
+            return xdata
+
+        def compute_filtered_xdata() -> typing.Optional[DataAndMetadata.DataAndMetadata]:
+            filter_xdata = self.filter_xdata
+            if xdata and filter_xdata:
+                if xdata.is_data_complex_type:
+                    return _make_read_only(Core.function_fourier_mask(xdata, filter_xdata))
+                else:
+                    return _make_read_only(filter_xdata * xdata)
+            return xdata
+
+        return typing.cast(typing.Optional[DataAndMetadata.DataAndMetadata], self.__get_value("filtered_xdata", (self.__xdata_key, self.__mask_key), compute_filtered_xdata))
 
     @property
     def filter_xdata(self) -> typing.Optional[DataAndMetadata.DataAndMetadata]:
         xdata = self.__xdata
         assert xdata
+        # the mask depends only on the datum shape and calibrations of the xdata and the mask graphics.
+        filter_key = (xdata.datum_dimension_shape, xdata.datum_dimensional_calibrations, self.__mask_key)
+        return typing.cast(typing.Optional[DataAndMetadata.DataAndMetadata], self.__get_value("filter_xdata", filter_key, lambda: _make_read_only(self.__make_filter_xdata(xdata))))
+
+    def __make_filter_xdata(self, xdata: DataAndMetadata.DataAndMetadata) -> DataAndMetadata.DataAndMetadata:
         shape = xdata.datum_dimension_shape
         assert shape is not None
         datum_calibrations = xdata.datum_dimensional_calibrations
@@ -1360,12 +1444,14 @@ class BoundDisplayDataChannelBase(BoundItemBase):
         self.__item_reference = container.create_item_reference(item_specifier=Persistence.read_persistent_specifier(specifier.reference_uuid if specifier else None))
         self.__graphic_reference = container.create_item_reference(item_specifier=Persistence.read_persistent_specifier(secondary_specifier.reference_uuid if secondary_specifier else None))
         self.__display_values_subscription: typing.Optional[DisplayItem.DisplayValuesSubscription] = None
+        self.__data_source_cache = DataSourceCache()
 
         def handle_display_values(display_values: typing.Optional[DisplayItem.DisplayValues]) -> None:
             self.data_event.fire(BoundDataEventType.DISPLAY_DATA)
 
         def maintain_data_source() -> None:
             self.__display_values_subscription = None
+            self.__data_source_cache.clear()
             display_data_channel = self._display_data_channel
             if display_data_channel:
                 self.__display_values_subscription = display_data_channel.subscribe_to_latest_display_values(handle_display_values)
@@ -1388,6 +1474,7 @@ class BoundDisplayDataChannelBase(BoundItemBase):
 
     def close(self) -> None:
         self.__display_values_subscription = None
+        self.__data_source_cache.clear()
         self.__item_reference.on_item_registered = None
         self.__item_reference.on_item_unregistered = None
         self.__graphic_reference.on_item_registered = None
@@ -1422,7 +1509,7 @@ class BoundDisplayDataChannelBase(BoundItemBase):
         display_data_channel = self._display_data_channel
         if display_data_channel and display_data_channel.data_item:
             graphic = self._graphic
-            return DataSource(None, display_data_channel, graphic)
+            return DataSource(None, display_data_channel, graphic, self.__data_source_cache)
         return None
 
 
@@ -1452,6 +1539,7 @@ class BoundDataSource(BoundItemBase):
         self.__graphic_property_changed_listeners = list[Event.EventListener | None]()
         self.__graphic_inserted_event_listener: Event.EventListener | None = None
         self.__graphic_removed_event_listener: Event.EventListener | None = None
+        self.__data_source_cache = DataSourceCache()
 
         def item_registered(item: Persistence.PersistentObject) -> None:
             self.__maintain()
@@ -1478,6 +1566,7 @@ class BoundDataSource(BoundItemBase):
         self.__graphic_property_changed_listeners.clear()
         self.__graphic_inserted_event_listener = None
         self.__graphic_removed_event_listener = None
+        self.__data_source_cache.clear()
         super().close()
 
     @property
@@ -1485,10 +1574,11 @@ class BoundDataSource(BoundItemBase):
         display_data_channel = self._display_data_channel
         if display_data_channel and display_data_channel.data_item:
             graphic = self._graphic
-            return DataSource(None, display_data_channel, graphic)
+            return DataSource(None, display_data_channel, graphic, self.__data_source_cache)
         return None
 
     def __maintain(self) -> None:
+        self.__data_source_cache.clear()
         display_data_channel = self._display_data_channel
         data_item = display_data_channel.data_item if display_data_channel else None
         if display_data_channel and data_item:
@@ -1641,12 +1731,14 @@ class BoundFilterLikeData(BoundItemBase):
         self.__display_values_subscription: typing.Optional[DisplayItem.DisplayValuesSubscription] = None
         self.__display_item_item_inserted_event_listener: typing.Optional[Event.EventListener] = None
         self.__display_item_item_removed_event_listener: typing.Optional[Event.EventListener] = None
+        self.__data_source_cache = DataSourceCache()
 
         def handle_display_values(display_values: typing.Optional[DisplayItem.DisplayValues]) -> None:
             self.data_event.fire(BoundDataEventType.DISPLAY_DATA)
 
         def maintain_data_source() -> None:
             self.__display_values_subscription = None
+            self.__data_source_cache.clear()
             if self.__display_item_item_inserted_event_listener:
                 self.__display_item_item_inserted_event_listener.close()
                 self.__display_item_item_inserted_event_listener = None
@@ -1680,6 +1772,7 @@ class BoundFilterLikeData(BoundItemBase):
 
     def close(self) -> None:
         self.__display_values_subscription = None
+        self.__data_source_cache.clear()
         if self.__display_item_item_inserted_event_listener:
             self.__display_item_item_inserted_event_listener.close()
             self.__display_item_item_inserted_event_listener = None
@@ -1721,7 +1814,7 @@ class BoundFilterLikeData(BoundItemBase):
     def computation_value(self) -> typing.Optional[DataSource]:
         display_data_channel = self._display_data_channel
         if display_data_channel and display_data_channel.data_item:
-            return DataSource(None, display_data_channel, None)
+            return DataSource(None, display_data_channel, None, self.__data_source_cache)
         return None
 
 
@@ -2181,7 +2274,7 @@ class Computation(Persistence.PersistentObject):
             if title := processor.title:
                 return title
         processing_id = self.processing_id
-        compute_class = _computation_types.get(processing_id) if processing_id else None
+        compute_class = get_computation_type(processing_id)
         if compute_class:
             label = typing.cast(str | None, getattr(compute_class, "label", None))
             if label:
@@ -2202,7 +2295,7 @@ class Computation(Persistence.PersistentObject):
         processing_id = self.processing_id
         if self.__processor and attribute in self.__processor.attributes:
             return self.__processor.attributes.get(attribute)
-        compute_class = _computation_types.get(processing_id) if processing_id else None
+        compute_class = get_computation_type(processing_id)
         if compute_class:
             return getattr(compute_class, "attributes", dict()).get(attribute, default)
         return default
@@ -2503,18 +2596,11 @@ class Computation(Persistence.PersistentObject):
     @classmethod
     def parse_names(cls, expression: str) -> typing.Set[str]:
         """Return the list of identifiers used in the expression."""
-        names: typing.Set[str] = set()
+        # use the compiled expression cache so the expression is parsed once for this and for execution.
         try:
-            ast_node = ast.parse(expression, "ast")
-
-            class Visitor(ast.NodeVisitor):
-                def visit_Name(self, node: typing.Any) -> None:
-                    names.add(node.id)
-
-            Visitor().visit(ast_node)
+            return set(get_compiled_expression(expression).names)
         except Exception:
-            pass
-        return names
+            return set()
 
     def __resolve_inputs(self, api: typing.Any) -> typing.Tuple[typing.Dict[str, typing.Any], bool]:
         kwargs: typing.Dict[str, typing.Any] = dict()
@@ -3241,6 +3327,57 @@ class ComputationExecutor:
         return None
 
 
+class CompiledExpression:
+    """The parsed and compiled form of a script expression. Raises SyntaxError if the expression cannot be parsed."""
+
+    def __init__(self, expression: str) -> None:
+        self.ast_node = ast.parse(expression, "expr")
+        self.code = compile(self.ast_node, "expr", "exec")
+        self.names = frozenset(node.id for node in ast.walk(self.ast_node) if isinstance(node, ast.Name))
+
+
+class CompiledExpressionCache:
+    """A bounded, least-recently-used cache of compiled expressions, keyed by the expression source.
+
+    Expressions that fail to compile are not cached, so each use raises the same SyntaxError.
+    """
+
+    def __init__(self, max_count: int = 64) -> None:
+        self.max_count = max_count
+        self.__entries: collections.OrderedDict[str, CompiledExpression] = collections.OrderedDict()
+        self.__lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
+
+    def get(self, expression: str) -> CompiledExpression:
+        with self.__lock:
+            compiled_expression = self.__entries.get(expression)
+            if compiled_expression:
+                # move to the end, which is the most recently used.
+                self.__entries.move_to_end(expression)
+                return compiled_expression
+        compiled_expression = CompiledExpression(expression)
+        with self.__lock:
+            self.__entries[expression] = compiled_expression
+            while len(self.__entries) > max(self.max_count, 0):
+                self.__entries.popitem(last=False)
+        return compiled_expression
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+_compiled_expression_cache = CompiledExpressionCache()
+
+
+def get_compiled_expression(expression: str) -> CompiledExpression:
+    """Return the compiled expression from the shared cache, compiling it if needed."""
+    return _compiled_expression_cache.get(expression)
+
+
 class ScriptExpressionComputationExecutor(ComputationExecutor):
 
     class DataItemTarget:
@@ -3290,16 +3427,12 @@ class ScriptExpressionComputationExecutor(ComputationExecutor):
     def _execute(self, context: ComputationExecutorContext) -> None:
         assert self.__data_item_target is not None
         if self.__expression:
-            code_lines = []
             g = dict(context.parameters.parameter_map)
             g["api"] = self.__api
             g["target"] = self.__data_item_target
             l: typing.Dict[str, typing.Any] = dict()
-            expression_lines = self.__expression.split("\n")
-            code_lines.extend(expression_lines)
-            code = "\n".join(code_lines)
-            compiled = compile(code, "expr", "exec")
-            exec(compiled, g, l)
+            # the expression is compiled once and reused, since live computations may run it for every frame.
+            exec(get_compiled_expression(self.__expression).code, g, l)
 
     def _commit(self) -> None:
         # commit the result item clones back into the document. this method is guaranteed to run at
@@ -3318,6 +3451,8 @@ class ScriptExpressionComputationExecutor(ComputationExecutor):
                         metadata["computation"] = computation_d
                     if source_metadata_d := computation.get_source_metadata():
                         metadata["source_metadata"] = source_metadata_d
+                    # the xdata is a snapshot shared with other readers; set the metadata on a copy sharing the data.
+                    target_xdata = target_xdata.clone_with_data(target_xdata.data)
                     target_xdata._set_metadata(metadata)
                 self.__data_item.set_xdata(target_xdata)
         if self.__data_item_created:
@@ -3608,7 +3743,7 @@ class RegisteredComputationExecutor(ComputationExecutor):
         processing_id = computation.processing_id
         api_computation = api._new_api_object(computation)
         api_computation.api = api
-        compute_class = _computation_types.get(processing_id) if processing_id else None
+        compute_class = get_computation_type(processing_id)
         self.__computation_handler = compute_class(api_computation) if compute_class else None
         if not self.__computation_handler:
             self.error_text = "Missing computation (" + (processing_id or "unknown") + ")."
@@ -3681,6 +3816,16 @@ def register_computation_type(computation_type_id: str, compute_class: typing.Ca
     _computation_types[computation_type_id] = compute_class
 
 
+def get_computation_type(computation_type_id: typing.Optional[str]) -> typing.Optional[typing.Callable[[_APIComputation], ComputationHandlerLike | ComputationTaskHandler]]:
+    """Return the registered computation task handler, loading the lazy plug-in declaring it if needed."""
+    if not computation_type_id:
+        return None
+    compute_class = _computation_types.get(computation_type_id)
+    if not compute_class and PlugInManager.load_lazy_plug_in("computation_types", computation_type_id):
+        compute_class = _computation_types.get(computation_type_id)
+    return compute_class
+
+
 # for testing
 
 def xdata_expression(expression: str) -> str:
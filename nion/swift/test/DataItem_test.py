@@ -1162,6 +1162,23 @@ class TestDataItemClass(unittest.TestCase):
             # data_item.set_data(numpy.zeros((2, 2)))
             self.assertGreater(data_item.modified, modified)
 
+    def test_data_changed_slices_are_available_during_data_changed_notification(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.ones((4, 4), numpy.double))
+            document_model.append_data_item(data_item)
+            data_changed_slices_list = list()
+
+            def data_changed() -> None:
+                data_changed_slices_list.append(data_item.data_changed_slices)
+
+            with contextlib.closing(data_item.data_changed_event.listen(data_changed)):
+                with data_item.data_source_changes():
+                    data_item.set_data_and_metadata_partial(data_item.xdata.data_metadata, data_item.xdata, [slice(0, 1), slice(0, 4)], [slice(0, 1), slice(0, 4)])
+                    data_item.set_data_and_metadata_partial(data_item.xdata.data_metadata, data_item.xdata, [slice(2, 3), slice(0, 4)], [slice(2, 3), slice(0, 4)])
+                data_item.set_data(numpy.zeros((4, 4)))
+            self.assertEqual([[(slice(0, 1), slice(0, 4)), (slice(2, 3), slice(0, 4))], None], data_changed_slices_list)
+
     def test_changing_data_updates_xdata_timestamp(self):
         with TestContext.create_memory_context() as test_context:
             document_model = test_context.create_document_model()
@@ -1641,6 +1658,31 @@ class TestDataItemClass(unittest.TestCase):
             document_model.perform_data_item_updates()
             self.assertEqual(data_item.xdata.timestamp, datetime.datetime(2000, 1, 1))
 
+    def test_xdata_snapshot_is_shared_until_data_or_metadata_changes(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.zeros((4, 4), float))
+            document_model.append_data_item(data_item)
+            with data_item.data_ref():
+                xdata = data_item.xdata
+                self.assertIs(xdata, data_item.xdata)
+                data_item.set_intensity_calibration(Calibration.Calibration(units="e"))
+                self.assertIsNot(xdata, data_item.xdata)
+                self.assertEqual("e", data_item.xdata.intensity_calibration.units)
+                xdata = data_item.xdata
+                data_item.metadata = {"a": 1}
+                self.assertIsNot(xdata, data_item.xdata)
+                self.assertEqual({"a": 1}, data_item.xdata.metadata)
+                xdata = data_item.xdata
+                data_and_metadata = DataAndMetadata.new_data_and_metadata(numpy.ones((2, 4), float))
+                data_item.set_data_and_metadata_partial(data_item.xdata.data_metadata, data_and_metadata, [slice(0, 2), slice(None)], [slice(0, 2), slice(None)])
+                self.assertIsNot(xdata, data_item.xdata)
+                self.assertEqual(8, numpy.sum(data_item.xdata.data))
+                xdata = data_item.xdata
+                data_item.set_data(numpy.ones((2, 2), float))
+                self.assertIsNot(xdata, data_item.xdata)
+                self.assertEqual((2, 2), data_item.xdata.data_shape)
+
     # modify property/item/relationship on data source, display, region, etc.
     # copy or snapshot
 
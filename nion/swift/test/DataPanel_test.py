@@ -16,6 +16,7 @@ from nion.swift import Facade
 from nion.swift import HistogramPanel
 from nion.swift import MimeTypes
 from nion.swift import ProjectPanel
+from nion.swift import Thumbnails
 from nion.swift.model import DataGroup
 from nion.swift.model import DataItem
 from nion.swift.test import TestContext
@@ -642,6 +643,23 @@ class TestDataPanelClass(unittest.TestCase):
             self.assertEqual(data_panel._scroll_area_canvas_item.content_origin, Geometry.IntPoint(-80, 0))
             self.assertEqual(data_panel._scroll_area_canvas_item.content_size, Geometry.IntSize(800, 304))
 
+    def test_data_panel_reports_visible_display_items_for_thumbnails(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            for _ in range(10):
+                document_model.append_data_item(DataItem.DataItem(numpy.zeros((8, 8), numpy.uint32)))
+            document_controller.periodic()
+            data_panel = document_controller.find_dock_panel("data-panel")
+            # list items are 80 high; 160 pixels shows two items.
+            data_panel._data_list_canvas_item.layout_immediate(Geometry.IntSize(width=320, height=160))
+            display_items = document_controller.filtered_display_items_model.display_items
+            self.assertEqual(list(display_items[0:2]), list(data_panel._visible_display_items))
+            self.assertEqual(2, Thumbnails.ThumbnailManager().scheduler_metrics.visible_count)
+            data_panel._scroll_area_canvas_item.update_content_origin(Geometry.IntPoint(y=-400, x=0))
+            self.assertEqual(list(display_items[5:7]), list(data_panel._visible_display_items))
+            self.assertEqual(2, Thumbnails.ThumbnailManager().scheduler_metrics.visible_count)
+
     def test_data_panel_grid_contents_resize_properly(self):
         with TestContext.create_memory_context() as test_context:
             document_controller = test_context.create_document_controller()
@@ -172,6 +172,164 @@ class TestDisplayClass(unittest.TestCase):
             self.assertEqual(display_data_channel.get_latest_computed_display_values().display_range, (1, 1))
             self.assertEqual(display_data_channel.get_latest_computed_display_values().data_range, (1, 1))
 
+    def test_display_values_for_previously_viewed_sequence_index_are_reused(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data = numpy.zeros((3, 8, 8))
+            data[1, ...] = 1
+            data[2, ...] = 2
+            xdata = DataAndMetadata.new_data_and_metadata(data, data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2))
+            data_item = DataItem.new_data_item(xdata)
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_data_channel = display_item.display_data_channels[0]
+            display_values0 = display_data_channel.get_latest_display_values()
+            display_data_channel.sequence_index = 1
+            self.assertEqual(display_data_channel.get_latest_computed_display_values().data_range, (1, 1))
+            display_data_channel.sequence_index = 0
+            self.assertEqual(display_values0, display_data_channel.get_latest_display_values())
+            self.assertEqual(display_data_channel.get_latest_computed_display_values().data_range, (0, 0))
+            # changing a display property does not reuse the display values
+            display_data_channel.display_limits = (0, 2)
+            self.assertNotEqual(display_values0, display_data_channel.get_latest_display_values())
+            # changing the data invalidates the cache
+            display_values0 = display_data_channel.get_latest_display_values()
+            data_item.set_xdata(DataAndMetadata.new_data_and_metadata(data + 1, data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2)))
+            display_data_channel.sequence_index = 1
+            display_data_channel.sequence_index = 0
+            self.assertNotEqual(display_values0, display_data_channel.get_latest_display_values())
+            self.assertEqual(display_data_channel.get_latest_computed_display_values().data_range, (1, 1))
+
+    def test_display_values_for_adjacent_sequence_indexes_are_prefetched(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data = numpy.zeros((4, 8, 8))
+            for i in range(data.shape[0]):
+                data[i, ...] = i
+            xdata = DataAndMetadata.new_data_and_metadata(data, data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2))
+            data_item = DataItem.new_data_item(xdata)
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_data_channel = display_item.display_data_channels[0]
+            subscription = display_data_channel.subscribe_to_latest_computed_display_values(lambda x: None)
+            display_data_channel.sequence_index = 1
+            # the display values for the current index and both adjacent indexes are in the cache
+            self.assertEqual(3, display_data_channel._get_display_values_cache_size())
+            display_data_channel.sequence_index = 2
+            display_values = display_data_channel.get_latest_display_values()
+            self.assertIsNotNone(display_values.display_rgba)
+            self.assertEqual(display_values.data_range, (2, 2))
+            subscription = None
+
+    def test_display_values_are_not_prefetched_for_live_data_or_collection_independent_display(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            xdata = DataAndMetadata.new_data_and_metadata(numpy.zeros((4, 8, 8)), data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2))
+            live_data_item = DataItem.new_data_item(xdata)
+            document_model.append_data_item(live_data_item)
+            live_data_item._enter_live_state()
+            # a 2d collection of 1d data displays a slice sum, which does not depend on the collection index.
+            xdata = DataAndMetadata.new_data_and_metadata(numpy.zeros((4, 4, 16)), data_descriptor=DataAndMetadata.DataDescriptor(False, 2, 1))
+            collection_data_item = DataItem.new_data_item(xdata)
+            document_model.append_data_item(collection_data_item)
+            try:
+                for data_item, index_name in ((live_data_item, "sequence_index"), (collection_data_item, "collection_index")):
+                    display_item = document_model.get_display_item_for_data_item(data_item)
+                    display_data_channel = display_item.display_data_channels[0]
+                    subscription = display_data_channel.subscribe_to_latest_computed_display_values(lambda x: None)
+                    cache_size = display_data_channel._get_display_values_cache_size()
+                    setattr(display_data_channel, index_name, 1 if index_name == "sequence_index" else (1, 1))
+                    # only the display values for the new index are added to the cache.
+                    self.assertEqual(cache_size + 1, display_data_channel._get_display_values_cache_size())
+                    subscription = None
+            finally:
+                live_data_item._exit_live_state()
+
+    def test_display_values_cache_membership_does_not_change_recency(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.zeros((8, 8)))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_values = display_item.display_data_channels[0].get_latest_display_values()
+            cache = DisplayItem.DisplayValuesCache(2)
+            cache.put(0, display_values)
+            cache.put(1, display_values)
+            self.assertIn(0, cache)
+            cache.put(2, display_values)
+            self.assertNotIn(0, cache)
+            self.assertIn(1, cache)
+
+    def test_display_values_cache_is_bounded_by_bytes(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            xdata = DataAndMetadata.new_data_and_metadata(numpy.random.randn(3, 64, 64), data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2))
+            data_item = DataItem.new_data_item(xdata)
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_data_channel = display_item.display_data_channels[0]
+            display_values_list = list()
+            for i in range(3):
+                display_data_channel.sequence_index = i
+                display_values = display_data_channel.get_latest_display_values()
+                self.assertIsNotNone(display_values.display_rgba)
+                display_values_list.append(display_values)
+            nbytes = sum(array.nbytes for array in display_values_list[0].get_computed_arrays())
+            self.assertGreater(nbytes, 0)
+            # the oldest entries are removed until the computed arrays fit.
+            cache = DisplayItem.DisplayValuesCache(16, 2 * nbytes)
+            for i, display_values in enumerate(display_values_list):
+                cache.put(i, display_values)
+            self.assertEqual(2, len(cache))
+            self.assertIsNone(cache.get(0))
+            self.assertIs(display_values_list[2], cache.get(2))
+            # the most recent entry is kept even if it does not fit.
+            cache = DisplayItem.DisplayValuesCache(16, 0)
+            for i, display_values in enumerate(display_values_list):
+                cache.put(i, display_values)
+            self.assertEqual(1, len(cache))
+
+    def test_partial_data_updates_give_same_display_values_as_full_updates(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data = numpy.random.randn(64, 16)
+            data_item = DataItem.DataItem(numpy.copy(data))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_data_channel = display_item.display_data_channels[0]
+            for display_limits in (None, (-1.0, 1.0)):
+                display_data_channel.display_limits = display_limits
+                display_data_channel.get_latest_display_values().display_rgba
+                # writing a strip containing the old maximum narrows the data range
+                for strip_data in (numpy.full((8, 16), 100.0), numpy.zeros((8, 16)), numpy.full((8, 16), -100.0)):
+                    data[8:16] = strip_data
+                    strip_xdata = DataAndMetadata.new_data_and_metadata(strip_data)
+                    data_item.set_data_and_metadata_partial(data_item.data_metadata, strip_xdata, [slice(0, 8), slice(0, 16)], [slice(8, 16), slice(0, 16)])
+                    display_values = display_data_channel.get_latest_display_values()
+                    expected_display_values = DisplayItem.DisplayValues(DataAndMetadata.new_data_and_metadata(data), 0, None, 0, 1, display_limits, None, display_values.color_map_data, 0.0, 1.0, list())
+                    self.assertEqual(expected_display_values.data_range, display_values.data_range)
+                    self.assertTrue(numpy.array_equal(expected_display_values.display_rgba, display_values.display_rgba))
+
+    def test_partial_data_updates_with_equalized_adjustment_give_same_display_values_as_full_updates(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data = numpy.random.rand(64, 16)
+            data_item = DataItem.DataItem(numpy.copy(data))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_data_channel = display_item.display_data_channels[0]
+            display_data_channel.display_limits = (0.0, 1.0)
+            display_data_channel.adjustments = [{"type": "equalized"}]
+            display_data_channel.get_latest_display_values().display_rgba
+            # equalization depends on the whole image, so changing some rows changes the colors of all rows.
+            strip_data = numpy.full((32, 16), 0.99)
+            data[0:32] = strip_data
+            strip_xdata = DataAndMetadata.new_data_and_metadata(strip_data)
+            data_item.set_data_and_metadata_partial(data_item.data_metadata, strip_xdata, [slice(0, 32), slice(0, 16)], [slice(0, 32), slice(0, 16)])
+            display_values = display_data_channel.get_latest_display_values()
+            expected_display_values = DisplayItem.DisplayValues(DataAndMetadata.new_data_and_metadata(data), 0, None, 0, 1, (0.0, 1.0), None, display_values.color_map_data, 0.0, 1.0, [{"type": "equalized"}])
+            self.assertTrue(numpy.array_equal(expected_display_values.display_rgba, display_values.display_rgba))
+
     def test_changing_data_notifies_data_and_display_range_change(self):
         with TestContext.create_memory_context() as test_context:
             document_model = test_context.create_document_model()
@@ -485,6 +643,27 @@ class TestDisplayClass(unittest.TestCase):
                     display_rgba = display_data_channel.get_latest_computed_display_values().display_rgba
                     self.assertTrue(display_rgba.dtype == numpy.uint32)
 
+    def test_tiled_display_values_match_untiled_display_values(self):
+        data_and_metadata = DataAndMetadata.new_data_and_metadata(numpy.random.randn(100, 20).astype(numpy.float32))
+        color_map_data = DisplayItem.ColorMaps.get_color_map_data_by_id("grayscale")
+        tiled_executor = DisplayItem._tiled_executor
+        strip_rows, max_workers = tiled_executor.strip_rows, tiled_executor.max_workers
+        try:
+            for adjustments in ([], [{"type": "gamma", "gamma": 0.5}], [{"type": "log"}], [{"type": "equalized"}]):
+                results = list()
+                for tiled_executor.strip_rows, tiled_executor.max_workers in ((100, 1), (16, 3)):
+                    display_values = DisplayItem.DisplayValues(data_and_metadata, 0, None, 0, 1, None, None, color_map_data, 0.1, 1.5, adjustments)
+                    results.append((display_values.normalized_data_and_metadata.data,
+                                    display_values.adjusted_data_and_metadata.data,
+                                    display_values.transformed_data_and_metadata.data,
+                                    display_values.display_rgba))
+                for untiled, tiled in zip(*results):
+                    self.assertEqual(untiled.shape, tiled.shape)
+                    self.assertEqual(untiled.dtype, tiled.dtype)
+                    self.assertTrue(numpy.array_equal(untiled, tiled))
+        finally:
+            tiled_executor.strip_rows, tiled_executor.max_workers = strip_rows, max_workers
+
     def test_reset_display_limits_on_various_value_types_write_to_clean_json(self):
         with TestContext.create_memory_context() as test_context:
             document_model = test_context.create_document_model()
@@ -2519,6 +2519,52 @@ class TestDocumentModelClass(unittest.TestCase):
             # trigger the connection
             display_item.display_data_channel.collection_index = (1, 0)
 
+    def test_data_memory_manager_unloads_least_recently_used_released_data_over_budget(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_memory_manager = document_model.data_memory_manager
+            data_memory_manager.budget = 2 * 8 * 8 * 8
+            data_items = [DataItem.DataItem(numpy.full((8, 8), i, numpy.float64)) for i in range(3)]
+            for data_item in data_items:
+                document_model.append_data_item(data_item, False)
+            # released data within the budget is retained; the least recently used is unloaded over the budget.
+            for data_item in data_items:
+                self.assertIsNotNone(data_item.xdata)
+            self.assertFalse(data_items[0].is_data_loaded)
+            self.assertTrue(data_items[1].is_data_loaded)
+            self.assertTrue(data_items[2].is_data_loaded)
+            self.assertLessEqual(data_memory_manager.total_bytes, data_memory_manager.budget)
+            # referenced data is never unloaded, even over budget.
+            with data_items[0].data_ref() as data_ref:
+                data_memory_manager.budget = 0
+                self.assertTrue(data_items[0].is_data_loaded)
+                self.assertFalse(data_items[1].is_data_loaded)
+                self.assertFalse(data_items[2].is_data_loaded)
+                self.assertEqual(0, data_memory_manager.released_bytes)
+                self.assertEqual(8 * 8 * 8, data_memory_manager.total_bytes)
+            self.assertFalse(data_items[0].is_data_loaded)
+            self.assertEqual(0, data_memory_manager.total_bytes)
+            # unloaded data reloads from storage.
+            for i, data_item in enumerate(data_items):
+                self.assertTrue(numpy.array_equal(numpy.full((8, 8), i, numpy.float64), data_item.data))
+
+    def test_data_memory_report_separates_data_items_computation_outputs_and_display_values(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            document_model.data_memory_manager.budget = 1024 * 1024
+            data_item = DataItem.DataItem(numpy.zeros((8, 8), numpy.float32))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            inverted_data_item = document_model.get_invert_new(display_item, display_item.data_item)
+            document_model.recompute_all()
+            display_item.display_data_channels[0].get_latest_display_values().display_rgba
+            report = document_model.get_data_memory_report()
+            self.assertEqual(1024 * 1024, report.budget)
+            self.assertEqual({data_item: 8 * 8 * 4}, dict(report.data_item_bytes))
+            self.assertEqual({inverted_data_item: 8 * 8 * 4}, dict(report.computation_output_bytes))
+            self.assertLess(0, report.display_values_bytes[display_item])
+            self.assertEqual(sum(report.data_item_bytes.values()) + sum(report.computation_output_bytes.values()) + sum(report.display_values_bytes.values()), report.total_bytes)
+
     # solve problem of where to create new elements (same library), generally shouldn't create data items for now?
     # way to configure display for new data items?
     # splitting complex and reconstructing complex does so efficiently (i.e. one recompute for each change at each step)
@@ -12,6 +12,7 @@ from nion.swift import FilterPanel
 from nion.swift.model import DataItem
 from nion.swift.test import TestContext
 from nion.ui import TestUI
+from nion.utils import ListModel
 
 
 class TestFilterPanelClass(unittest.TestCase):
@@ -55,6 +56,50 @@ class TestFilterPanelClass(unittest.TestCase):
         self.assertEqual(self.t.count, 6)
         self.assertEqual(self.t.children[0].key, "1969")
 
+    def test_insert_values_matches_inserting_values_individually(self):
+        t = FilterPanel.TreeNode()
+        t.insert_values(["2000", "06"], ["Julian", "Tristan", "Skywalker"])
+        t.insert_values(["1969", "02"], ["Chris"])
+        t.insert_values(["2000", "03"], ["Holden"])
+        t.insert_values(["1965", "12"], ["Hans"])
+        t.insert_values(["1970", "02"], ["Lara"])
+        self.assertEqual(repr(self.t), repr(t))
+        self.assertEqual(["Julian", "Tristan", "Skywalker"], t.children[3].children[1].values)
+        t.remove_value(None, "Tristan")
+        self.assertEqual(["Julian", "Skywalker"], t.children[3].children[1].values)
+
+    def test_date_tree_applies_insertions_and_removals_in_batches(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            filter_controller = document_controller.filter_controller
+            data_items = list()
+            for i in range(3):
+                data_item = DataItem.DataItem(numpy.zeros((2, 2)))
+                document_model.append_data_item(data_item)
+                data_items.append(data_item)
+            # the tree is updated when the nodes are updated (periodically).
+            root = filter_controller.item_model_controller.root
+            self.assertEqual(0, len(root.children))
+            filter_controller.update_all_nodes()
+            self.assertEqual(1, len(root.children))
+            day_item = root.children[0].children[0].children[0]
+            self.assertTrue(day_item.data["display"].endswith("(3)"))
+            # an item inserted and removed before the update never reaches the tree.
+            data_item = DataItem.DataItem(numpy.zeros((2, 2)))
+            document_model.append_data_item(data_item)
+            document_model.remove_data_item(data_item)
+            document_model.remove_data_item(data_items[1])
+            filter_controller.update_all_nodes()
+            self.assertEqual(1, len(root.children))
+            self.assertTrue(root.children[0].data["display"].endswith("(2)"))
+            self.assertTrue(day_item.data["display"].endswith("(2)"))
+            # removing all items removes the nodes.
+            document_model.remove_data_item(data_items[0])
+            document_model.remove_data_item(data_items[2])
+            filter_controller.update_all_nodes()
+            self.assertEqual(0, len(root.children))
+
     def test_setting_text_filter_updates_filter_display_items(self):
         with TestContext.create_memory_context() as test_context:
             document_controller = test_context.create_document_controller()
@@ -71,6 +116,53 @@ class TestFilterPanelClass(unittest.TestCase):
             self.assertEqual(data_item1, display_items[0].data_item)
 
 
+    def test_text_filter_updates_when_display_item_title_changes(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            data_item1 = DataItem.DataItem(numpy.random.randn(4, 4))
+            data_item1.title = "abc one"
+            document_model.append_data_item(data_item1)
+            data_item2 = DataItem.DataItem(numpy.random.randn(4, 4))
+            data_item2.title = "def two"
+            document_model.append_data_item(data_item2)
+            document_controller.filter_controller.text_filter_changed("ab")
+            self.assertEqual([data_item1], [display_item.data_item for display_item in document_controller.filtered_display_items_model.items])
+            document_controller.filter_controller.text_filter_changed("abc ON")
+            self.assertEqual([data_item1], [display_item.data_item for display_item in document_controller.filtered_display_items_model.items])
+            document_controller.filter_controller.text_filter_changed("c o")
+            self.assertEqual([data_item1], [display_item.data_item for display_item in document_controller.filtered_display_items_model.items])
+            # changing the title of an item updates the index.
+            data_item2.title = "abc two"
+            document_controller.filter_controller.text_filter_changed("abc")
+            self.assertEqual({data_item1, data_item2}, {display_item.data_item for display_item in document_controller.filtered_display_items_model.items})
+            document_controller.filter_controller.text_filter_changed("abc t")
+            self.assertEqual([data_item2], [display_item.data_item for display_item in document_controller.filtered_display_items_model.items])
+            # removing an item removes it from the index.
+            document_model.remove_data_item(data_item2)
+            document_controller.filter_controller.text_filter_changed("abc")
+            self.assertEqual([data_item1], [display_item.data_item for display_item in document_controller.filtered_display_items_model.items])
+
+    def test_display_item_text_index_matches_text_filter(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            titles = ["Spectrum Image", "spectrum", "HAADF image", "Ronchigram", "EELS Spectrum 2"]
+            for title in titles:
+                data_item = DataItem.DataItem(numpy.zeros((2, 2)))
+                data_item.title = title
+                document_model.append_data_item(data_item)
+            text_index = FilterPanel.DisplayItemTextIndex()
+            try:
+                for display_item in document_model.display_items:
+                    text_index.add_display_item(display_item)
+                for text in ["spec", "SPECTRUM", "e i", "image", "m 2", "gram", "x", "", "2x2"]:
+                    with self.subTest(text=text):
+                        text_filter = ListModel.TextFilter("text_for_filter", text)
+                        expected = {display_item for display_item in document_model.display_items if text_filter.matches(display_item)}
+                        self.assertEqual(expected, text_index.query(text))
+            finally:
+                text_index.close()
+
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.DEBUG)
     unittest.main()
@@ -3,10 +3,13 @@ import datetime
 import os
 import pathlib
 import shutil
+import time
 import unittest
+import unittest.mock
 import uuid
 
 # third party libraries
+import h5py
 import numpy
 
 # local libraries
@@ -49,6 +52,20 @@ class TestHDF5Handler(unittest.TestCase):
                 else:
                     self.assertSequenceEqual(chunk_shape, expected_chunk_shape)
 
+    def test_get_write_chunk_shape_for_data_follows_access_pattern(self):
+        # 4d collection: whole datums in a near square tile of collection positions.
+        chunk_shape = HDF5Handler.get_write_chunk_shape_for_data((512, 512, 130, 130), 'float32', DataAndMetadata.DataDescriptor(False, 2, 2))
+        self.assertSequenceEqual((2, 4, 130, 130), chunk_shape)
+        # sequence of collections: single sequence index.
+        chunk_shape = HDF5Handler.get_write_chunk_shape_for_data((4, 256, 256, 512), 'float32', DataAndMetadata.DataDescriptor(True, 2, 1))
+        self.assertSequenceEqual((1, 16, 16, 512), chunk_shape)
+        # sequence of frames: whole frames.
+        chunk_shape = HDF5Handler.get_write_chunk_shape_for_data((10000, 64, 64), 'float32', DataAndMetadata.DataDescriptor(True, 0, 2))
+        self.assertSequenceEqual((36, 64, 64), chunk_shape)
+        # small data is chunked only when compressed.
+        self.assertIsNone(HDF5Handler.get_write_chunk_shape_for_data((6, 8, 8), 'float32', DataAndMetadata.DataDescriptor(True, 0, 2)))
+        self.assertSequenceEqual((6, 8, 8), HDF5Handler.get_write_chunk_shape_for_data((6, 8, 8), 'float32', DataAndMetadata.DataDescriptor(True, 0, 2), is_compressed=True))
+
     def test_hdf5_handler_basic_functionality(self):
         now = datetime.datetime.now()
         current_working_directory = pathlib.Path.cwd()
@@ -92,3 +109,186 @@ class TestHDF5Handler(unittest.TestCase):
         finally:
             #logging.debug("rmtree %s", data_dir)
             shutil.rmtree(data_dir)
+
+    def test_hdf5_handler_copies_data_from_another_file_in_blocks(self):
+        now = datetime.datetime.now()
+        current_working_directory = pathlib.Path.cwd()
+        data_dir = current_working_directory / "__Test"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        Cache.db_make_directory_if_needed(data_dir)
+        old_block_size = HDF5Handler._g_block_size
+        HDF5Handler._g_block_size = 3 * 16 * 4
+        try:
+            data = numpy.random.randn(10, 16).astype(numpy.float32)
+            h1 = HDF5Handler.HDF5Handler(os.path.join(data_dir, "abc.h5"))
+            with contextlib.closing(h1):
+                h1.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 1), now)
+                h2 = HDF5Handler.HDF5Handler(os.path.join(data_dir, "def.h5"))
+                with contextlib.closing(h2):
+                    source = h1.read_data()
+                    self.assertNotIsInstance(source, numpy.ndarray)
+                    h2.write_data(source, DataAndMetadata.DataDescriptor(True, 0, 1), now)
+                    self.assertTrue(numpy.array_equal(h2.read_data()[:], data))
+            block_slices = list(HDF5Handler.get_block_slices(data.shape, data.dtype))
+            self.assertEqual([(slice(0, 3),), (slice(3, 6),), (slice(6, 9),), (slice(9, 10),)], block_slices)
+        finally:
+            HDF5Handler._g_block_size = old_block_size
+            shutil.rmtree(data_dir)
+
+    def test_hdf5_handler_resizes_along_leading_axis_and_replaces_dataset_otherwise(self):
+        now = datetime.datetime.now()
+        current_working_directory = pathlib.Path.cwd()
+        data_dir = current_working_directory / "__Test"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        Cache.db_make_directory_if_needed(data_dir)
+        try:
+            file_path = os.path.join(data_dir, "abc.h5")
+            h = HDF5Handler.HDF5Handler(file_path)
+            with contextlib.closing(h):
+                p = {"abc": 1}
+                h.write_properties(p, now)
+                data = numpy.random.randn(3, 8, 8).astype(numpy.float32)
+                h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                dataset = h.read_data()
+                self.assertEqual((None, 8, 8), dataset.maxshape)
+                file_id = os.stat(file_path).st_ino
+                # growing the sequence resizes the dataset in place.
+                grown_data = numpy.concatenate([data, numpy.random.randn(1, 8, 8).astype(numpy.float32)])
+                h.write_data(grown_data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                self.assertEqual(file_id, os.stat(file_path).st_ino)
+                self.assertEqual((4, 8, 8), dataset.shape)
+                self.assertTrue(numpy.array_equal(grown_data, h.read_data()[:]))
+                self.assertEqual(p, h.read_properties())
+                # reserving clears the data in place.
+                h.reserve_data((5, 8, 8), numpy.float32, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                self.assertEqual((5, 8, 8), dataset.shape)
+                self.assertTrue(numpy.array_equal(numpy.zeros((5, 8, 8)), h.read_data()[:]))
+                # a dtype change replaces the dataset within the same file.
+                int_data = numpy.arange(2 * 8 * 8, dtype=numpy.int16).reshape(2, 8, 8)
+                h.write_data(int_data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                self.assertEqual(file_id, os.stat(file_path).st_ino)
+                self.assertTrue(numpy.array_equal(int_data, h.read_data()[:]))
+                self.assertEqual(numpy.int16, h.read_data().dtype)
+                self.assertEqual(p, h.read_properties())
+                # a change of the frame shape replaces the dataset with a chunk layout for the new shape.
+                frame_data = numpy.arange(2 * 4 * 4, dtype=numpy.int16).reshape(2, 4, 4)
+                h.write_data(frame_data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                self.assertEqual(file_id, os.stat(file_path).st_ino)
+                self.assertTrue(numpy.array_equal(frame_data, h.read_data()[:]))
+                self.assertEqual((None, 4, 4), h.read_data().maxshape)
+                self.assertEqual((4, 4), h.read_data().chunks[1:])
+                self.assertEqual(p, h.read_properties())
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_hdf5_handler_reclaims_space_when_data_shrinks(self):
+        now = datetime.datetime.now()
+        current_working_directory = pathlib.Path.cwd()
+        data_dir = current_working_directory / "__Test"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        Cache.db_make_directory_if_needed(data_dir)
+        try:
+            file_path = os.path.join(data_dir, "abc.h5")
+            h = HDF5Handler.HDF5Handler(file_path)
+            with contextlib.closing(h):
+                p = {"abc": 1}
+                h.write_properties(p, now)
+                h.write_data(numpy.ones((64, 128, 128), dtype=numpy.float32), DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                large_file_size = os.path.getsize(file_path)
+                small_data = numpy.full((2, 128, 128), 2, dtype=numpy.float32)
+                h.write_data(small_data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+            # the file is repacked when it is closed.
+            self.assertLess(os.path.getsize(file_path), large_file_size // 4)
+            h = HDF5Handler.HDF5Handler(file_path)
+            with contextlib.closing(h):
+                self.assertTrue(numpy.array_equal(small_data, h.read_data()[:]))
+                self.assertEqual((None, 128, 128), h.read_data().maxshape)
+                self.assertEqual(p, h.read_properties())
+                # replacing the dataset with a different dtype also frees the space of the old dataset.
+                h.write_data(numpy.ones((64, 128, 128), dtype=numpy.float32), DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                h.write_data(numpy.ones((2, 128, 128), dtype=numpy.int16), DataAndMetadata.DataDescriptor(True, 0, 2), now)
+            self.assertLess(os.path.getsize(file_path), large_file_size // 4)
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_hdf5_handler_writes_only_changed_frames_of_sequence(self):
+        now = datetime.datetime.now()
+        current_working_directory = pathlib.Path.cwd()
+        data_dir = current_working_directory / "__Test"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        Cache.db_make_directory_if_needed(data_dir)
+        try:
+            file_path = os.path.join(data_dir, "abc.h5")
+            h = HDF5Handler.HDF5Handler(file_path)
+            with contextlib.closing(h):
+                data = numpy.random.randn(8, 16, 16).astype(numpy.float32)
+                h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                written_keys = list()
+                dataset_setitem = h5py.Dataset.__setitem__
+
+                def setitem(dataset, key, value):
+                    written_keys.append(key)
+                    dataset_setitem(dataset, key, value)
+
+                with unittest.mock.patch.object(h5py.Dataset, "__setitem__", setitem):
+                    # growing the sequence by a frame writes the frame.
+                    data = numpy.concatenate([data, numpy.random.randn(1, 16, 16).astype(numpy.float32)])
+                    h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                    self.assertEqual([slice(8, 9)], written_keys)
+                    # changing frames writes the runs of changed frames.
+                    written_keys.clear()
+                    data = numpy.copy(data)
+                    data[2:4] += 1
+                    data[6] += 1
+                    h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                    self.assertEqual([slice(2, 4), slice(6, 7)], written_keys)
+                self.assertTrue(numpy.array_equal(data, h.read_data()[:]))
+                # the dataset may be written directly once it is read, so the next write writes all frames.
+                h.read_data()[0] = 0
+                h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                self.assertTrue(numpy.array_equal(data, h.read_data()[:]))
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_hdf5_handler_compression_benchmark(self):
+        # benchmark: set NIONSWIFT_HDF5_BENCHMARK_FRAMES (e.g. to 200) and run with -s to print the sizes and throughput.
+        frame_count = int(os.environ.get("NIONSWIFT_HDF5_BENCHMARK_FRAMES", "4"))
+        now = datetime.datetime.now()
+        current_working_directory = pathlib.Path.cwd()
+        data_dir = current_working_directory / "__Test"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        Cache.db_make_directory_if_needed(data_dir)
+        try:
+            # sparse counts, typical of event-counting detectors.
+            rng = numpy.random.default_rng(0)
+            data = numpy.zeros((frame_count, 256, 256), dtype=numpy.float32)
+            mask = rng.random(data.shape) < 0.02
+            data[mask] = rng.poisson(3, numpy.count_nonzero(mask))
+            data_size_mb = data.nbytes / 1e6
+            file_sizes = dict()
+            for compression in (None, "lzf", "gzip", "shuffle-gzip"):
+                file_path = data_dir / f"{compression}.h5"
+                h = HDF5Handler.HDF5Handler(file_path, compression)
+                with contextlib.closing(h):
+                    start_time = time.perf_counter()
+                    h.write_data(data, DataAndMetadata.DataDescriptor(True, 0, 2), now)
+                    write_time = time.perf_counter() - start_time
+                file_sizes[compression] = os.path.getsize(file_path)
+                h = HDF5Handler.HDF5Handler(file_path)
+                with contextlib.closing(h):
+                    start_time = time.perf_counter()
+                    read_data = h.read_data()[:]
+                    read_time = time.perf_counter() - start_time
+                    self.assertTrue(numpy.array_equal(data, read_data))
+                if "NIONSWIFT_HDF5_BENCHMARK_FRAMES" in os.environ:
+                    print(f"{compression}: {file_sizes[compression] / 1e6:.1f} MB ({file_sizes[compression] / data.nbytes:.1%}), "
+                          f"write {data_size_mb / write_time:.0f} MB/s, read {data_size_mb / read_time:.0f} MB/s")
+            for compression in ("lzf", "gzip", "shuffle-gzip"):
+                self.assertLess(file_sizes[compression], file_sizes[None] // 4)
+        finally:
+            shutil.rmtree(data_dir)
@@ -1,10 +1,16 @@
 # standard libraries
+import asyncio
+import concurrent.futures
 import contextlib
 import datetime
+import io
 import json
 import logging
 import os
 import pathlib
+import tempfile
+import threading
+import time
 import typing
 import unittest
 import uuid
@@ -18,6 +24,8 @@ from nion.data import Calibration
 from nion.data import DataAndMetadata
 from nion.swift import Application
 from nion.swift.model import DataItem
+from nion.swift.model import DisplayItem
+from nion.swift.model import FileStorageSystem
 from nion.swift.model import Graphics
 from nion.swift.model import ImportExportManager
 from nion.swift.model import Utility
@@ -447,6 +455,53 @@ class TestImportExportManagerClass(unittest.TestCase):
         finally:
             os.remove(file_path_npy)
 
+    def test_importing_numpy_and_ndata_files_streams_memory_mapped_data_into_storage(self):
+        from nion.swift.model import HDF5Handler
+        memory_map_import_size = ImportExportManager._g_memory_map_import_size
+        block_size = HDF5Handler._g_block_size
+        ImportExportManager._g_memory_map_import_size = 1024
+        HDF5Handler._g_block_size = 1024
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                data = numpy.random.randn(16, 8, 8).astype(numpy.float32)
+                file_path_npy = pathlib.Path(temp_dir) / "file.npy"
+                numpy.save(file_path_npy, data)
+                file_path_ndata = pathlib.Path(temp_dir) / "file.ndata1"
+                data_item = DataItem.DataItem(data)
+                with contextlib.closing(data_item):
+                    display_item = DisplayItem.DisplayItem(data_item=data_item)
+                    with contextlib.closing(display_item):
+                        ImportExportManager.NDataImportExportHandler("ndata1-io-handler", "ndata1", ["ndata1"]).write_display_item(display_item, file_path_ndata, "ndata1")
+                project_storage_system = FileStorageSystem.FileProjectStorageSystem(pathlib.Path(temp_dir) / "Project.nsproj", pathlib.Path(temp_dir) / "Project Data")
+                handlers = [
+                    (ImportExportManager.NumPyImportExportHandler("numpy-io-handler", "npy", ["npy"]), file_path_npy, "npy"),
+                    (ImportExportManager.NDataImportExportHandler("ndata1-io-handler", "ndata1", ["ndata1"]), file_path_ndata, "ndata1"),
+                ]
+                for handler, file_path, extension in handlers:
+                    data_elements = handler.read_data_elements(extension, file_path)
+                    self.assertIsInstance(data_elements[0]["data"], numpy.memmap)
+                    self.assertTrue(data_elements[0]["large_format"])
+                    import_data = handler.read_import_data(extension, file_path, project_storage_system)
+                    self.assertEqual(1, len(import_data.storage_handlers))
+                    storage_handler = import_data.storage_handlers[0]
+                    try:
+                        self.assertIsInstance(storage_handler, HDF5Handler.HDF5Handler)
+                        self.assertTrue(numpy.array_equal(data, storage_handler.read_data()))
+                    finally:
+                        storage_handler.close()
+        finally:
+            ImportExportManager._g_memory_map_import_size = memory_map_import_size
+            HDF5Handler._g_block_size = block_size
+
+    def test_importing_small_numpy_file_reads_data_into_memory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path_npy = pathlib.Path(temp_dir) / "file.npy"
+            numpy.save(file_path_npy, numpy.ones((4, 4)))
+            handler = ImportExportManager.NumPyImportExportHandler("numpy-io-handler", "npy", ["npy"])
+            data_elements = handler.read_data_elements("npy", file_path_npy)
+            self.assertNotIsInstance(data_elements[0]["data"], numpy.memmap)
+            self.assertNotIn("large_format", data_elements[0])
+
     def test_data_item_with_numpy_bool_to_data_element_produces_json_compatible_dict(self):
         data_item = DataItem.DataItem(numpy.zeros((16, 16)))
         data_item.large_format = numpy.prod((2,3,4), dtype=numpy.int64) > 10  # produces a numpy.bool_
@@ -466,6 +521,69 @@ class TestImportExportManagerClass(unittest.TestCase):
             handler.write_display_item(display_item, pathlib.Path(file_path), "csv")
             self.assertFalse(os.path.exists(file_path))
 
+    def test_csv_read_and_write_in_blocks_match_numpy_text_functions(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = pathlib.Path(temp_dir) / "file.csv"
+            for data in (numpy.random.randn(100, 3), numpy.random.randn(77), numpy.random.randn(1, 4), numpy.arange(25).reshape(5, 5)):
+                with open(file_path, "w") as f:
+                    ImportExportManager.write_csv_data(f, data, block_rows=16)
+                expected_file_path = pathlib.Path(temp_dir) / "expected.csv"
+                numpy.savetxt(expected_file_path, data, delimiter=", ")
+                self.assertEqual(expected_file_path.read_text(), file_path.read_text())
+                read_data = ImportExportManager.read_csv_data(file_path, block_rows=16)
+                expected_data = numpy.loadtxt(file_path, delimiter=",")
+                self.assertEqual(expected_data.shape, read_data.shape)
+                self.assertTrue(numpy.array_equal(expected_data, read_data))
+
+    def test_csv_read_skips_comments_and_blank_lines_and_rejects_ragged_rows(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = pathlib.Path(temp_dir) / "file.csv"
+            file_path.write_text("# X, Y\n1, 2\n\n3, 4  # comment\n5, 6")
+            self.assertTrue(numpy.array_equal(numpy.array([[1, 2], [3, 4], [5, 6]]), ImportExportManager.read_csv_data(file_path, block_rows=2)))
+            file_path.write_text("1, 2\n3\n")
+            with self.assertRaises(ValueError):
+                ImportExportManager.read_csv_data(file_path)
+
+    def test_csv_table_write_pads_shorter_columns(self):
+        f = io.StringIO()
+        data_list = [numpy.linspace(0, 1, 5), numpy.array([0.1, 0.2, 0.3], dtype=numpy.float32), numpy.arange(4)]
+        ImportExportManager.write_csv_table(f, ["X", "A", "B"], data_list, block_rows=2)
+        lines = f.getvalue().splitlines()
+        self.assertEqual("# X, A, B", lines[0])
+        self.assertEqual("0.0, 0.10000000149011612, 0", lines[1])
+        self.assertEqual("0.75, , 3", lines[4])
+        self.assertEqual("1.0, , ", lines[5])
+
+    def test_csv_read_and_write_benchmark(self):
+        # benchmark: set NIONSWIFT_CSV_BENCHMARK_ROWS (e.g. to 5000000) and run with -s to print the times.
+        row_count = int(os.environ.get("NIONSWIFT_CSV_BENCHMARK_ROWS", "2000"))
+        data = numpy.random.randn(row_count, 2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = pathlib.Path(temp_dir) / "file.csv"
+            expected_file_path = pathlib.Path(temp_dir) / "expected.csv"
+            start_time = time.perf_counter()
+            numpy.savetxt(expected_file_path, data, delimiter=", ")
+            savetxt_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            with open(file_path, "w") as f:
+                ImportExportManager.write_csv_data(f, data)
+            write_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            expected_data = numpy.loadtxt(expected_file_path, delimiter=",")
+            loadtxt_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            read_data = ImportExportManager.read_csv_data(file_path)
+            read_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            ImportExportManager.write_csv_table(io.StringIO(), ["X", "A", "B"], [data[:, 0], data[:, 1], data[:row_count // 2, 0]])
+            write_table_time = time.perf_counter() - start_time
+            if "NIONSWIFT_CSV_BENCHMARK_ROWS" in os.environ:
+                print(f"Wrote {row_count} rows in {write_time:.2f} s (savetxt {savetxt_time:.2f} s)")
+                print(f"Read {row_count} rows in {read_time:.2f} s (loadtxt {loadtxt_time:.2f} s)")
+                print(f"Wrote {row_count} row table in {write_table_time:.2f} s")
+            self.assertEqual(expected_file_path.read_text(), file_path.read_text())
+            self.assertTrue(numpy.array_equal(expected_data, read_data))
+
     def test_export_nhdf_handles_composite_line_plot_uuids(self):
         with TestContext.create_memory_context() as test_context:
             document_controller = test_context.create_document_controller()
@@ -577,6 +695,153 @@ class TestImportExportManagerClass(unittest.TestCase):
                 self.assertEqual(document_model.display_items[0].display_data_channels[1], document_model.display_items[0].display_layers[1].display_data_channel)
                 self.assertEqual(1, len(document_model.display_items[0].graphics))
 
+    def test_receive_files_imports_batch_in_order_with_one_project_write(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller(auto_close=False)
+            document_model = document_controller.document_model
+            with contextlib.closing(document_controller), tempfile.TemporaryDirectory() as temp_dir:
+                file_paths = list()
+                for i in range(6):
+                    file_path = pathlib.Path(temp_dir) / f"file{i}.npy"
+                    numpy.save(file_path, numpy.full((4, 4), i, numpy.float32))
+                    file_paths.append(str(file_path))
+                project_storage_system = document_model._project.project_storage_system
+                write_count = project_storage_system._write_count
+                display_items = document_controller.receive_files(file_paths)
+                self.assertEqual(1, project_storage_system._write_count - write_count)
+                self.assertEqual(6, len(display_items))
+                self.assertEqual(6, len(document_model.data_items))
+                for i, display_item in enumerate(display_items):
+                    self.assertEqual(f"file{i}", display_item.data_item.title)
+                    self.assertTrue(numpy.array_equal(numpy.full((4, 4), i, numpy.float32), display_item.data_item.data))
+
+    def test_read_import_data_batch_skips_files_after_cancel(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_paths = list()
+                for i in range(3):
+                    file_path = pathlib.Path(temp_dir) / f"file{i}.npy"
+                    numpy.save(file_path, numpy.zeros((4, 4)))
+                    file_paths.append(file_path)
+                activity = ImportExportManager.ImportActivity(len(file_paths))
+                activity.cancel()
+                import_data_list = ImportExportManager.ImportExportManager().read_import_data_batch(file_paths, document_model._project.project_storage_system, activity=activity)
+                self.assertEqual(0, len(import_data_list))
+                self.assertEqual(3, activity.count)
+
+    def test_read_import_data_batch_reports_and_skips_unreadable_files(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_paths = list()
+                for i in range(3):
+                    file_path = pathlib.Path(temp_dir) / f"file{i}.npy"
+                    numpy.save(file_path, numpy.zeros((4, 4)))
+                    file_paths.append(file_path)
+                bad_file_path = pathlib.Path(temp_dir) / "bad.npy"
+                bad_file_path.write_bytes(b"not numpy data")
+                file_paths.insert(1, bad_file_path)
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    import_data_list = ImportExportManager.ImportExportManager().read_import_data_batch(file_paths, document_model._project.project_storage_system)
+                self.assertEqual([file_paths[0]] + file_paths[2:], [file_path for file_path, import_data in import_data_list])
+                self.assertIn("Traceback", stderr.getvalue())
+
+    def test_write_display_items_async_calls_display_item_writers_of_handlers_not_capturing_on_main_thread(self):
+
+        class DisplayItemHandler(ImportExportManager.ImportExportHandler):
+            def __init__(self) -> None:
+                super().__init__("display-item-handler", "DisplayItem", ["dat"])
+                self.threads = list()
+
+            def can_write(self, data_metadata, extension):
+                return True
+
+            def write_display_item(self, display_item, path, extension):
+                self.threads.append(threading.current_thread())
+                path.write_text(display_item.displayed_title)
+
+        class DataHandler(ImportExportManager.ImportExportHandler):
+            def __init__(self) -> None:
+                super().__init__("data-handler", "Data", ["dat"])
+                self.threads = list()
+
+            def can_write(self, data_metadata, extension):
+                return True
+
+            def write_data(self, data, extension, file):
+                self.threads.append(threading.current_thread())
+                file.write(data.tobytes())
+
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            display_items = list()
+            for i in range(4):
+                data_item = DataItem.DataItem(numpy.full((8, 8), i, dtype=numpy.float32))
+                document_model.append_data_item(data_item)
+                display_items.append(document_model.get_display_item_for_data_item(data_item))
+            display_item_handler = DisplayItemHandler()
+            data_handler = DataHandler()
+            self.assertFalse(display_item_handler.is_display_item_writer_thread_safe)
+            self.assertTrue(data_handler.is_display_item_writer_thread_safe)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                display_item_paths = [(display_item, pathlib.Path(temp_dir) / f"file{i}.dat") for i, display_item in enumerate(display_items)]
+
+                async def write_display_items() -> None:
+                    main_thread = threading.current_thread()
+                    errors = await ImportExportManager.ImportExportManager().write_display_items_async(display_item_handler, display_item_paths, max_workers=2)
+                    self.assertTrue(all(error is None for error in errors))
+                    self.assertTrue(all(thread is main_thread for thread in display_item_handler.threads))
+                    # data is captured on the main thread so that only the data is written on the worker threads.
+                    errors = await ImportExportManager.ImportExportManager().write_display_items_async(data_handler, display_item_paths, max_workers=2)
+                    self.assertTrue(all(error is None for error in errors))
+                    self.assertTrue(all(thread is not main_thread for thread in data_handler.threads))
+
+                asyncio.run(write_display_items())
+                self.assertEqual(4, len(display_item_handler.threads))
+                self.assertEqual(4, len(data_handler.threads))
+                for i, (display_item, path) in enumerate(display_item_paths):
+                    self.assertTrue(numpy.array_equal(numpy.full((8, 8), i, dtype=numpy.float32), numpy.frombuffer(path.read_bytes(), dtype=numpy.float32).reshape(8, 8)))
+
+    def test_write_display_items_async_writes_items_in_parallel_and_reports_errors(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            display_items = list()
+            for i in range(6):
+                data_item = DataItem.DataItem(numpy.full((8, 8), i, dtype=numpy.float32))
+                document_model.append_data_item(data_item)
+                display_items.append(document_model.get_display_item_for_data_item(data_item))
+            data_item = DataItem.DataItem(numpy.zeros((8, )))
+            document_model.append_data_item(data_item)
+            display_items.append(document_model.get_display_item_for_data_item(data_item))
+            writer = ImportExportManager.ImportExportManager().get_writer_by_id("png-io-handler")
+            with tempfile.TemporaryDirectory() as temp_dir:
+                display_item_paths = [(display_item, pathlib.Path(temp_dir) / f"file{i}.png") for i, display_item in enumerate(display_items)]
+                activity = ImportExportManager.ExportActivity(len(display_item_paths))
+                errors = asyncio.run(ImportExportManager.ImportExportManager().write_display_items_async(writer, display_item_paths, activity=activity, max_workers=2, max_pending=2))
+                self.assertEqual(7, activity.count)
+                self.assertTrue(all(error is None for error in errors[:6]))
+                self.assertIsInstance(errors[6], ImportExportManager.ImportExportIncompatibleDataError)
+                for display_item, path in display_item_paths[:6]:
+                    self.assertEqual((8, 8), imageio.imread(path).shape[:2])
+                self.assertFalse(display_item_paths[6][1].exists())
+
+    def test_write_display_items_async_skips_items_after_cancel(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.zeros((8, 8)))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            writer = ImportExportManager.ImportExportManager().get_writer_by_id("png-io-handler")
+            with tempfile.TemporaryDirectory() as temp_dir:
+                display_item_paths = [(display_item, pathlib.Path(temp_dir) / f"file{i}.png") for i in range(3)]
+                activity = ImportExportManager.ExportActivity(len(display_item_paths))
+                activity.cancel()
+                errors = asyncio.run(ImportExportManager.ImportExportManager().write_display_items_async(writer, display_item_paths, activity=activity))
+                self.assertTrue(all(isinstance(error, concurrent.futures.CancelledError) for error in errors))
+                self.assertFalse(any(path.exists() for display_item, path in display_item_paths))
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.DEBUG)
@@ -1,5 +1,7 @@
 # standard libraries
 import contextlib
+import os
+import time
 import unittest
 
 # third party libraries
@@ -28,8 +30,9 @@ class TestPersistentObjectContextClass(unittest.TestCase):
                 nonlocal was_registered
                 if registered_item:
                     was_registered = True
-            with persistent_object_context.registration_event.listen(registered):
-                self.assertFalse(was_registered)
+            persistent_object_context.register_registration_changed_fn(object1.uuid, "key", registered)
+            self.assertFalse(was_registered)
+            persistent_object_context.unregister_registration_changed_fn(object1.uuid, "key")
 
     def test_persistent_object_context_calls_register_when_object_becomes_registered(self):
         persistent_object_context = Persistence.PersistentObjectContext()
@@ -40,9 +43,10 @@ class TestPersistentObjectContextClass(unittest.TestCase):
                 nonlocal was_registered
                 if registered_item == object1:
                     was_registered = True
-            with persistent_object_context.registration_event.listen(registered):
-                persistent_object_context.register(object1)
-                self.assertTrue(was_registered)
+            persistent_object_context.register_registration_changed_fn(object1.uuid, "key", registered)
+            persistent_object_context.register(object1)
+            self.assertTrue(was_registered)
+            persistent_object_context.unregister_registration_changed_fn(object1.uuid, "key")
 
     def test_persistent_object_context_calls_unregister_when_object_becomes_unregistered(self):
         persistent_object_context = Persistence.PersistentObjectContext()
@@ -55,11 +59,12 @@ class TestPersistentObjectContextClass(unittest.TestCase):
                     was_registered = True
                 if unregistered_item == object1:
                     was_registered = False
-            with persistent_object_context.registration_event.listen(registered):
-                persistent_object_context.register(object1)
-                self.assertTrue(was_registered)
-                persistent_object_context.unregister(object1)
-                self.assertFalse(was_registered)
+            persistent_object_context.register_registration_changed_fn(object1.uuid, "key", registered)
+            persistent_object_context.register(object1)
+            self.assertTrue(was_registered)
+            persistent_object_context.unregister(object1)
+            self.assertFalse(was_registered)
+            persistent_object_context.unregister_registration_changed_fn(object1.uuid, "key")
 
     def test_persistent_object_context_unregister_without_subscription_works(self):
         # this test will only generate extra output in the failure case, which has been fixed
@@ -69,6 +74,50 @@ class TestPersistentObjectContextClass(unittest.TestCase):
         object1.close()
         object1 = None
 
+    def test_persistent_object_context_only_calls_registration_changed_fns_for_the_object_uuid(self):
+        persistent_object_context = Persistence.PersistentObjectContext()
+        object1 = Persistence.PersistentObject()
+        object2 = Persistence.PersistentObject()
+        with contextlib.closing(object1), contextlib.closing(object2):
+            calls = list()
+            persistent_object_context.register_registration_changed_fn(object1.uuid, "key", lambda registered, unregistered: calls.append((registered, unregistered)))
+            persistent_object_context.register(object2)
+            persistent_object_context.unregister(object2)
+            self.assertEqual(0, len(calls))
+            persistent_object_context.register(object1)
+            persistent_object_context.unregister(object1)
+            self.assertEqual([(object1, None), (None, object1)], calls)
+            persistent_object_context.unregister_registration_changed_fn(object1.uuid, "key")
+
+    def test_persistent_object_context_registration_event_is_deprecated(self):
+        persistent_object_context = Persistence.PersistentObjectContext()
+        with self.assertWarns(DeprecationWarning):
+            persistent_object_context.registration_event
+
+    def test_persistent_object_context_registration_benchmark(self):
+        # benchmark: set NIONSWIFT_REGISTRATION_BENCHMARK_ITEMS (e.g. to 10000) and run with -s to print the time.
+        item_count = int(os.environ.get("NIONSWIFT_REGISTRATION_BENCHMARK_ITEMS", "200"))
+        references_per_item = 5
+        persistent_object_context = Persistence.PersistentObjectContext()
+        object0 = Persistence.PersistentObject()
+        object0.persistent_object_context = persistent_object_context
+        objects = [Persistence.PersistentObject() for i in range(item_count)]
+        proxies = [object0.create_item_proxy(item_specifier=Persistence.read_persistent_specifier(o.uuid)) for o in objects for j in range(references_per_item)]
+        try:
+            start_time = time.perf_counter()
+            for o in objects:
+                o.persistent_object_context = persistent_object_context
+            elapsed_time = time.perf_counter() - start_time
+            if "NIONSWIFT_REGISTRATION_BENCHMARK_ITEMS" in os.environ:
+                print(f"Registered {item_count} items with {len(proxies)} references in {elapsed_time:.2f} s")
+            self.assertTrue(all(proxy.item is objects[i // references_per_item] for i, proxy in enumerate(proxies)))
+        finally:
+            for proxy in proxies:
+                proxy.close()
+            for o in objects:
+                o.close()
+            object0.close()
+
     def test_persistent_object_proxy_updates_when_registered(self):
         persistent_object_context = Persistence.PersistentObjectContext()
         object0 = Persistence.PersistentObject()
@@ -0,0 +1,124 @@
+# standard libraries
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+# third party libraries
+# None
+
+# local libraries
+from nion.swift.model import PlugInManager
+from nion.swift.model import Symbolic
+
+
+class TestPlugInManagerClass(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_manifest_cache_reuses_manifest_until_it_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = os.path.join(temp_dir, "manifest.json")
+            cache_path = pathlib.Path(temp_dir) / "PlugInCache.json"
+            with open(manifest_path, "w") as f:
+                json.dump({"name": "a", "identifier": "a", "version": "1.0.0"}, f)
+            manifest_cache = PlugInManager.PlugInManifestCache(cache_path)
+            self.assertEqual("1.0.0", manifest_cache.read_manifest(manifest_path)["version"])
+            self.assertTrue(manifest_cache.module_exists("json"))
+            self.assertFalse(manifest_cache.module_exists("not_a_module_abc.xyz"))
+            manifest_cache.save()
+            # a new cache reads the manifest from the cache file.
+            stat_result = os.stat(manifest_path)
+            with open(cache_path) as f:
+                cache_properties = json.load(f)
+            cache_properties["manifests"][manifest_path]["manifest"]["version"] = "cached"
+            with open(cache_path, "w") as f:
+                json.dump(cache_properties, f)
+            manifest_cache = PlugInManager.PlugInManifestCache(cache_path)
+            self.assertEqual("cached", manifest_cache.read_manifest(manifest_path)["version"])
+            # changing the manifest invalidates the cache entry.
+            with open(manifest_path, "w") as f:
+                json.dump({"name": "a", "identifier": "a", "version": "2.0.0"}, f)
+            os.utime(manifest_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1000000))
+            self.assertEqual("2.0.0", manifest_cache.read_manifest(manifest_path)["version"])
+            self.assertIsNone(manifest_cache.read_manifest(os.path.join(temp_dir, "missing.json")))
+
+    def test_lazy_plug_in_is_loaded_on_first_use_of_its_computation_type(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plug_in_dir = os.path.join(temp_dir, "lazy_plug_in_test_abc")
+            os.makedirs(plug_in_dir)
+            with open(os.path.join(plug_in_dir, "manifest.json"), "w") as f:
+                json.dump({"name": "Lazy", "identifier": "lazy_plug_in_test_abc", "version": "1.0.0", "lazy": {"computation_types": ["lazy-test-abc"]}}, f)
+            with open(os.path.join(plug_in_dir, "__init__.py"), "w") as f:
+                f.write("from nion.swift.model import Symbolic\n"
+                        "class LazyComputation:\n"
+                        "    label = 'Lazy'\n"
+                        "    def __init__(self, computation): pass\n"
+                        "def run():\n"
+                        "    Symbolic.register_computation_type('lazy-test-abc', LazyComputation)\n")
+            sys.path.append(temp_dir)
+            try:
+                manifest_cache = PlugInManager.PlugInManifestCache()
+                plugin_adapter = PlugInManager.PlugInAdapter(temp_dir, "lazy_plug_in_test_abc", manifest_cache)
+                PlugInManager._load_plug_in_adapters([plugin_adapter], manifest_cache)
+                self.assertNotIn("lazy_plug_in_test_abc", sys.modules)
+                self.assertIsNone(Symbolic.get_computation_type("lazy-test-other"))
+                self.assertNotIn("lazy_plug_in_test_abc", sys.modules)
+                compute_class = Symbolic.get_computation_type("lazy-test-abc")
+                self.assertIn("lazy_plug_in_test_abc", sys.modules)
+                self.assertEqual("Lazy", getattr(compute_class, "label"))
+                self.assertIn("lazy_plug_in_test_abc", PlugInManager.plug_in_import_times)
+            finally:
+                sys.path.remove(temp_dir)
+                sys.modules.pop("lazy_plug_in_test_abc", None)
+                Symbolic._computation_types.pop("lazy-test-abc", None)
+
+    def test_lazy_plug_in_required_by_plug_in_loaded_at_startup_is_loaded_at_startup(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            def write_plug_in(name: str, manifest: dict) -> None:
+                plug_in_dir = os.path.join(temp_dir, name)
+                os.makedirs(plug_in_dir)
+                with open(os.path.join(plug_in_dir, "manifest.json"), "w") as f:
+                    json.dump({"name": name, "identifier": name, "version": "1.0.0", **manifest}, f)
+                with open(os.path.join(plug_in_dir, "__init__.py"), "w") as f:
+                    f.write("import threading\n"
+                            "run_on_main_thread = None\n"
+                            "def run():\n"
+                            "    global run_on_main_thread\n"
+                            "    run_on_main_thread = threading.current_thread() is threading.main_thread()\n")
+
+            write_plug_in("lazy_plug_in_test_base", {"lazy": {"computation_types": ["lazy-test-base"]}})
+            write_plug_in("lazy_plug_in_test_lazy", {"lazy": {"computation_types": ["lazy-test-lazy"]}, "requires": ["lazy_plug_in_test_base ~= 1.0"]})
+            write_plug_in("lazy_plug_in_test_eager", {"requires": ["lazy_plug_in_test_lazy ~= 1.0"]})
+            write_plug_in("lazy_plug_in_test_other", {"lazy": {"computation_types": ["lazy-test-other"]}, "requires": ["lazy_plug_in_test_base2 ~= 1.0"]})
+            write_plug_in("lazy_plug_in_test_base2", {"lazy": {"computation_types": ["lazy-test-base2"]}})
+            names = ["lazy_plug_in_test_base", "lazy_plug_in_test_lazy", "lazy_plug_in_test_eager", "lazy_plug_in_test_other", "lazy_plug_in_test_base2"]
+            sys.path.append(temp_dir)
+            try:
+                manifest_cache = PlugInManager.PlugInManifestCache()
+                plugin_adapters = [PlugInManager.PlugInAdapter(temp_dir, name, manifest_cache) for name in names]
+                PlugInManager._load_plug_in_adapters(plugin_adapters, manifest_cache)
+                # the eager plug-in and the lazy plug-ins it requires, directly or indirectly, are run on this thread.
+                for name in names[:3]:
+                    self.assertTrue(sys.modules[name].run_on_main_thread)
+                self.assertFalse(PlugInManager.load_lazy_plug_in("computation_types", "lazy-test-lazy"))
+                # a lazy plug-in loads the lazy plug-ins it requires first.
+                self.assertNotIn("lazy_plug_in_test_other", sys.modules)
+                self.assertNotIn("lazy_plug_in_test_base2", sys.modules)
+                self.assertTrue(PlugInManager.load_lazy_plug_in("computation_types", "lazy-test-other"))
+                self.assertIsNotNone(sys.modules["lazy_plug_in_test_base2"].run_on_main_thread)
+                self.assertFalse(PlugInManager.load_lazy_plug_in("computation_types", "lazy-test-base2"))
+            finally:
+                sys.path.remove(temp_dir)
+                for name in names:
+                    sys.modules.pop(name, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
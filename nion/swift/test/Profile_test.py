@@ -1,8 +1,16 @@
 # standard libraries
+import asyncio
+import contextlib
+import datetime
+import json
 import logging
+import pathlib
+import sqlite3
+import tempfile
 import typing
 import unittest
 import unittest.mock
+import uuid
 
 # third party libraries
 import numpy
@@ -11,6 +19,10 @@ import numpy
 from nion.swift import Application
 from nion.swift import Facade
 from nion.swift.model import DataItem
+from nion.swift.model import FileStorageSystem
+from nion.swift.model import Profile
+from nion.swift.model import StartupTrace
+from nion.swift.model import Utility
 from nion.swift.test import TestContext
 from nion.ui import TestUI
 
@@ -598,6 +610,179 @@ class TestProfileClass(unittest.TestCase):
                 app.exit()
                 app.deinitialize()
 
+    def test_startup_trace_records_stages_and_writes_chrome_trace_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = pathlib.Path(temp_dir) / "trace.json"
+            with create_memory_profile_context() as profile_context:
+                profile = profile_context.create_profile(add_project=False)
+                profile.read_profile()
+                app = Application.Application(TestUI.UserInterface(), set_global=False)
+                app._set_profile_for_test(profile)
+                TestContext.add_project_memory(profile, load=False)
+                app.initialize(load_plug_ins=False)
+                StartupTrace.start_tracing(trace_path)
+                try:
+                    profile.last_project_reference = profile.project_references[0].uuid
+                    logging.getLogger("loader").setLevel = unittest.mock.Mock()  # ignore this call
+                    app.start(profile=profile)
+                    self.assertEqual(1, len(app.windows))
+                    self.assertFalse(trace_path.exists())
+                    # the trace is written after the first pass through the event loop.
+                    event_loop = app.windows[0].event_loop
+                    event_loop.stop()
+                    event_loop.run_forever()
+                    self.assertIsNone(StartupTrace.get_tracer())
+                finally:
+                    StartupTrace.stop_tracing()
+                    app._set_profile_for_test(None)
+                    app.exit()
+                    app.deinitialize()
+            with trace_path.open() as fp:
+                trace_events = json.load(fp)["traceEvents"]
+            span_names = {trace_event["name"] for trace_event in trace_events if trace_event["ph"] == "X"}
+            self.assertEqual({"project open", "storage handler scan", "migration", "workspace restore", "first paint"}, span_names)
+            for trace_event in trace_events:
+                if trace_event["ph"] == "X":
+                    self.assertGreaterEqual(trace_event["dur"], 0)
+
+    def test_prefetched_storage_handler_scan_is_used_once_when_reading_project(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with create_memory_profile_context() as profile_context:
+                profile = profile_context.create_profile(add_project=False)
+                project_reference = profile.create_project(pathlib.Path(temp_dir), "Test")
+                project_data_path = pathlib.Path(temp_dir) / "Test Data"
+                project_data_path.mkdir()
+                (project_data_path / "data.ndata").touch()
+                project_reference.prefetch_project()
+                self.assertIn(project_data_path, FileStorageSystem._prefetched_file_paths)
+                project_storage_system = project_reference.make_storage(None)
+                project_storage_system.load_properties()
+                project_storage_system._find_storage_handlers()
+                self.assertNotIn(project_data_path, FileStorageSystem._prefetched_file_paths)
+                project_reference.prefetch_project()
+                FileStorageSystem.clear_prefetched_storage_handler_scans()
+                self.assertNotIn(project_data_path, FileStorageSystem._prefetched_file_paths)
+                project_storage_system.close()
+
+    def test_read_built_in_project_reference_does_not_use_factory_hook(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with create_memory_profile_context() as profile_context:
+                profile = profile_context.create_profile(add_project=False)
+                project_reference = profile.create_project(pathlib.Path(temp_dir), "Test")
+                TestContext.add_project_memory(profile, load=False)
+                memory_project_reference = profile.project_references[-1]
+                properties = profile.write_to_dict()
+                with unittest.mock.patch.object(Profile, "project_reference_factory_hook") as project_reference_factory_hook:
+                    built_in_project_reference = Profile.read_built_in_project_reference(properties, project_reference.uuid)
+                    self.assertIsInstance(built_in_project_reference, Profile.IndexProjectReference)
+                    self.assertEqual(project_reference.project_path, built_in_project_reference.project_path)
+                    built_in_project_reference.close()
+                    self.assertIsNone(Profile.read_built_in_project_reference(properties, memory_project_reference.uuid))
+                    self.assertIsNone(Profile.read_built_in_project_reference(properties, uuid.uuid4()))
+                    project_reference_factory_hook.assert_not_called()
+
+    def test_file_profile_writes_changed_project_references_behind(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile_path = pathlib.Path(temp_dir) / "Profile.nsproj"
+            profile_path.write_text(json.dumps({"version": FileStorageSystem.PROFILE_VERSION, "uuid": str(uuid.uuid4())}), "utf-8")
+            storage_system = FileStorageSystem.make_file_persistent_storage_system(profile_path, write_delay=60.0)
+            storage_system.load_properties()
+            event_loop = asyncio.new_event_loop()
+            profile = Profile.Profile(event_loop, storage_system=storage_system)
+            try:
+                profile.read_profile()
+                for i in range(3):
+                    profile.add_project_index(pathlib.Path(temp_dir) / f"Project {i}.nsproj", load=False)
+                storage_system.flush()
+                self.assertEqual(3, len(json.loads(profile_path.read_text("utf-8"))["project_references"]))
+                # changes are written after the delay and the file matches a full rewrite of the properties.
+                last_used = datetime.datetime(2000, 1, 2, 3, 4, 5)
+                profile.project_references[1].last_used = last_used
+                profile.project_references[2].last_used = last_used
+                self.assertNotIn(last_used.isoformat(), profile_path.read_text("utf-8"))
+                storage_system.flush()
+                self.assertEqual(json.dumps(Utility.clean_dict(storage_system.get_storage_properties())), profile_path.read_text("utf-8"))
+                # closing writes pending changes.
+                profile.remove_project_reference(profile.project_references[0])
+            finally:
+                profile.close()
+                event_loop.close()
+            project_reference_dicts = json.loads(profile_path.read_text("utf-8"))["project_references"]
+            self.assertEqual(2, len(project_reference_dicts))
+            self.assertEqual({last_used.isoformat()}, {d["last_used"] for d in project_reference_dicts})
+
+    def test_sqlite_profile_writes_only_changed_project_references(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile_path = pathlib.Path(temp_dir) / "Profile.nsprofdb"
+            storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            storage_system.set_properties({"version": FileStorageSystem.PROFILE_VERSION, "uuid": str(uuid.uuid4())})
+            storage_system.load_properties()
+            event_loop = asyncio.new_event_loop()
+            profile = Profile.Profile(event_loop, storage_system=storage_system)
+            try:
+                profile.read_profile()
+                for i in range(3):
+                    profile.add_project_index(pathlib.Path(temp_dir) / f"Project {i}.nsproj", load=False)
+                # record the keys of the rows written from here on.
+                with contextlib.closing(sqlite3.connect(str(profile_path))) as conn:
+                    with conn:
+                        conn.execute("CREATE TABLE writes(key TEXT)")
+                        conn.execute("CREATE TRIGGER record_property_writes AFTER INSERT ON properties BEGIN INSERT INTO writes(key) VALUES (NEW.key); END")
+                        conn.execute("CREATE TRIGGER record_item_writes AFTER INSERT ON items BEGIN INSERT INTO writes(key) VALUES (NEW.key); END")
+                last_used = datetime.datetime(2000, 1, 2, 3, 4, 5)
+                profile.project_references[1].last_used = last_used
+                with contextlib.closing(sqlite3.connect(str(profile_path))) as conn:
+                    written_keys = {row[0] for row in conn.execute("SELECT key FROM writes")}
+                self.assertEqual({".", f"project_references/{profile.project_references[1].uuid}"}, written_keys)
+                profile.remove_project_reference(profile.project_references[0])
+            finally:
+                profile.close()
+                event_loop.close()
+            storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            storage_system.load_properties()
+            event_loop = asyncio.new_event_loop()
+            profile = Profile.Profile(event_loop, storage_system=storage_system)
+            try:
+                profile.read_profile()
+                self.assertEqual(2, len(profile.project_references))
+                self.assertEqual(last_used, profile.project_references[0].last_used)
+            finally:
+                profile.close()
+                event_loop.close()
+            with contextlib.closing(sqlite3.connect(str(profile_path))) as conn:
+                self.assertEqual(2, conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+
+    def test_corrupt_profile_is_moved_aside_but_unreadable_profile_is_kept(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile_path = pathlib.Path(temp_dir) / "Profile.nsproj"
+            profile_path.write_text("{\"version\": ", "utf-8")
+            storage_system = FileStorageSystem.make_file_persistent_storage_system(profile_path)
+            storage_system.load_properties()
+            self.assertEqual(dict(), storage_system.get_storage_properties())
+            self.assertTrue(profile_path.with_suffix(".bak").exists())
+            storage_system.close()
+            profile_path = pathlib.Path(temp_dir) / "Profile.nsprofdb"
+            profile_path.write_bytes(b"not a database" * 100)
+            profile_path.with_name(profile_path.name + "-wal").write_bytes(b"wal")
+            storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            storage_system.load_properties()
+            self.assertEqual(dict(), storage_system.get_storage_properties())
+            self.assertTrue(profile_path.with_suffix(".bak").exists())
+            self.assertEqual(b"wal", profile_path.with_suffix(".bak").with_name("Profile.bak-wal").read_bytes())
+            storage_system.close()
+            # a locked database is not corrupt. the error is raised and the database is kept.
+            profile_path = pathlib.Path(temp_dir) / "Locked.nsprofdb"
+            storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            storage_system.set_properties({"version": FileStorageSystem.PROFILE_VERSION, "uuid": str(uuid.uuid4())})
+            storage_system.close()
+            storage_system = FileStorageSystem.make_sqlite_persistent_storage_system(profile_path)
+            with unittest.mock.patch.object(sqlite3, "connect", side_effect=sqlite3.OperationalError("database is locked")):
+                with self.assertRaises(sqlite3.OperationalError):
+                    storage_system.load_properties()
+            self.assertTrue(profile_path.exists())
+            self.assertFalse(profile_path.with_suffix(".bak").exists())
+            storage_system.close()
+
     # TODO: creating new project
     # TODO: opening project from file
     # TODO: opening same project is not allowed
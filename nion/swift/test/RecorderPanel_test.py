@@ -47,6 +47,69 @@ class TestRecorderPanelClass(unittest.TestCase):
             self.assertTrue(recorded_data_item.is_sequence)
             self.assertEqual((4, 8, 8), recorded_data_item.dimensional_shape)
 
+    def test_recorder_writes_frames_into_reserved_sequence(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            data_item = DataItem.DataItem(numpy.zeros((8, 8)))
+            document_model.append_data_item(data_item)
+            recorder = RecorderPanel.Recorder(document_controller, data_item)
+            with contextlib.closing(recorder):
+                with document_model.data_item_live(data_item):
+                    count = 4
+                    recorder.start_recording(10, 1, count)
+                    recorder.continue_recording(10.25)
+                    recorded_data_item = document_model.data_items[1]
+                    # the full sequence is reserved with the first frame.
+                    self.assertEqual((4, 8, 8), recorded_data_item.dimensional_shape)
+                    for i in range(1, count):
+                        data_item.set_data(numpy.full((8, 8), float(i)))
+                        recorder.continue_recording(10 + i + 0.25)
+            self.assertEqual((4, 8, 8), recorded_data_item.dimensional_shape)
+            self.assertEqual("s", recorded_data_item.dimensional_calibrations[0].units)
+            self.assertTrue(numpy.array_equal(numpy.arange(4, dtype=float), recorded_data_item.data[:, 0, 0]))
+
+    def test_recorder_trims_recording_stopped_early(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            data_item = DataItem.DataItem(numpy.zeros((8, 8)))
+            document_model.append_data_item(data_item)
+            recorder = RecorderPanel.Recorder(document_controller, data_item)
+            with contextlib.closing(recorder):
+                with document_model.data_item_live(data_item):
+                    recorder.start_recording(10, 1, 10)
+                    for i in range(3):
+                        data_item.set_data(numpy.full((8, 8), float(i)))
+                        recorder.continue_recording(10 + i + 0.25)
+                    recorder.stop_recording()
+            recorded_data_item = document_model.data_items[1]
+            self.assertTrue(recorded_data_item.is_sequence)
+            self.assertEqual((3, 8, 8), recorded_data_item.dimensional_shape)
+            self.assertEqual("s", recorded_data_item.dimensional_calibrations[0].units)
+            self.assertTrue(numpy.array_equal(numpy.arange(3, dtype=float), recorded_data_item.data[:, 0, 0]))
+
+    def test_recorder_promotes_recording_when_frame_dtype_changes(self):
+        with TestContext.create_memory_context() as test_context:
+            document_controller = test_context.create_document_controller()
+            document_model = document_controller.document_model
+            data_item = DataItem.DataItem(numpy.zeros((8, 8), dtype=numpy.int16))
+            document_model.append_data_item(data_item)
+            recorder = RecorderPanel.Recorder(document_controller, data_item)
+            with contextlib.closing(recorder):
+                with document_model.data_item_live(data_item):
+                    count = 3
+                    recorder.start_recording(10, 1, count)
+                    recorder.continue_recording(10.25)
+                    data_item.set_data(numpy.full((8, 8), 1.5))
+                    recorder.continue_recording(11.25)
+                    data_item.set_data(numpy.full((8, 8), 2, dtype=numpy.int16))
+                    recorder.continue_recording(12.25)
+            recorded_data_item = document_model.data_items[1]
+            self.assertEqual((3, 8, 8), recorded_data_item.dimensional_shape)
+            self.assertEqual(numpy.float64, recorded_data_item.data_dtype)
+            self.assertTrue(numpy.array_equal(numpy.array([0.0, 1.5, 2.0]), recorded_data_item.data[:, 0, 0]))
+
     def test_recorder_puts_recorded_data_item_under_transaction(self):
         with TestContext.create_memory_context() as test_context:
             document_controller = test_context.create_document_controller()
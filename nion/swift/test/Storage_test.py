@@ -10,11 +10,13 @@ import os
 import pathlib
 import shutil
 import threading
+import time
 import typing
 import unittest
 import uuid
 
 # third party libraries
+import h5py
 import numpy
 
 # local libraries
@@ -839,6 +841,82 @@ class TestStorageClass(unittest.TestCase):
                 self.assertEqual(1, len(document_model.data_items))
                 self.assertEqual(data_item_uuid, document_model.data_items[0].uuid)
 
+    def test_file_storage_system_trash_is_bounded_by_size(self):
+        with create_temp_profile_context() as profile_context:
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                old_trash_size_limit = FileStorageSystem._g_trash_size_limit
+                FileStorageSystem._g_trash_size_limit = 8000
+                try:
+                    datas = [numpy.random.randn(16, 16) for i in range(3)]
+                    data_items = [DataItem.DataItem(data) for data in datas]
+                    for data_item in data_items:
+                        document_model.append_data_item(data_item)
+                    data_item_uuids = [data_item.uuid for data_item in data_items]
+                    for data_item in data_items:
+                        document_model.remove_data_item(data_item, safe=True)
+                    trash_dir = document_model._project.project_storage_system._trash_dir
+                    trash_index = FileStorageSystem.TrashIndex(trash_dir / "index.json")
+                    self.assertEqual([str(data_item_uuid) for data_item_uuid in data_item_uuids[1:]], [entry["uuid"] for entry in trash_index.entries])
+                    self.assertLessEqual(trash_index.total_bytes, FileStorageSystem._g_trash_size_limit)
+                    self.assertEqual(2, len([file_path for file_path in trash_dir.iterdir() if file_path.suffix == ".ndata"]))
+                    # the oldest item has been discarded from the trash; the others can be restored.
+                    self.assertIsNone(document_model.restore_data_item(data_item_uuids[0]))
+                    data_item = document_model.restore_data_item(data_item_uuids[2])
+                    self.assertEqual(data_item_uuids[2], data_item.uuid)
+                    self.assertTrue(numpy.array_equal(datas[2], data_item.data))
+                    self.assertEqual([str(data_item_uuids[1])], [entry["uuid"] for entry in FileStorageSystem.TrashIndex(trash_dir / "index.json").entries])
+                finally:
+                    FileStorageSystem._g_trash_size_limit = old_trash_size_limit
+
+    def test_memory_storage_system_trash_is_bounded_by_size(self):
+        with create_memory_profile_context() as profile_context:
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                old_trash_size_limit = FileStorageSystem._g_trash_size_limit
+                FileStorageSystem._g_trash_size_limit = 6000
+                try:
+                    data_items = [DataItem.DataItem(numpy.full((16, 16), i, numpy.float64)) for i in range(3)]
+                    for data_item in data_items:
+                        document_model.append_data_item(data_item)
+                    data_item_uuids = [data_item.uuid for data_item in data_items]
+                    for data_item in data_items:
+                        document_model.remove_data_item(data_item, safe=True)
+                    self.assertIsNone(document_model.restore_data_item(data_item_uuids[0]))
+                    self.assertEqual(data_item_uuids[1], document_model.restore_data_item(data_item_uuids[1]).uuid)
+                    self.assertEqual(data_item_uuids[2], document_model.restore_data_item(data_item_uuids[2]).uuid)
+                finally:
+                    FileStorageSystem._g_trash_size_limit = old_trash_size_limit
+
+    def test_undo_of_delete_discarded_from_trash_is_not_possible(self):
+        with create_memory_profile_context() as profile_context:
+            document_controller = profile_context.create_document_controller(auto_close=False)
+            document_model = document_controller.document_model
+            with contextlib.closing(document_controller):
+                old_trash_size_limit = FileStorageSystem._g_trash_size_limit
+                FileStorageSystem._g_trash_size_limit = 5000
+                try:
+                    data_items = [DataItem.DataItem(numpy.full((16, 16), i, numpy.float64)) for i in range(3)]
+                    for data_item in data_items:
+                        document_model.append_data_item(data_item)
+                    data_item_uuids = [data_item.uuid for data_item in data_items]
+                    for data_item in data_items:
+                        display_item = document_model.get_display_item_for_data_item(data_item)
+                        command = document_controller.create_remove_display_items_command([display_item])
+                        command.perform()
+                        document_controller.push_undo_command(command)
+                    self.assertEqual(0, len(document_model.data_items))
+                    # the oldest deleted item has been discarded from the trash; the others can be restored.
+                    document_controller.handle_undo()
+                    document_controller.handle_undo()
+                    self.assertEqual(data_item_uuids[1:], [data_item.uuid for data_item in document_model.data_items])
+                    self.assertFalse(document_controller._undo_stack.can_undo)
+                    # undoing past the discarded item does nothing.
+                    document_controller.handle_undo()
+                    self.assertEqual(data_item_uuids[1:], [data_item.uuid for data_item in document_model.data_items])
+                finally:
+                    FileStorageSystem._g_trash_size_limit = old_trash_size_limit
+
     def test_deleted_file_removed_from_file_storage_system_restores_data_item_after_reload(self):
         # is established for restoring items in the trash.
         with create_temp_profile_context() as profile_context:
@@ -1042,6 +1120,46 @@ class TestStorageClass(unittest.TestCase):
                 display_panel.set_display_panel_display_item(display_item)
                 display_panel.display_canvas_item.layout_immediate(Geometry.IntSize(w=200, h=50))
 
+    def test_large_format_sequence_is_read_lazily_after_reload(self):
+        with create_temp_profile_context() as profile_context:
+            data = numpy.random.randn(6, 8, 8)
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                data_item = DataItem.new_data_item(DataAndMetadata.new_data_and_metadata(data, data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2)))
+                data_item.large_format = True
+                self.assertFalse(data_item.is_data_lazy)
+                document_model.append_data_item(data_item)
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                data_item = document_model.data_items[0]
+                self.assertFalse(data_item.is_data_loaded)
+                self.assertTrue(data_item.is_data_lazy)
+                self.assertFalse(data_item.is_data_loaded)
+                display_item = document_model.get_display_item_for_data_item(data_item)
+                display_data_channel = display_item.display_data_channels[0]
+                display_data_channel.sequence_index = 3
+                display_values = display_data_channel.get_latest_display_values()
+                self.assertTrue(numpy.array_equal(data[3], display_values.display_data_and_metadata.data))
+
+    def test_project_storage_compression_applies_to_new_large_format_data(self):
+        with create_temp_profile_context() as profile_context:
+            data = numpy.zeros((6, 8, 8))
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                document_model._project.storage_compression = "shuffle-gzip"
+                data_item = DataItem.new_data_item(DataAndMetadata.new_data_and_metadata(data, data_descriptor=DataAndMetadata.DataDescriptor(True, 0, 2)))
+                data_item.large_format = True
+                document_model.append_data_item(data_item)
+                file_path = data_item._test_get_file_path()
+            with h5py.File(file_path, "r") as f:
+                self.assertEqual("gzip", f["data"].compression)
+                self.assertTrue(f["data"].shuffle)
+                self.assertEqual((6, 8, 8), f["data"].chunks)
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                self.assertEqual("shuffle-gzip", document_model._project.storage_compression)
+                self.assertTrue(numpy.array_equal(data, document_model.data_items[0].data))
+
     def test_writing_empty_data_item_returns_expected_values(self):
         with create_temp_profile_context() as profile_context:
             document_model = profile_context.create_document_model(auto_close=False)
@@ -2066,6 +2184,88 @@ class TestStorageClass(unittest.TestCase):
                 for data_item in document_model.data_items:
                     self.assertEqual(data_item.properties["version"], DataItem.DataItem.writer_version)
 
+    def test_data_items_v8_to_v9_migrations_do_not_share_variables(self):
+        # construct v8 data items
+        with create_memory_profile_context() as profile_context:
+            profile_context.create_legacy_project()
+            src_data_item_dict = profile_context.data_properties_map.setdefault("A", dict())
+            src_data_item_dict["uuid"] = str(uuid.uuid4())
+            src_data_item_dict["version"] = 8
+            src_data_source_dict = dict()
+            src_uuid_str = str(uuid.uuid4())
+            src_data_source_dict["uuid"] = src_uuid_str
+            src_data_source_dict["type"] = "buffered-data-source"
+            src_data_source_dict["displays"] = [{"uuid": str(uuid.uuid4())}]
+            src_data_source_dict["data_dtype"] = str(numpy.dtype(numpy.uint32))
+            src_data_source_dict["data_shape"] = (8, 8)
+            src_data_source_dict["dimensional_calibrations"] = [{ "offset": 1.0, "scale": 2.0, "units": "mm" }, { "offset": 1.0, "scale": 2.0, "units": "mm" }]
+            src_data_source_dict["intensity_calibration"] = { "offset": 0.1, "scale": 0.2, "units": "l" }
+            src_data_item_dict["data_sources"] = [src_data_source_dict]
+            for key, sigma in (("B", 1.7), ("C", 2.3)):
+                dst_data_item_dict = profile_context.data_properties_map.setdefault(key, dict())
+                dst_data_item_dict["uuid"] = str(uuid.uuid4())
+                dst_data_item_dict["version"] = 8
+                dst_data_source_dict = dict()
+                dst_data_source_dict["uuid"] = str(uuid.uuid4())
+                dst_data_source_dict["type"] = "buffered-data-source"
+                dst_data_source_dict["displays"] = [{"uuid": str(uuid.uuid4())}]
+                dst_data_source_dict["dimensional_calibrations"] = []
+                dst_data_source_dict["intensity_calibration"] = { "offset": 0.0, "scale": 1.0, "units": "" }
+                dst_reference = dict()
+                dst_reference["uuid"] = str(uuid.uuid4())
+                dst_reference["type"] = "operation"
+                dst_reference["values"] = {"sigma": sigma}
+                dst_reference["region_connections"] = {}
+                dst_reference["operation_id"] = "gaussian-blur-operation"
+                dst_reference["data_sources"] = [{"buffered_data_source_uuid": src_uuid_str, "type": "data-item-data-source", "uuid": str(uuid.uuid4())}]
+                dst_data_source_dict["data_source"] = dst_reference
+                dst_data_item_dict["data_sources"] = [dst_data_source_dict]
+            # read it back
+            document_model = profile_context.create_document_model(auto_close=False)
+            with document_model.ref():
+                document_model._project.migrate_to_latest()
+                # the expression table is shared by the items during migration; the variables must not be.
+                self.assertEqual(len(document_model.data_items), 3)
+                sigmas = [document_model.get_data_item_computation(data_item).get_input_value("sigma") for data_item in document_model.data_items[1:]]
+                self.assertEqual(sorted(sigmas), [1.7, 2.3])
+                for data_item in document_model.data_items:
+                    self.assertEqual(data_item.properties["version"], DataItem.DataItem.writer_version)
+
+    def test_synthetic_v8_library_migration(self):
+        # benchmark: set NIONSWIFT_MIGRATION_BENCHMARK_ITEMS (e.g. to 20000) and run with -s to print the time.
+        item_count = int(os.environ.get("NIONSWIFT_MIGRATION_BENCHMARK_ITEMS", "200"))
+        data_properties_map = dict()
+        src_uuid_str = None
+        for i in range(item_count):
+            data_item_dict = {"uuid": str(uuid.uuid4()), "version": 8, "datetime_original": {"local_datetime": "2015-01-01T12:00:00", "tz": "+0100", "dst": "+00"}}
+            data_source_dict = {"uuid": str(uuid.uuid4()), "type": "buffered-data-source",
+                                "displays": [{"uuid": str(uuid.uuid4()), "display_limits": [0, 1], "graphics": []}],
+                                "data_dtype": str(numpy.dtype(numpy.float32)), "data_shape": (8, 8),
+                                "dimensional_calibrations": [{"offset": 1.0, "scale": 2.0, "units": "mm"}, {"offset": 1.0, "scale": 2.0, "units": "mm"}],
+                                "intensity_calibration": {"offset": 0.1, "scale": 0.2, "units": "l"},
+                                "metadata": {"hardware_source": {"name": "camera", "exposure": 0.1}, "description": {"title": f"item {i}"}},
+                                "regions": [{"type": "rectangle-region", "uuid": str(uuid.uuid4()), "center": (0.5, 0.5), "size": (0.2, 0.2)}]}
+            # every other item is a gaussian blur of the item before it.
+            if i % 2 and src_uuid_str:
+                data_source_dict["data_source"] = {"uuid": str(uuid.uuid4()), "type": "operation", "values": {"sigma": 2.0}, "region_connections": {},
+                                                   "operation_id": "gaussian-blur-operation",
+                                                   "data_sources": [{"buffered_data_source_uuid": src_uuid_str, "type": "data-item-data-source", "uuid": str(uuid.uuid4())}]}
+            else:
+                src_uuid_str = data_source_dict["uuid"]
+            data_item_dict["data_sources"] = [data_source_dict]
+            data_properties_map[f"K{i:06d}"] = data_item_dict
+        storage_system = FileStorageSystem.MemoryProjectStorageSystem(library_properties={"uuid": str(uuid.uuid4())}, data_properties_map=data_properties_map)
+        start_time = time.perf_counter()
+        FileStorageSystem.migrate_to_latest(storage_system, storage_system)
+        elapsed_time = time.perf_counter() - start_time
+        if "NIONSWIFT_MIGRATION_BENCHMARK_ITEMS" in os.environ:
+            print(f"Migrated {item_count} v8 items in {elapsed_time:.2f} s")
+        library_properties = storage_system._read_properties()
+        self.assertEqual(item_count // 2, len(library_properties.get("computations", list())))
+        self.assertEqual(item_count, len(library_properties.get("display_items", list())))
+        for data_item_dict in data_properties_map.values():
+            self.assertEqual(DataItem.DataItem.writer_version, data_item_dict["version"])
+
     def test_data_items_v8_to_v9_median_filter_migration(self):
         # construct v8 data items
         with create_memory_profile_context() as profile_context:
@@ -3,11 +3,13 @@ import contextlib
 import copy
 import functools
 import logging
+import os
 import random
 import threading
 import time
 import typing
 import unittest
+import unittest.mock
 import uuid
 
 # third party libraries
@@ -422,6 +424,87 @@ class TestSymbolicClass(unittest.TestCase):
             data = DocumentModel.evaluate_data(computation).data
             assert numpy.array_equal(data, d[9:42, 19:45])
 
+    def test_data_source_reuses_derived_inputs_until_input_or_graphic_changes(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.random.randn(64, 64))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            region = Graphics.RectangleGraphic()
+            region.bounds = Geometry.FloatRect.from_tlhw(0.25, 0.25, 0.5, 0.5)
+            display_item.add_graphic(region)
+            mask = Graphics.EllipseGraphic()
+            mask.role = "mask"
+            display_item.add_graphic(mask)
+            computation = document_model.create_computation()
+            computation.create_input_item("src", Symbolic.make_item(display_item.display_data_channel, secondary_item=region))
+            document_model.append_computation(computation)
+            bound_item = computation._get_variable("src").bound_item
+            data_source = bound_item.value
+            cropped_xdata = data_source.cropped_xdata
+            filter_xdata = data_source.filter_xdata
+            # derived inputs are computed once per data source and are read-only, without changing the source data.
+            self.assertIs(cropped_xdata, data_source.cropped_xdata)
+            self.assertFalse(cropped_xdata.data.flags.writeable)
+            self.assertTrue(data_item.data.flags.writeable)
+            # a later data source with the same inputs reuses them.
+            data_source = bound_item.value
+            self.assertIs(cropped_xdata, data_source.cropped_xdata)
+            self.assertIs(filter_xdata, data_source.filter_xdata)
+            # moving a graphic or changing the data recomputes only what depends on it.
+            region.bounds = Geometry.FloatRect.from_tlhw(0.25, 0.25, 0.25, 0.25)
+            data_source = bound_item.value
+            self.assertEqual((16, 16), data_source.cropped_xdata.data_shape)
+            self.assertIs(filter_xdata, data_source.filter_xdata)
+            mask.bounds = Geometry.FloatRect.from_tlhw(0.0, 0.0, 0.5, 0.5)
+            self.assertIsNot(filter_xdata, bound_item.value.filter_xdata)
+            data_item.set_data(numpy.zeros((64, 64)))
+            self.assertFalse(numpy.any(bound_item.value.cropped_xdata.data))
+
+    def test_compiled_expression_cache_reuses_and_evicts_expressions(self):
+        expression_cache = Symbolic.CompiledExpressionCache(2)
+        expression = Symbolic.xdata_expression("xd.transpose_flip(a.xdata, flip_v=True)")
+        compiled_expression = expression_cache.get(expression)
+        self.assertIs(compiled_expression, expression_cache.get(expression))
+        self.assertEqual({"target", "xd", "a"}, compiled_expression.names)
+        self.assertEqual({"target", "xd", "a"}, Symbolic.Computation.parse_names(expression))
+        expression_cache.get(Symbolic.xdata_expression("-a.xdata"))
+        expression_cache.get(Symbolic.xdata_expression("a.xdata"))
+        self.assertEqual(2, len(expression_cache))
+        self.assertIsNot(compiled_expression, expression_cache.get(expression))
+        with self.assertRaises(SyntaxError):
+            expression_cache.get("target.xdata = (")
+
+    def test_script_expression_evaluation_benchmark(self):
+        # benchmark: set NIONSWIFT_EXPRESSION_BENCHMARK_EVALUATIONS (e.g. to 5000) and run with -s to print the times.
+        evaluation_count = int(os.environ.get("NIONSWIFT_EXPRESSION_BENCHMARK_EVALUATIONS", "50"))
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.random.randn(8, 8))
+            document_model.append_data_item(data_item)
+            computation = document_model.create_computation(Symbolic.xdata_expression("xd.transpose_flip(a.xdata, flip_v=True)"))
+            computation.create_input_item("a", Symbolic.make_item(data_item))
+            document_model.append_computation(computation)
+            api = Facade.get_api("~1.0", "~1.0")
+            a = api._new_api_object(computation._get_variable("a").bound_item.computation_value)
+            executor = Symbolic.ScriptExpressionComputationExecutor(computation, api)
+            with contextlib.closing(executor):
+                context = Symbolic.ComputationExecutorContext(computation, {"a": a})
+                # a cache that holds nothing compiles the expression for every evaluation, as before the cache.
+                with unittest.mock.patch.object(Symbolic, "_compiled_expression_cache", Symbolic.CompiledExpressionCache(0)):
+                    start_time = time.perf_counter()
+                    for i in range(evaluation_count):
+                        executor._execute(context)
+                    uncached_time = (time.perf_counter() - start_time) / evaluation_count
+                start_time = time.perf_counter()
+                for i in range(evaluation_count):
+                    executor._execute(context)
+                cached_time = (time.perf_counter() - start_time) / evaluation_count
+                if "NIONSWIFT_EXPRESSION_BENCHMARK_EVALUATIONS" in os.environ:
+                    print(f"Evaluated expression in {cached_time * 1e6:.1f} us (compiled every evaluation {uncached_time * 1e6:.1f} us)")
+                executor._commit()
+                self.assertTrue(numpy.array_equal(numpy.flipud(data_item.data), executor._target_xdata.data))
+
     def test_evaluate_computation_gives_correct_value(self):
         with TestContext.create_memory_context() as test_context:
             document_model = test_context.create_document_model()
@@ -1,9 +1,12 @@
 # standard libraries
+import concurrent.futures
 import contextlib
+import functools
 import logging
 import threading
 import typing
 import unittest
+import uuid
 
 import numpy
 
@@ -13,6 +16,7 @@ from nion.swift import DataItemThumbnailWidget
 from nion.swift import MimeTypes
 from nion.swift import Thumbnails
 from nion.swift.model import DataItem
+from nion.swift.model import Graphics
 from nion.swift.test import TestContext
 from nion.ui import TestUI
 from nion.utils import Geometry
@@ -76,6 +80,92 @@ class TestThumbnailsClass(unittest.TestCase):
             # so use the event instead.
             self.assertTrue(thumbnail_dirty)
 
+    def test_image_thumbnail_is_reduced_directly_from_display_data(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data = numpy.zeros((1024, 512), dtype=numpy.float32)
+            data[512:] = 1.0
+            data_item = DataItem.DataItem(data)
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_item.display_type = "image"
+            thumbnail_source = Thumbnails.ThumbnailManager().thumbnail_source_for_display_item(self._test_setup.app.ui, display_item)
+            thumbnail_source.recompute_data()
+            thumbnail_data = thumbnail_source.thumbnail_data
+            self.assertEqual((256, 256), thumbnail_data.shape)
+            self.assertEqual(numpy.uint32, thumbnail_data.dtype)
+            # the image is fit with its aspect ratio preserved; the sides are transparent.
+            self.assertTrue(numpy.all(thumbnail_data[:, :64] == 0))
+            self.assertTrue(numpy.all(thumbnail_data[:, 192:] == 0))
+            # the top half is the low end of the gray color map, the bottom half is the high end.
+            self.assertTrue(numpy.all(thumbnail_data[:128, 64:192] == 0xFF000000))
+            self.assertTrue(numpy.all(thumbnail_data[128:, 64:192] == 0xFFFFFFFF))
+
+    def test_line_plot_thumbnail_is_rendered_from_envelope(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.linspace(0.0, 1.0, 4096))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_item._set_display_layer_property(0, "fill_color", None)
+            display_item._set_display_layer_property(0, "stroke_color", "#FF0000")
+            thumbnail_source = Thumbnails.ThumbnailManager().thumbnail_source_for_display_item(self._test_setup.app.ui, display_item)
+            thumbnail_source.recompute_data()
+            thumbnail_data = thumbnail_source.thumbnail_data
+            self.assertEqual((256, 256), thumbnail_data.shape)
+            # the line rises from the bottom left to the top right of the plot band.
+            plot_rows = numpy.flatnonzero(numpy.any(thumbnail_data != 0, axis=1))
+            top, bottom = plot_rows[0], plot_rows[-1]
+            self.assertEqual(0xFFFF0000, thumbnail_data[bottom, 0])
+            self.assertEqual(0xFFFF0000, thumbnail_data[top, 255])
+            self.assertEqual(0xFFFFFFFF, thumbnail_data[top, 0])
+            self.assertEqual(0xFFFFFFFF, thumbnail_data[bottom, 255])
+
+    def test_thumbnail_with_graphics_is_rendered(self):
+        with TestContext.create_memory_context() as test_context:
+            document_model = test_context.create_document_model()
+            data_item = DataItem.DataItem(numpy.random.randn(64, 64))
+            document_model.append_data_item(data_item)
+            display_item = document_model.get_display_item_for_data_item(data_item)
+            display_item.add_graphic(Graphics.RectangleGraphic())
+            thumbnail_source = Thumbnails.ThumbnailManager().thumbnail_source_for_display_item(self._test_setup.app.ui, display_item)
+            thumbnail_source.recompute_data()
+            self.assertIsNotNone(thumbnail_source.thumbnail_data)
+            self.assertFalse(thumbnail_source._is_thumbnail_dirty)
+
+    def test_thumbnail_scheduler_runs_visible_work_first(self):
+        scheduler = Thumbnails.ThumbnailScheduler(max_workers=1)
+        started = threading.Event()
+        release = threading.Event()
+        order = list()
+
+        def block() -> None:
+            started.set()
+            release.wait(10.0)
+
+        keys = [uuid.uuid4() for _ in range(4)]
+        scheduler.submit(uuid.uuid4(), block)
+        self.assertTrue(started.wait(10.0))
+        futures = [scheduler.submit(key, functools.partial(order.append, key)) for key in keys]
+        # submitting queued work again returns the queued future.
+        self.assertIs(futures[0], scheduler.submit(keys[0], lambda: None))
+        futures[1].cancel()
+        scheduler.set_visible(self, [keys[3]])
+        metrics = scheduler.metrics
+        self.assertEqual(4, metrics.queued_count)
+        self.assertEqual(1, metrics.queued_visible_count)
+        self.assertEqual(1, metrics.running_count)
+        release.set()
+        concurrent.futures.wait([futures[0], futures[2], futures[3]], timeout=10.0)
+        self.assertEqual([keys[3], keys[0], keys[2]], order)
+        metrics = scheduler.metrics
+        self.assertEqual(0, metrics.queued_count)
+        self.assertEqual(4, metrics.completed_count)
+        self.assertEqual(1, metrics.cancelled_count)
+        # an item that is no longer visible loses its priority.
+        scheduler.set_visible(self, list())
+        self.assertEqual(0, scheduler.metrics.visible_count)
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.DEBUG)